@@ -4,3 +4,6 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
     verbose_name = 'Пользователи и аутентификация'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
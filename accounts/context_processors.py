@@ -0,0 +1,10 @@
+from django.utils.functional import SimpleLazyObject
+from .counters import get_counters
+
+
+def counters(request):
+    """Expose the user's badge counters, read from the cache only when a template uses them."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'counters': SimpleLazyObject(lambda: get_counters(user.id))}
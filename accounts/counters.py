@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from perfecto.caching import delete_after_commit
+from companies.models import CompanyUsers
+from invitations.models import Invitation
+from reviews.models import PendingScore, PerfReview
+from teams.models import TeamUsers
+from .models import User
+
+# Счётчики пользователя хранятся в кэше и сбрасываются сигналами (accounts/signals.py)
+COUNTERS_TIMEOUT = 300
+COUNTERS_PREFIX = 'counters:v1:'
+
+# имя счётчика -> (queryset, поле со ссылкой на пользователя)
+COUNTER_SOURCES = {
+    'companies': (CompanyUsers.objects.all(), 'user'),
+    'teams': (TeamUsers.objects.all(), 'user'),
+    'reviews': (PerfReview.objects.all(), 'user'),
+    'invitations': (Invitation.objects.all(), 'created_by'),
+    'pending_scores': (PendingScore.objects.all(), 'user'),
+}
+
+
+def counters_cache_key(user_id):
+    return f'{COUNTERS_PREFIX}{user_id}'
+
+
+def _count(queryset, field):
+    rows = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field)
+    return Coalesce(
+        Subquery(rows.annotate(total=Count('pk')).values('total'), output_field=IntegerField()),
+        Value(0),
+    )
+
+
+def get_counters(user_id):
+    """
+    Return the user's cached badge counters, computing them on a cache miss.
+
+    The dict holds companies, teams, reviews, invitations and
+    pending_scores; all of them come from one query over the user row.
+    """
+    key = counters_cache_key(user_id)
+    counters = cache.get(key)
+    if counters is not None:
+        return counters
+
+    # Префикс: имена вроде pending_scores совпадают с обратными связями User
+    annotations = {f'count_{name}': _count(queryset, field) for name, (queryset, field) in COUNTER_SOURCES.items()}
+    row = User.objects.filter(id=user_id).annotate(**annotations).values(*annotations).first() or {}
+    counters = {name: row.get(f'count_{name}', 0) for name in COUNTER_SOURCES}
+    cache.set(key, counters, COUNTERS_TIMEOUT)
+    return counters
+
+
+def invalidate_counters(user_ids):
+    """Drop cached counters for the given users."""
+    delete_after_commit(counters_cache_key(user_id) for user_id in set(user_ids))
@@ -1,5 +1,6 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
+from django.db.models import Q
 from .models import User
 
 class CustomUserCreationForm(UserCreationForm):
@@ -27,5 +28,34 @@ class CustomAuthenticationForm(AuthenticationForm):
         model = User
         fields = ('username', 'password')
 
+class ProfileForm(forms.ModelForm):
+    """Profile fields a user edits themselves, including the Telegram login used for login links."""
+    
+    class Meta:
+        model = User
+        fields = ('user_name', 'user_job', 'telegram_username')
+        labels = {'telegram_username': 'Telegram-логин'}
+        help_texts = {'telegram_username': 'Например, @username. После сохранения нажмите /start у бота Perfecto.'}
+    
+    def clean_telegram_username(self):
+        name = self.cleaned_data['telegram_username'].strip().lstrip('@')
+        if not name:
+            return ''
+        taken = User.objects.filter(
+            Q(telegram_username__iexact=name) | Q(telegram_username__iexact=f"@{name}")
+        ).exclude(id=self.instance.id)
+        if taken.exists():
+            raise forms.ValidationError("Этот Telegram-логин уже указан в другом аккаунте")
+        return f"@{name}"
+    
+    def save(self, commit=True):
+        user = super().save(commit=False)
+        # Чат привязан к прежнему логину: после смены нужно заново нажать /start
+        if 'telegram_username' in self.changed_data:
+            user.telegram_id = ''
+        if commit:
+            user.save()
+        return user
+
 class TelegramLoginForm(forms.Form):
     telegram_username = forms.CharField(max_length=255, required=True)
@@ -0,0 +1,53 @@
+import secrets
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+SALT = 'accounts.telegram-login'
+
+
+def _key(nonce):
+    return f'telegram_login:v1:{nonce}'
+
+
+def issue_login_token(user):
+    """
+    Return a signed one-time login token for the user.
+
+    The token carries the user id and a random nonce; the nonce is stored in
+    the cache for TELEGRAM_LOGIN_TTL seconds and is what makes it single-use.
+    """
+    nonce = secrets.token_urlsafe(16)
+    cache.set(_key(nonce), user.id, settings.TELEGRAM_LOGIN_TTL)
+    return signing.dumps({'u': user.id, 'n': nonce}, salt=SALT, compress=True)
+
+
+def _unsign(token):
+    try:
+        data = signing.loads(token, salt=SALT, max_age=settings.TELEGRAM_LOGIN_TTL)
+    except signing.BadSignature:
+        return None, None
+    return data.get('u'), data.get('n')
+
+
+def peek_login_token(token):
+    """Return the user id of a valid, unused token without spending it."""
+    user_id, nonce = _unsign(token)
+    if nonce is None or cache.get(_key(nonce)) != user_id:
+        return None
+    return user_id
+
+
+def consume_login_token(token):
+    """
+    Spend a token and return its user id, or None if it is forged, expired or used.
+
+    Costs one cache read and one delete; only the caller whose delete
+    actually removed the nonce wins, so concurrent clicks log in once.
+    """
+    user_id, nonce = _unsign(token)
+    if nonce is None or cache.get(_key(nonce)) != user_id:
+        return None
+    if not cache.delete(_key(nonce)):
+        return None
+    return user_id
@@ -0,0 +1,23 @@
+from django.db.models import Q
+from .models import User
+from .widgets import SCOPE_CANDIDATES
+
+USER_SEARCH_LIMIT = 10
+# Поиск по всем пользователям (не членам компании) — только с достаточно длинным префиксом
+MIN_CANDIDATE_QUERY = 3
+
+
+def find_users(query, company_id, scope, limit=USER_SEARCH_LIMIT):
+    """
+    Return up to `limit` users whose email or name starts with the query.
+
+    scope 'members' searches the company's members, 'candidates' everyone
+    else. Both prefixes are served by the indexes from accounts migration 0002.
+    """
+    query = query.strip()
+    if not query or (scope == SCOPE_CANDIDATES and len(query) < MIN_CANDIDATE_QUERY):
+        return []
+    users = User.objects.filter(Q(email__istartswith=query) | Q(user_name__istartswith=query))
+    members = Q(company_relations__company_id=company_id)
+    users = users.exclude(members) if scope == SCOPE_CANDIDATES else users.filter(members)
+    return list(users.only('id', 'email', 'user_name').order_by('email')[:limit])
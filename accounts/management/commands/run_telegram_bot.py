@@ -0,0 +1,26 @@
+import asyncio
+import signal
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from accounts.telegram_bot import OUTBOX_BATCH_SIZE, BotWorker
+from notifications.channels import make_bot
+
+
+class Command(BaseCommand):
+    help = 'Run the Telegram bot: link chats on /start and send queued messages in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=OUTBOX_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if not settings.TELEGRAM_BOT_TOKEN:
+            raise CommandError("TELEGRAM_BOT_TOKEN is not set")
+        asyncio.run(self.run(options['batch_size']))
+
+    async def run(self, batch_size):
+        stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stopped.set)
+        self.stdout.write("Telegram bot started")
+        await BotWorker(make_bot(), batch_size=batch_size).run(stopped.is_set)
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+# istartswith превращается в UPPER(col::text) LIKE 'X%' на Postgres и в LIKE 'x%' на SQLite
+POSTGRES_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS accounts_user_email_prefix_idx ON accounts_user (UPPER(email::text) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS accounts_user_name_prefix_idx ON accounts_user (UPPER(user_name::text) text_pattern_ops)",
+]
+SQLITE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS accounts_user_email_prefix_idx ON accounts_user (email COLLATE NOCASE)",
+    "CREATE INDEX IF NOT EXISTS accounts_user_name_prefix_idx ON accounts_user (user_name COLLATE NOCASE)",
+]
+DROP_INDEXES = [
+    "DROP INDEX IF EXISTS accounts_user_email_prefix_idx",
+    "DROP INDEX IF EXISTS accounts_user_name_prefix_idx",
+]
+
+
+def _execute(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        _execute(schema_editor, POSTGRES_INDEXES)
+    elif vendor == "sqlite":
+        _execute(schema_editor, SQLITE_INDEXES)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in ("postgresql", "sqlite"):
+        _execute(schema_editor, DROP_INDEXES)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,180 @@
+from django.core.cache import cache
+from companies.models import CompanyUsers
+from teams.models import TeamUsers
+from perfecto.caching import delete_after_commit
+
+# Карта ролей пользователя хранится в кэше и сбрасывается сигналами (accounts/signals.py)
+ROLE_CACHE_TIMEOUT = 300
+ROLE_CACHE_PREFIX = 'roles:v1:'
+
+_role_cache_stats = {'hits': 0, 'misses': 0}
+
+
+def role_cache_key(user_id):
+    return f'{ROLE_CACHE_PREFIX}{user_id}'
+
+
+def get_membership_map(user_id):
+    """
+    Return the user's cached membership map, building it on a cache miss.
+
+    The map is {'teams': {team_id: (is_manager, is_owner)},
+    'companies': {company_id: (is_manager, is_owner)}}.
+    """
+    key = role_cache_key(user_id)
+    membership = cache.get(key)
+    if membership is not None:
+        _role_cache_stats['hits'] += 1
+        return membership
+    
+    _role_cache_stats['misses'] += 1
+    membership = {
+        'teams': {
+            team_id: (is_manager, is_owner)
+            for team_id, is_manager, is_owner in TeamUsers.objects.filter(
+                user_id=user_id
+            ).values_list('team_id', 'is_manager', 'is_owner')
+        },
+        'companies': {
+            company_id: (is_manager, is_owner)
+            for company_id, is_manager, is_owner in CompanyUsers.objects.filter(
+                user_id=user_id
+            ).values_list('company_id', 'is_manager', 'is_owner')
+        },
+    }
+    cache.set(key, membership, ROLE_CACHE_TIMEOUT)
+    return membership
+
+
+def invalidate_roles(user_ids):
+    """Drop cached membership maps for the given users."""
+    delete_after_commit(role_cache_key(user_id) for user_id in set(user_ids))
+
+
+def role_cache_stats():
+    """Return hit/miss counters of the role cache for this process."""
+    return dict(_role_cache_stats)
+
+
+class Role:
+    """A user's role in a single team or company."""
+    __slots__ = ('is_manager', 'is_owner')
+
+    def __init__(self, is_manager=False, is_owner=False):
+        self.is_manager = is_manager
+        self.is_owner = is_owner
+
+    @property
+    def can_manage(self):
+        return self.is_manager or self.is_owner
+
+
+class PermissionResolver:
+    """
+    Answers permission questions for one user.
+
+    Team and company roles come from the cached membership map on the first
+    check and are reused for every following check. Use get_permissions(request)
+    to get the resolver memoized on the current request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._team_roles = None
+        self._company_roles = None
+        self._reviewing = {}
+
+    def _load_roles(self):
+        if self._team_roles is not None:
+            return
+        self._team_roles = {}
+        self._company_roles = {}
+        if not self.user.is_authenticated:
+            return
+        membership = get_membership_map(self.user.id)
+        for team_id, (is_manager, is_owner) in membership['teams'].items():
+            self._team_roles[team_id] = Role(is_manager, is_owner)
+        for company_id, (is_manager, is_owner) in membership['companies'].items():
+            self._company_roles[company_id] = Role(is_manager, is_owner)
+
+    def team_role(self, team):
+        """Return the user's Role in the team, or None if not a member."""
+        self._load_roles()
+        return self._team_roles.get(team.id)
+
+    def company_role(self, company_id):
+        """Return the user's Role in the company, or None if not a member."""
+        self._load_roles()
+        return self._company_roles.get(company_id)
+
+    # Companies
+
+    def can_view_company(self, company):
+        return self.company_role(company.id) is not None
+
+    def can_manage_company(self, company):
+        role = self.company_role(company.id)
+        return role is not None and role.can_manage
+
+    def is_company_owner(self, company):
+        role = self.company_role(company.id)
+        return role is not None and role.is_owner
+
+    # Teams
+
+    def can_view_team(self, team):
+        """Team members and members of the team's company can view it."""
+        return self.team_role(team) is not None or self.company_role(team.company_id) is not None
+
+    def can_manage_team(self, team):
+        """Team managers/owners and company managers/owners manage a team."""
+        team_role = self.team_role(team)
+        if team_role is not None and team_role.can_manage:
+            return True
+        company_role = self.company_role(team.company_id)
+        return company_role is not None and company_role.can_manage
+
+    def is_team_owner(self, team):
+        team_role = self.team_role(team)
+        if team_role is not None and team_role.is_owner:
+            return True
+        company_role = self.company_role(team.company_id)
+        return company_role is not None and company_role.is_owner
+
+    # Reviews
+
+    def is_review_subject(self, review):
+        return review.user_id == self.user.id
+
+    def is_reviewer(self, review):
+        """Check whether the user reviews any achievement of the review."""
+        if review.id not in self._reviewing:
+            self._reviewing[review.id] = review.achievements.filter(
+                reviewers=self.user
+            ).exists()
+        return self._reviewing[review.id]
+
+    def can_manage_review(self, review):
+        return self.can_manage_team(review.team)
+
+    def can_edit_review(self, review):
+        """The subject and team/company managers can add achievements."""
+        return self.is_review_subject(review) or self.can_manage_review(review)
+
+    def can_view_review(self, review):
+        return self.can_edit_review(review) or self.is_reviewer(review)
+
+    def can_score_achievement(self, achievement):
+        """Reviewers of the achievement and managers of the review's team can score it."""
+        if self.can_manage_review(achievement.perfreview):
+            return True
+        return achievement.reviewers.filter(id=self.user.id).exists()
+
+
+def get_permissions(request):
+    """Return the PermissionResolver memoized on the request."""
+    resolver = getattr(request, '_permissions', None)
+    if resolver is None or resolver.user != request.user:
+        resolver = PermissionResolver(request.user)
+        request._permissions = resolver
+    return resolver
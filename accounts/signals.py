@@ -0,0 +1,57 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from companies.models import CompanyUsers
+from invitations.models import Invitation
+from reviews.models import PerfReview
+from teams.models import Team, TeamUsers
+from perfecto.fragments import SCOPE_COMPANY, SCOPE_TEAM, bump_versions
+from .counters import invalidate_counters
+from .permissions import invalidate_roles
+
+
+@receiver([post_save, post_delete], sender=TeamUsers)
+@receiver([post_save, post_delete], sender=CompanyUsers)
+def invalidate_membership_roles(sender, instance, **kwargs):
+    """Drop the cached role map and counters of the user whose membership changed."""
+    invalidate_roles([instance.user_id])
+    invalidate_counters([instance.user_id])
+
+
+@receiver(post_save, sender=Team)
+def invalidate_team_roles(sender, instance, created, **kwargs):
+    """A team may have moved to another company: drop its members' role maps."""
+    if created:
+        return
+    invalidate_roles(
+        TeamUsers.objects.filter(team=instance).values_list('user_id', flat=True)
+    )
+
+
+@receiver([post_save, post_delete], sender=TeamUsers)
+def bump_team_version(sender, instance, **kwargs):
+    """Membership changes re-render the team roster."""
+    bump_versions(SCOPE_TEAM, [instance.team_id])
+
+
+@receiver([post_save, post_delete], sender=CompanyUsers)
+def bump_company_version(sender, instance, **kwargs):
+    bump_versions(SCOPE_COMPANY, [instance.company_id])
+
+
+@receiver([post_save, post_delete], sender=Team)
+def bump_company_version_on_team(sender, instance, **kwargs):
+    """The company page lists its teams."""
+    bump_versions(SCOPE_COMPANY, [instance.company_id])
+
+
+@receiver([post_save, post_delete], sender=PerfReview)
+def invalidate_review_counters(sender, instance, created=True, **kwargs):
+    if created:
+        invalidate_counters([instance.user_id])
+
+
+@receiver(post_save, sender=Invitation)
+def invalidate_invitation_counters(sender, instance, created, **kwargs):
+    # Удаление без сигнала: purge_expired_invitations сбрасывает счётчики сам, сохраняя быстрый DELETE
+    if created:
+        invalidate_counters([instance.created_by_id])
@@ -0,0 +1,8 @@
+from jobs.queue import PRIORITY_HIGH, task
+from .telegram_bot import SEND_MESSAGE_TASK, send_message_now
+
+
+@task(SEND_MESSAGE_TASK, priority=PRIORITY_HIGH)
+def send_telegram_message(chat_id, text):
+    # Обычно сообщения пачками отправляет run_telegram_bot; это запасной путь для run_workers
+    send_message_now(chat_id, text)
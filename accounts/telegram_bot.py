@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import traceback
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from telegram.error import BadRequest, Forbidden
+from jobs.queue import enqueue
+from jobs.worker import claim_job, complete_job, fail_job, worker_name
+from notifications.channels import make_bot, send_text
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+SEND_MESSAGE_TASK = 'accounts.telegram_message'
+# Сколько сообщений бот забирает из очереди за раз
+OUTBOX_BATCH_SIZE = 30
+OUTBOX_INTERVAL = 1.0
+UPDATES_TIMEOUT = 10
+
+
+def queue_message(chat_id, text):
+    """Queue a bot message; the bot worker sends queued messages in batches."""
+    return enqueue(SEND_MESSAGE_TASK, {'chat_id': chat_id, 'text': text})
+
+
+def find_login_user(telegram_username):
+    """Active user with this Telegram username who has started the bot, or None."""
+    name = telegram_username.strip().lstrip('@')
+    return User.objects.filter(
+        Q(telegram_username__iexact=name) | Q(telegram_username__iexact=f"@{name}"),
+        is_active=True
+    ).exclude(telegram_id='').first()
+
+
+def link_chat(telegram_username, chat_id):
+    """
+    Remember the chat of the user with this Telegram username.
+
+    Returns the number of matching accounts; the chat is linked only when
+    there is exactly one, so a chat never gets access to several accounts.
+    """
+    name = telegram_username.lstrip('@')
+    user_ids = list(User.objects.filter(
+        Q(telegram_username__iexact=name) | Q(telegram_username__iexact=f"@{name}")
+    ).values_list('id', flat=True)[:2])
+    if len(user_ids) == 1:
+        User.objects.filter(id=user_ids[0]).update(telegram_id=str(chat_id))
+    return len(user_ids)
+
+
+async def send_batch(bot, messages, rate=None):
+    """
+    Send (chat_id, text) pairs concurrently, at most rate per second.
+
+    Returns an exception or None for every message, in order.
+    """
+    step = int(rate) if rate and rate >= 1 else len(messages) or 1
+    results = []
+    for start in range(0, len(messages), step):
+        if start:
+            await asyncio.sleep(1)
+        results.extend(await asyncio.gather(
+            *(
+                send_text(bot, chat_id, text)
+                for chat_id, text in messages[start:start + step]
+            ),
+            return_exceptions=True
+        ))
+    return [result if isinstance(result, Exception) else None for result in results]
+
+
+def claim_outbox(worker, limit):
+    jobs = []
+    while len(jobs) < limit:
+        job = claim_job(worker, task=SEND_MESSAGE_TASK)
+        if job is None:
+            break
+        jobs.append(job)
+    return jobs
+
+
+def finish_outbox(jobs, errors):
+    for job, error in zip(jobs, errors):
+        if error is None:
+            complete_job(job)
+        else:
+            # Заблокированный бот или неверный chat_id повтором не исправить
+            retry = not isinstance(error, (Forbidden, BadRequest))
+            fail_job(job, ''.join(traceback.format_exception(error)), retry=retry)
+
+
+class BotWorker:
+    """
+    Long-running Telegram bot: links chats on /start and sends queued messages in batches.
+
+    Two loops run side by side: one long-polls getUpdates, the other drains
+    the job queue of SEND_MESSAGE_TASK messages every OUTBOX_INTERVAL seconds.
+    """
+
+    def __init__(self, bot, batch_size=OUTBOX_BATCH_SIZE, rate=None, updates_timeout=UPDATES_TIMEOUT,
+                 interval=OUTBOX_INTERVAL):
+        self.bot = bot
+        self.batch_size = batch_size
+        self.rate = settings.NOTIFICATION_TELEGRAM_RATE if rate is None else rate
+        self.updates_timeout = updates_timeout
+        self.interval = interval
+        self.offset = None
+        self.name = f"telegram:{worker_name()}"
+
+    async def flush_outbox(self):
+        """Send one batch of queued messages; returns how many were taken."""
+        jobs = await sync_to_async(claim_outbox)(self.name, self.batch_size)
+        if not jobs:
+            return 0
+        errors = await send_batch(
+            self.bot, [(job.payload['chat_id'], job.payload['text']) for job in jobs], self.rate
+        )
+        await sync_to_async(finish_outbox)(jobs, errors)
+        return len(jobs)
+
+    async def handle_updates(self, timeout=None):
+        updates = await self.bot.get_updates(
+            offset=self.offset,
+            timeout=self.updates_timeout if timeout is None else timeout,
+            allowed_updates=['message']
+        )
+        for update in updates:
+            self.offset = update.update_id + 1
+            message = update.message
+            if message is None or not (message.text or '').startswith('/start'):
+                continue
+            username = message.from_user.username if message.from_user else None
+            matches = await sync_to_async(link_chat)(username, message.chat_id) if username else 0
+            if matches == 1:
+                text = "Готово! Теперь ссылки для входа в Perfecto будут приходить сюда."
+            elif matches:
+                text = "Этот Telegram-логин указан в нескольких аккаунтах Perfecto. Оставьте его только в одном профиле и нажмите /start ещё раз."
+            else:
+                text = "Не нашли пользователя Perfecto с вашим Telegram-логином. Укажите его в профиле и нажмите /start ещё раз."
+            await sync_to_async(queue_message)(message.chat_id, text)
+        return len(updates)
+
+    async def _outbox_loop(self, should_stop):
+        while not should_stop():
+            if not await self.flush_outbox():
+                await asyncio.sleep(self.interval)
+
+    async def _updates_loop(self, should_stop):
+        while not should_stop():
+            try:
+                await self.handle_updates()
+            except Exception:
+                logger.exception("Telegram getUpdates failed")
+                await asyncio.sleep(self.interval)
+
+    async def run(self, should_stop):
+        async with self.bot:
+            await asyncio.gather(self._outbox_loop(should_stop), self._updates_loop(should_stop))
+
+
+async def _send_one(chat_id, text):
+    async with make_bot() as bot:
+        error, = await send_batch(bot, [(chat_id, text)])
+    if error is not None:
+        raise error
+
+
+def send_message_now(chat_id, text):
+    """Send a single message synchronously (used when a regular job worker picks the message up)."""
+    asyncio.run(_send_one(chat_id, text))
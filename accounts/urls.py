@@ -7,5 +7,8 @@ urlpatterns = [
     path('register/', views.register_view, name='register'),
     path('logout/', LogoutView.as_view(), name='logout'),
     path('telegram-login/', views.telegram_login_request, name='telegram_login'),
+    path('telegram-login/<str:token>/', views.telegram_login_confirm, name='telegram_login_confirm'),
     path('dashboard/', views.dashboard_view, name='dashboard'),
+    path('profile/', views.profile_view, name='profile'),
+    path('users/search/', views.user_search, name='user_search'),
 ]
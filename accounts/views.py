@@ -1,15 +1,23 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.decorators import login_required
 from django.views.generic import CreateView
 from django.urls import reverse_lazy
 from django.contrib import messages
-from .forms import CustomUserCreationForm, CustomAuthenticationForm, TelegramLoginForm
+from django.http import HttpResponseBadRequest, HttpResponseForbidden
+from .forms import CustomUserCreationForm, CustomAuthenticationForm, ProfileForm, TelegramLoginForm
 from .models import User
-import uuid
+from .lookup import find_users
+from .permissions import get_permissions
+from .widgets import SCOPE_CANDIDATES, SCOPE_MEMBERS
+from .login_links import consume_login_token, issue_login_token, peek_login_token
+from .telegram_bot import find_login_user, queue_message
 import jwt
 from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
 import datetime
+from perfecto.instrumentation import query_budget
 
 def home_view(request):
     """Home page view showcasing the product description."""
@@ -121,22 +129,81 @@ def login_view(request):
     })
 
 def telegram_login_request(request):
-    """Generate one-time link for Telegram authentication."""
+    """Send a one-time login link to the user's Telegram chat."""
     if request.method == 'POST':
         form = TelegramLoginForm(request.POST)
         if form.is_valid():
             telegram_username = form.cleaned_data['telegram_username']
-            # Generate one-time token
-            token = str(uuid.uuid4())
-            # TODO: Implement actual Telegram bot integration
-            # For MVP, we'll just redirect with a success message
+            user = find_login_user(telegram_username)
+            # Не чаще одной ссылки в минуту на пользователя; ответ одинаковый, чтобы не раскрывать аккаунты
+            if user is not None and cache.add(f'telegram_login_sent:{user.id}', 1, 60):
+                token = issue_login_token(user)
+                link = f"{settings.SITE_URL}{reverse('telegram_login_confirm', kwargs={'token': token})}"
+                queue_message(
+                    user.telegram_id,
+                    f"Ссылка для входа в Perfecto (действует {settings.TELEGRAM_LOGIN_TTL // 60} мин.): {link}"
+                )
             return render(request, 'accounts/telegram_link_sent.html', {
-                'telegram_username': telegram_username
+                'telegram_username': telegram_username,
+                'bot_username': settings.TELEGRAM_BOT_USERNAME
             })
     
     return redirect('login')
 
+def telegram_login_confirm(request, token):
+    """Log in by a one-time link; GET only shows a button so link previews cannot spend the token."""
+    if request.method == 'POST':
+        user_id = consume_login_token(token)
+        user = User.objects.filter(id=user_id, is_active=True).first() if user_id else None
+        if user is not None:
+            login(request, user, backend='django.contrib.auth.backends.ModelBackend')
+            return redirect('dashboard')
+    elif peek_login_token(token) is not None:
+        return render(request, 'accounts/telegram_login_confirm.html')
+    
+    messages.error(request, "Ссылка для входа недействительна или уже использована. Запросите новую.")
+    return redirect('login')
+
 @login_required
+@query_budget(10)
 def dashboard_view(request):
     """Main dashboard view after login."""
     return render(request, 'accounts/dashboard.html')
+
+@login_required
+def profile_view(request):
+    """Edit the current user's name, job title and Telegram login."""
+    if request.method == 'POST':
+        form = ProfileForm(request.POST, instance=request.user)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Профиль сохранён.")
+            return redirect('profile')
+    else:
+        form = ProfileForm(instance=request.user)
+    
+    return render(request, 'accounts/profile.html', {
+        'form': form,
+        'bot_username': settings.TELEGRAM_BOT_USERNAME
+    })
+
+@login_required
+def user_search(request):
+    """HTMX typeahead options for UserPickerWidget: users by email/name prefix within a company."""
+    scope = request.GET.get('scope', SCOPE_MEMBERS)
+    company_id = request.GET.get('company', '')
+    if scope not in (SCOPE_MEMBERS, SCOPE_CANDIDATES) or not company_id.isdigit():
+        return HttpResponseBadRequest("Unknown scope or company")
+    
+    from companies.models import Company
+    company = get_object_or_404(Company, id=company_id)
+    perms = get_permissions(request)
+    allowed = perms.can_manage_company(company) if scope == SCOPE_CANDIDATES else perms.can_view_company(company)
+    if not allowed:
+        return HttpResponseForbidden("You don't have access to this company")
+    
+    query = request.GET.get('q', '')
+    return render(request, 'accounts/widgets/_user_options.html', {
+        'users': find_users(query, company.id, scope),
+        'query': query.strip()
+    })
@@ -0,0 +1,68 @@
+from urllib.parse import urlencode
+from django import forms
+from django.template.loader import render_to_string
+from django.urls import reverse
+from .models import User
+
+SCOPE_MEMBERS = 'members'
+SCOPE_CANDIDATES = 'candidates'
+
+
+class UserPickerWidget(forms.Widget):
+    """
+    HTMX typeahead for choosing a user by email or name prefix.
+
+    Unlike Select it never iterates the field's queryset: options come from
+    the user_search endpoint and only the submitted id is validated by the
+    field. Set company_id before rendering to scope the search.
+    """
+    template_name = 'accounts/widgets/user_picker.html'
+    allow_multiple_selected = False
+
+    def __init__(self, scope=SCOPE_MEMBERS, attrs=None):
+        super().__init__(attrs)
+        self.scope = scope
+        self.company_id = None
+
+    def search_url(self, name):
+        params = {'scope': self.scope, 'field': name}
+        if self.company_id is not None:
+            params['company'] = self.company_id
+        if self.allow_multiple_selected:
+            params['multiple'] = 1
+        return f"{reverse('user_search')}?{urlencode(params)}"
+
+    def format_value(self, value):
+        if value is None or value == '':
+            return []
+        values = value if isinstance(value, (list, tuple)) else [value]
+        return [str(v) for v in values if v not in (None, '')]
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        ids = [v for v in context['widget']['value'] if v.isdigit()]
+        # Подписи нужны только для уже выбранных пользователей
+        context['widget']['selected'] = list(
+            User.objects.filter(id__in=ids).only('id', 'email', 'user_name')
+        ) if ids else []
+        context['widget']['search_url'] = self.search_url(name)
+        context['widget']['multiple'] = self.allow_multiple_selected
+        return context
+
+    def render(self, name, value, attrs=None, renderer=None):
+        # Шаблон лежит в общем каталоге templates/, который видит только движок проекта
+        return render_to_string(self.template_name, self.get_context(name, value, attrs))
+
+    def value_from_datadict(self, data, files, name):
+        if self.allow_multiple_selected:
+            return data.getlist(name) if hasattr(data, 'getlist') else data.get(name)
+        return data.get(name)
+
+    def value_omitted_from_data(self, data, files, name):
+        if self.allow_multiple_selected:
+            return False
+        return name not in data
+
+
+class UserPickerMultipleWidget(UserPickerWidget):
+    allow_multiple_selected = True
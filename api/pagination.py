@@ -0,0 +1,15 @@
+from rest_framework.pagination import CursorPagination
+
+
+class SyncCursorPagination(CursorPagination):
+    """
+    Cursor pages ordered by id.
+
+    The cursor encodes the last seen id, so each page is an index range scan
+    whatever its depth and rows inserted during a sync are never skipped or
+    repeated; there is no COUNT query.
+    """
+    ordering = 'id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
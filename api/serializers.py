@@ -0,0 +1,115 @@
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from accounts.models import User
+from companies.models import Company
+from teams.models import Team
+from reviews.models import Achievement, AchievementScore, PerfReview
+
+
+def requested_fields(request, serializer_class):
+    """Field names asked for with ?fields=a,b (in declaration order), or None for all of them."""
+    raw = request.query_params.get('fields') if request is not None else None
+    if not raw:
+        return None
+    names = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = names - set(serializer_class.Meta.fields)
+    if unknown:
+        raise ParseError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in serializer_class.Meta.fields if name in names]
+
+
+class SparseFieldsetSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that honours ?fields= and knows which joins each field needs.
+
+    select_for_field / prefetch_for_field map a field name to the
+    select_related path or prefetch lookup it reads; optimize() applies only
+    those of the requested fields, so a sparse request also runs fewer queries.
+    """
+    select_for_field = {}
+    prefetch_for_field = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = requested_fields(self.context.get('request'), type(self))
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def optimize(cls, queryset, fields=None):
+        fields = fields or cls.Meta.fields
+        select = [cls.select_for_field[name] for name in fields if name in cls.select_for_field]
+        prefetch = [cls.prefetch_for_field[name] for name in fields if name in cls.prefetch_for_field]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        return queryset
+
+
+class UserSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'email', 'user_name']
+
+
+class ScoreSummarySerializer(serializers.Serializer):
+    score_count = serializers.IntegerField()
+    mean_score = serializers.FloatField()
+    min_score = serializers.IntegerField()
+    max_score = serializers.IntegerField()
+    self_peer_gap = serializers.FloatField()
+
+
+class CompanySerializer(SparseFieldsetSerializer):
+    class Meta:
+        model = Company
+        fields = ['id', 'company_name', 'company_description', 'created', 'edited']
+
+
+class TeamSerializer(SparseFieldsetSerializer):
+    company_name = serializers.CharField(source='company.company_name', read_only=True)
+
+    select_for_field = {'company_name': 'company'}
+
+    class Meta:
+        model = Team
+        fields = ['id', 'company', 'company_name', 'team_name', 'team_description', 'created', 'edited']
+
+
+class PerfReviewSerializer(SparseFieldsetSerializer):
+    user = UserSummarySerializer(read_only=True)
+    team_name = serializers.CharField(source='team.team_name', read_only=True)
+    score_summary = ScoreSummarySerializer(read_only=True)
+
+    select_for_field = {'user': 'user', 'team_name': 'team', 'score_summary': 'score_summary'}
+
+    class Meta:
+        model = PerfReview
+        fields = ['id', 'user', 'team', 'team_name', 'cycle', 'is_closed', 'score_summary', 'created', 'edited']
+
+
+class AchievementSerializer(SparseFieldsetSerializer):
+    review = serializers.PrimaryKeyRelatedField(source='perfreview', read_only=True)
+    reviewers = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    score_summary = ScoreSummarySerializer(read_only=True)
+
+    select_for_field = {'score_summary': 'score_summary'}
+    prefetch_for_field = {'reviewers': Prefetch('reviewers', queryset=User.objects.only('id'))}
+
+    class Meta:
+        model = Achievement
+        fields = ['id', 'review', 'title', 'self_score', 'reviewers', 'score_summary', 'created', 'edited']
+
+
+class AchievementScoreSerializer(SparseFieldsetSerializer):
+    review = serializers.IntegerField(source='achievement.perfreview_id', read_only=True)
+    reviewer = UserSummarySerializer(source='user', read_only=True)
+
+    select_for_field = {'review': 'achievement', 'reviewer': 'user'}
+
+    class Meta:
+        model = AchievementScore
+        fields = ['id', 'achievement', 'review', 'reviewer', 'score', 'comment', 'created', 'edited']
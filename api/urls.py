@@ -0,0 +1,17 @@
+from django.urls import include, path
+from rest_framework.routers import SimpleRouter
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from . import views
+
+router = SimpleRouter()
+router.register('companies', views.CompanyViewSet, basename='api-company')
+router.register('teams', views.TeamViewSet, basename='api-team')
+router.register('reviews', views.PerfReviewViewSet, basename='api-review')
+router.register('achievements', views.AchievementViewSet, basename='api-achievement')
+router.register('scores', views.AchievementScoreViewSet, basename='api-score')
+
+urlpatterns = [
+    path('auth/token/', TokenObtainPairView.as_view(), name='api_token_obtain'),
+    path('auth/token/refresh/', TokenRefreshView.as_view(), name='api_token_refresh'),
+    path('', include(router.urls)),
+]
@@ -0,0 +1,106 @@
+import hashlib
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status, viewsets
+from rest_framework.exceptions import ParseError
+from rest_framework.response import Response
+from accounts.permissions import get_membership_map
+from companies.models import Company
+from teams.models import Team
+from reviews.models import Achievement, AchievementScore, PerfReview
+from reviews.search import visible_reviews_q
+from .pagination import SyncCursorPagination
+from .serializers import (
+    AchievementScoreSerializer, AchievementSerializer, CompanySerializer, PerfReviewSerializer,
+    TeamSerializer, requested_fields,
+)
+
+
+class SyncViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only endpoint scoped to what the user may see.
+
+    Supports cursor pagination, ?fields= sparse fieldsets, ?updated_since=
+    (ISO datetime, compared with edited) for incremental syncs, the filters
+    in filter_params, and a strong ETag answered with 304 on If-None-Match.
+    """
+    pagination_class = SyncCursorPagination
+    # query-параметр -> lookup; значения — целые id
+    filter_params = {}
+
+    def get_visible_queryset(self):
+        raise NotImplementedError
+
+    def get_queryset(self):
+        queryset = self.get_visible_queryset()
+        params = self.request.query_params
+        for param, lookup in self.filter_params.items():
+            value = params.get(param)
+            if value:
+                if not value.isdigit():
+                    raise ParseError(f"{param} must be an id")
+                queryset = queryset.filter(**{lookup: int(value)})
+        if params.get('updated_since'):
+            updated_since = parse_datetime(params['updated_since'])
+            if updated_since is None:
+                raise ParseError("updated_since must be an ISO 8601 datetime")
+            queryset = queryset.filter(edited__gt=updated_since)
+        return self.serializer_class.optimize(queryset, requested_fields(self.request, self.serializer_class))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if request.method in ('GET', 'HEAD') and response.status_code == status.HTTP_200_OK:
+            payload = json.dumps(response.data, cls=DjangoJSONEncoder, sort_keys=True)
+            etag = quote_etag(hashlib.md5(payload.encode()).hexdigest())
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Один и тот же URL разные пользователи видят по-разному
+        patch_vary_headers(response, ['Authorization', 'Cookie'])
+        return response
+
+
+class CompanyViewSet(SyncViewSet):
+    serializer_class = CompanySerializer
+
+    def get_visible_queryset(self):
+        return Company.objects.filter(id__in=list(get_membership_map(self.request.user.id)['companies']))
+
+
+class TeamViewSet(SyncViewSet):
+    serializer_class = TeamSerializer
+    filter_params = {'company': 'company_id'}
+
+    def get_visible_queryset(self):
+        membership = get_membership_map(self.request.user.id)
+        return Team.objects.filter(
+            Q(id__in=list(membership['teams'])) | Q(company_id__in=list(membership['companies']))
+        )
+
+
+class PerfReviewViewSet(SyncViewSet):
+    serializer_class = PerfReviewSerializer
+    filter_params = {'team': 'team_id', 'company': 'team__company_id', 'cycle': 'cycle_id', 'user': 'user_id'}
+
+    def get_visible_queryset(self):
+        return PerfReview.objects.filter(visible_reviews_q(self.request.user))
+
+
+class AchievementViewSet(SyncViewSet):
+    serializer_class = AchievementSerializer
+    filter_params = {'review': 'perfreview_id', 'team': 'perfreview__team_id'}
+
+    def get_visible_queryset(self):
+        return Achievement.objects.filter(visible_reviews_q(self.request.user, 'perfreview'))
+
+
+class AchievementScoreViewSet(SyncViewSet):
+    serializer_class = AchievementScoreSerializer
+    filter_params = {'review': 'achievement__perfreview_id', 'achievement': 'achievement_id'}
+
+    def get_visible_queryset(self):
+        return AchievementScore.objects.filter(visible_reviews_q(self.request.user, 'achievement__perfreview'))
@@ -1,6 +1,8 @@
 from django import forms
 from .models import Company
 from accounts.models import User
+from accounts.widgets import SCOPE_CANDIDATES, UserPickerWidget
+from .listing import ROLE_EMPLOYEE, ROLE_MANAGER, ROLE_OWNER, SORT_JOB, SORT_NAME, SORT_ROLE
 
 class CompanyForm(forms.ModelForm):
     class Meta:
@@ -11,5 +13,39 @@ class CompanyForm(forms.ModelForm):
         }
 
 class CompanyUserForm(forms.Form):
-    user = forms.ModelChoiceField(queryset=User.objects.all())
+    # Typeahead вместо <select> со всеми пользователями; проверяется только присланный id
+    user = forms.ModelChoiceField(queryset=User.objects.all(), widget=UserPickerWidget(scope=SCOPE_CANDIDATES))
     is_manager = forms.BooleanField(required=False, initial=False)
+    
+    def __init__(self, *args, **kwargs):
+        company = kwargs.pop('company', None)
+        super(CompanyUserForm, self).__init__(*args, **kwargs)
+        
+        if company:
+            self.fields['user'].widget.company_id = company.id
+
+class MemberFilterForm(forms.Form):
+    """Filters and sort order of the members table on company_detail (GET)."""
+    q = forms.CharField(required=False, max_length=100)
+    role = forms.ChoiceField(required=False, choices=[
+        ('', 'Все роли'),
+        (ROLE_OWNER, 'Владельцы'),
+        (ROLE_MANAGER, 'Менеджеры'),
+        (ROLE_EMPLOYEE, 'Сотрудники'),
+    ])
+    job = forms.CharField(required=False, max_length=100)
+    sort = forms.ChoiceField(required=False, choices=[
+        (SORT_NAME, 'Имя'),
+        (SORT_JOB, 'Должность'),
+        (SORT_ROLE, 'Роль'),
+    ])
+    
+    def filters(self):
+        """Cleaned values with defaults; invalid input falls back to the unfiltered list."""
+        cleaned = self.cleaned_data if self.is_valid() else {}
+        return {
+            'q': (cleaned.get('q') or '').strip(),
+            'role': cleaned.get('role') or '',
+            'job': (cleaned.get('job') or '').strip(),
+            'sort': cleaned.get('sort') or SORT_NAME,
+        }
@@ -0,0 +1,74 @@
+from django.db.models import Case, Count, IntegerField, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from perfecto.keyset import keyset_page
+from teams.models import Team, TeamUsers
+from .models import CompanyUsers
+
+MEMBER_PAGE_SIZE = 50
+TEAM_PAGE_SIZE = 30
+
+# Части company_detail, которые HTMX подгружает отдельно (?section=)
+SECTION_MEMBERS = 'members'
+SECTION_TEAMS = 'teams'
+
+ROLE_OWNER = 'owner'
+ROLE_MANAGER = 'manager'
+ROLE_EMPLOYEE = 'employee'
+
+SORT_NAME = 'name'
+SORT_JOB = 'job'
+SORT_ROLE = 'role'
+
+# Порядок сортировки сотрудников; последний столбец уникален, чтобы курсор был однозначным
+MEMBER_ORDERINGS = {
+    SORT_NAME: ['user__user_name', 'id'],
+    SORT_JOB: ['user__user_job', 'user__user_name', 'id'],
+    SORT_ROLE: ['role_rank', 'user__user_name', 'id'],
+}
+
+ROLE_FILTERS = {
+    ROLE_OWNER: Q(is_owner=True),
+    ROLE_MANAGER: Q(is_owner=False, is_manager=True),
+    ROLE_EMPLOYEE: Q(is_owner=False, is_manager=False),
+}
+
+# Владельцы, затем менеджеры, затем сотрудники
+ROLE_RANK = Case(
+    When(is_owner=True, then=Value(0)),
+    When(is_manager=True, then=Value(1)),
+    default=Value(2),
+    output_field=IntegerField(),
+)
+
+
+def member_queryset(company, query='', role='', job=''):
+    """Company members matching the filters, with the user joined in."""
+    members = CompanyUsers.objects.filter(company=company).select_related('user').annotate(role_rank=ROLE_RANK)
+    if query:
+        members = members.filter(Q(user__user_name__icontains=query) | Q(user__email__istartswith=query))
+    if role in ROLE_FILTERS:
+        members = members.filter(ROLE_FILTERS[role])
+    if job:
+        members = members.filter(user__user_job__icontains=job)
+    return members
+
+
+def member_page(company, filters, cursor=None, page_size=MEMBER_PAGE_SIZE):
+    """
+    Return a KeysetPage of company members for the cleaned MemberFilterForm values.
+
+    A page costs one query whatever the company size or page depth.
+    """
+    members = member_queryset(company, filters['q'], filters['role'], filters['job'])
+    return keyset_page(members, MEMBER_ORDERINGS[filters['sort']], cursor, page_size)
+
+
+def team_page(company, cursor=None, page_size=TEAM_PAGE_SIZE):
+    """Return a KeysetPage of the company's teams by name, each with a member_count annotation."""
+    member_count = TeamUsers.objects.filter(
+        team=OuterRef('pk')
+    ).order_by().values('team').annotate(total=Count('id')).values('total')
+    teams = Team.objects.filter(company=company).annotate(
+        member_count=Coalesce(Subquery(member_count, output_field=IntegerField()), 0)
+    )
+    return keyset_page(teams, ['team_name', 'id'], cursor, page_size)
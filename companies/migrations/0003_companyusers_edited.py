@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("companies", "0002_alter_company_users_alter_companyusers_company_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="companyusers",
+            name="edited",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -21,6 +21,8 @@ class CompanyUsers(models.Model):
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='company_users')
     is_manager = models.BooleanField(default=False)
     is_owner = models.BooleanField(default=False)
+    # Смена роли должна менять версию страницы (perfecto.conditional)
+    edited = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name_plural = 'Company Users'
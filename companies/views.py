@@ -1,8 +1,16 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import urlencode
 from .models import Company, CompanyUsers
-from .forms import CompanyForm, CompanyUserForm
+from .forms import CompanyForm, CompanyUserForm, MemberFilterForm
+from .listing import SECTION_MEMBERS, SECTION_TEAMS, member_page, team_page
+from accounts.permissions import get_permissions
+from perfecto.conditional import conditional_page, page_stamp, stamp
+from perfecto.fragments import SCOPE_COMPANY, fragment_context
+from perfecto.instrumentation import query_budget
+from teams.models import Team
 
 @login_required
 def company_list(request):
@@ -30,28 +38,67 @@ def company_create(request):
     
     return render(request, 'companies/company_form.html', {'form': form})
 
+def company_detail_stamp(request, company_id):
+    """Version of everything company_detail shows, in one query."""
+    role = get_permissions(request).company_role(company_id)
+    if role is None:
+        return None
+    values = page_stamp(
+        Company.objects.filter(id=company_id),
+        **stamp('teams', Team.objects.filter(company_id=company_id), 'company_id'),
+        **stamp('members', CompanyUsers.objects.filter(company_id=company_id), 'company_id'),
+    )
+    if values is not None:
+        values.update(is_manager=role.is_manager, is_owner=role.is_owner)
+    return values
+
 @login_required
+@conditional_page(company_detail_stamp)
+@query_budget(12)
 def company_detail(request, company_id):
     """View company details."""
     company = get_object_or_404(Company, id=company_id)
     
     # Check if user is part of this company
-    try:
-        user_role = CompanyUsers.objects.get(user=request.user, company=company)
-        is_manager = user_role.is_manager
-        is_owner = user_role.is_owner
-    except CompanyUsers.DoesNotExist:
+    perms = get_permissions(request)
+    if not perms.can_view_company(company):
         return HttpResponseForbidden("You don't have access to this company")
+    role = perms.company_role(company.id)
+    is_manager = role.is_manager
+    is_owner = role.is_owner
     
-    company_users = CompanyUsers.objects.filter(company=company)
-    
+    filter_form = MemberFilterForm(request.GET)
+    filters = filter_form.filters()
     context = {
         'company': company,
-        'company_users': company_users,
+        'filter_form': filter_form,
+        'filters': filters,
+        # Фильтры без сортировки и курсора — для ссылок сортировки и подгрузки страниц
+        'member_query': urlencode({key: value for key, value in filters.items() if value and key != 'sort'}),
         'is_manager': is_manager,
-        'is_owner': is_owner
+        'is_owner': is_owner,
+        'can_manage': is_manager or is_owner,
     }
     
+    # HTMX: следующая страница списка или таблица сотрудников после смены фильтра/сортировки
+    section = request.GET.get('section')
+    cursor = request.GET.get('cursor')
+    if request.htmx and section == SECTION_MEMBERS:
+        context['company_users'] = member_page(company, filters, cursor)
+        template = 'companies/_member_rows.html' if cursor else 'companies/_member_table.html'
+        return render(request, template, context)
+    if request.htmx and section == SECTION_TEAMS:
+        context['teams'] = team_page(company, cursor)
+        return render(request, 'companies/_team_cards.html', context)
+    
+    # Первые страницы загружаются, только если их фрагменты не найдены в кэше
+    context.update({
+        'company_users': SimpleLazyObject(lambda: member_page(company, filters)),
+        'members_total': lambda: CompanyUsers.objects.filter(company=company).count(),
+        'teams': SimpleLazyObject(lambda: team_page(company)),
+        'teams_total': lambda: company.teams.count(),
+        **fragment_context(SCOPE_COMPANY, company.id),
+    })
     return render(request, 'companies/company_detail.html', context)
 
 @login_required
@@ -60,15 +107,14 @@ def company_add_user(request, company_id):
     company = get_object_or_404(Company, id=company_id)
     
     # Verify the current user is a manager or owner
-    try:
-        user_role = CompanyUsers.objects.get(user=request.user, company=company)
-        if not (user_role.is_manager or user_role.is_owner):
-            return HttpResponseForbidden("You don't have permissions to add users to this company")
-    except CompanyUsers.DoesNotExist:
+    perms = get_permissions(request)
+    if not perms.can_view_company(company):
         return HttpResponseForbidden("You don't have access to this company")
+    if not perms.can_manage_company(company):
+        return HttpResponseForbidden("You don't have permissions to add users to this company")
     
     if request.method == 'POST':
-        form = CompanyUserForm(request.POST)
+        form = CompanyUserForm(request.POST, company=company)
         if form.is_valid():
             new_user = form.cleaned_data['user']
             is_manager = form.cleaned_data['is_manager']
@@ -86,7 +132,7 @@ def company_add_user(request, company_id):
             
             return redirect('company_detail', company_id=company.id)
     else:
-        form = CompanyUserForm()
+        form = CompanyUserForm(company=company)
     
     return render(request, 'companies/company_add_user.html', {
         'form': form,
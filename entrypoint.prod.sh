@@ -72,6 +72,9 @@ fi
 echo "🔄 Применение миграций..."
 python manage.py migrate --noinput
 
+# Таблица для DatabaseCache (команда ничего не делает для других бэкендов)
+python manage.py createcachetable
+
 # Собираем статические файлы
 echo "📦 Сбор статических файлов..."
 python manage.py collectstatic --noinput
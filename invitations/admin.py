@@ -1,10 +1,11 @@
 from django.contrib import admin
-from .models import Invitation
+from .models import Invitation, ArchivedInvitation
 
 @admin.register(Invitation)
 class InvitationAdmin(admin.ModelAdmin):
     list_display = ('id', 'invitation_type', 'target_name', 'created_by', 'created_at', 'expires_at', 'is_expired')
     list_filter = ('invitation_type', 'is_manager_invite', 'created_at')
+    list_select_related = ('created_by', 'company', 'team')
     search_fields = ('created_by__email', 'company__company_name', 'team__team_name')
     readonly_fields = ('id', 'created_at')
     date_hierarchy = 'created_at'
@@ -17,3 +18,11 @@ class InvitationAdmin(admin.ModelAdmin):
     def target_name(self, obj):
         return obj.target_name
     target_name.short_description = 'Target'
+
+@admin.register(ArchivedInvitation)
+class ArchivedInvitationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'invitation_type', 'company', 'created_by', 'expires_at', 'archived_at')
+    list_filter = ('invitation_type',)
+    list_select_related = ('company', 'created_by')
+    search_fields = ('created_by__email', 'company__company_name', 'email')
+    date_hierarchy = 'archived_at'
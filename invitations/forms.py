@@ -2,6 +2,8 @@ from django import forms
 from .models import Invitation
 from accounts.models import User
 from django.core.validators import validate_email
+from .services import BULK_INVITATION_LIMIT, parse_email_list
+import codecs
 
 class InvitationForm(forms.ModelForm):
     """Form for creating new invitations."""
@@ -31,3 +33,30 @@ class InvitationAcceptForm(forms.Form):
         widget=forms.RadioSelect,
         initial='accept'
     )
+
+class BulkInvitationForm(forms.Form):
+    """Form for inviting many people at once from a pasted list or a CSV file."""
+    emails = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 8}),
+        help_text="Email-адреса через запятую, пробел или с новой строки"
+    )
+    file = forms.FileField(required=False, help_text="Или CSV-файл с колонкой email (иначе берётся первая колонка)")
+    is_manager_invite = forms.BooleanField(required=False, initial=False)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get('file')
+        csv_lines = codecs.iterdecode(upload, 'utf-8-sig') if upload else None
+        try:
+            emails, invalid, duplicates = parse_email_list(cleaned_data.get('emails', ''), csv_lines)
+        except UnicodeDecodeError:
+            raise forms.ValidationError("Файл должен быть в кодировке UTF-8")
+        if not emails and not invalid:
+            raise forms.ValidationError("Укажите хотя бы один email")
+        if len(emails) > BULK_INVITATION_LIMIT:
+            raise forms.ValidationError(f"Не больше {BULK_INVITATION_LIMIT} адресов за раз")
+        cleaned_data['email_list'] = emails
+        cleaned_data['invalid_emails'] = invalid
+        cleaned_data['duplicate_count'] = duplicates
+        return cleaned_data
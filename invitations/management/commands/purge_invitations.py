@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from invitations.services import PURGE_BATCH_SIZE, RETENTION_DAYS, purge_expired_invitations
+
+
+class Command(BaseCommand):
+    help = 'Delete or archive invitations that expired more than --retention-days ago (run daily from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE)
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Move expired invitations to the archive table instead of deleting them',
+        )
+
+    def handle(self, *args, **options):
+        removed = purge_expired_invitations(
+            retention_days=options['retention_days'],
+            batch_size=options['batch_size'],
+            archive=options['archive'],
+        )
+        action = 'Archived' if options['archive'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{action} {removed} expired invitation(s)'))
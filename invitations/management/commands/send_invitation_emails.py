@@ -0,0 +1,25 @@
+import time
+from django.core.management.base import BaseCommand
+from invitations.services import DELIVERY_BATCH_SIZE, deliver_pending_invitations
+
+
+class Command(BaseCommand):
+    help = 'Email queued invitations in batches over a single SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DELIVERY_BATCH_SIZE)
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new invitations instead of exiting when the queue is empty',
+        )
+        parser.add_argument('--interval', type=float, default=10.0, help='Polling interval with --loop, seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            sent = deliver_pending_invitations(batch_size=options['batch_size'])
+            if sent:
+                self.stdout.write(f"Sent {sent} invitation(s)")
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("teams", "0002_alter_team_users_alter_teamusers_team_and_more"),
+        ("companies", "0002_alter_company_users_alter_companyusers_company_and_more"),
+        ("invitations", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedInvitation",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(editable=False, primary_key=True, serialize=False),
+                ),
+                (
+                    "invitation_type",
+                    models.CharField(
+                        choices=[("company", "Company"), ("team", "Team")],
+                        max_length=10,
+                    ),
+                ),
+                ("created_at", models.DateTimeField()),
+                ("expires_at", models.DateTimeField()),
+                ("is_manager_invite", models.BooleanField(default=False)),
+                ("email", models.EmailField(blank=True, max_length=254, null=True)),
+                ("archived_at", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "verbose_name_plural": "Archived Invitations",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="invitation",
+            index=models.Index(
+                fields=["created_by", "expires_at"],
+                name="invitation_creator_expiry_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invitation",
+            index=models.Index(fields=["expires_at"], name="invitation_expiry_idx"),
+        ),
+        migrations.AddField(
+            model_name="archivedinvitation",
+            name="company",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_invitations",
+                to="companies.company",
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedinvitation",
+            name="created_by",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="archived_invitations",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedinvitation",
+            name="team",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="archived_invitations",
+                to="teams.team",
+            ),
+        ),
+    ]
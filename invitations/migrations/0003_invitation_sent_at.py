@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:07
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_as_sent(apps, schema_editor):
+    # Приглашения, созданные до рассылки, раздавались ссылкой — не отправляем им письма задним числом
+    Invitation = apps.get_model("invitations", "Invitation")
+    Invitation.objects.filter(email__isnull=False, sent_at__isnull=True).update(sent_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("invitations", "0002_invitation_expiry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invitation",
+            name="sent_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="invitation",
+            index=models.Index(
+                condition=models.Q(("email__isnull", False), ("sent_at__isnull", True)),
+                fields=["created_at"],
+                name="invitation_unsent_idx",
+            ),
+        ),
+        migrations.RunPython(mark_existing_as_sent, migrations.RunPython.noop),
+    ]
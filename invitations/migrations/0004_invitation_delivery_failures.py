@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("invitations", "0003_invitation_sent_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="invitation",
+            name="delivery_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="invitation",
+            name="delivery_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="invitation",
+            name="delivery_failed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -7,6 +7,15 @@ from accounts.models import User
 from companies.models import Company
 from teams.models import Team
 
+class InvitationQuerySet(models.QuerySet):
+    """Expiry filters evaluated by the database instead of Invitation.is_expired."""
+    
+    def active(self, now=None):
+        return self.filter(expires_at__gte=now or timezone.now())
+    
+    def expired(self, now=None):
+        return self.filter(expires_at__lt=now or timezone.now())
+
 class Invitation(models.Model):
     """Model for tracking invitations to companies and teams."""
     
@@ -27,6 +36,27 @@ class Invitation(models.Model):
     expires_at = models.DateTimeField()
     is_manager_invite = models.BooleanField(default=False)
     email = models.EmailField(blank=True, null=True)  # Optional: specific email for invitation
+    # Когда письмо с приглашением отправлено; NULL у приглашений с email — очередь рассылки
+    sent_at = models.DateTimeField(null=True, blank=True)
+    # Неудачные попытки отправки; после постоянной ошибки приглашение покидает очередь
+    delivery_attempts = models.PositiveSmallIntegerField(default=0)
+    delivery_error = models.TextField(blank=True)
+    delivery_failed_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = InvitationQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            # Списки активных/истекших приглашений пользователя
+            models.Index(fields=['created_by', 'expires_at'], name='invitation_creator_expiry_idx'),
+            # Пакетная очистка истекших приглашений
+            models.Index(fields=['expires_at'], name='invitation_expiry_idx'),
+            models.Index(
+                fields=['created_at'],
+                name='invitation_unsent_idx',
+                condition=models.Q(sent_at__isnull=True, email__isnull=False),
+            ),
+        ]
     
     def save(self, *args, **kwargs):
         # Set expiration date to 7 days from now if not specified
@@ -54,3 +84,30 @@ class Invitation(models.Model):
         if self.invitation_type == self.TYPE_TEAM:
             return f"Invitation to {self.team.team_name} team"
         return f"Invitation to {self.company.company_name} company"
+
+class ArchivedInvitation(models.Model):
+    """Expired invitation moved out of the live table by the purge_invitations command."""
+    id = models.UUIDField(primary_key=True, editable=False)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='archived_invitations'
+    )
+    invitation_type = models.CharField(max_length=10, choices=Invitation.INVITATION_TYPES)
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='archived_invitations')
+    team = models.ForeignKey(
+        Team, on_delete=models.CASCADE, null=True, blank=True, related_name='archived_invitations'
+    )
+    created_at = models.DateTimeField()
+    expires_at = models.DateTimeField()
+    is_manager_invite = models.BooleanField(default=False)
+    email = models.EmailField(blank=True, null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name_plural = 'Archived Invitations'
+    
+    @property
+    def is_expired(self):
+        return True
+    
+    def __str__(self):
+        return f"Archived invitation {self.id}"
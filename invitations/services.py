@@ -0,0 +1,219 @@
+import csv
+import logging
+import re
+import smtplib
+from datetime import timedelta
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMessage, get_connection
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.template.loader import render_to_string
+from django.utils import timezone
+from accounts.counters import invalidate_counters
+from companies.models import CompanyUsers
+from teams.models import TeamUsers
+from .models import ArchivedInvitation, Invitation
+
+logger = logging.getLogger(__name__)
+
+PURGE_BATCH_SIZE = 1000
+# Истекшие приглашения ещё столько дней видны в списке «Истекшие»
+RETENTION_DAYS = 30
+
+ARCHIVED_FIELDS = [
+    'id', 'created_by_id', 'invitation_type', 'company_id', 'team_id',
+    'created_at', 'expires_at', 'is_manager_invite', 'email',
+]
+
+
+def purge_expired_invitations(retention_days=RETENTION_DAYS, batch_size=PURGE_BATCH_SIZE, archive=False, now=None):
+    """
+    Delete (or move to ArchivedInvitation) invitations expired more than retention_days ago.
+
+    Works in batches of primary keys walked along the expires_at index, one
+    transaction per batch, so the table is never locked for long.
+    Returns the number of removed invitations.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=retention_days)
+    removed = 0
+    while True:
+        rows = list(
+            Invitation.objects.expired(cutoff).order_by('expires_at').values_list('id', 'created_by_id')[:batch_size]
+        )
+        if not rows:
+            return removed
+        ids = [invitation_id for invitation_id, _ in rows]
+        with transaction.atomic():
+            batch = Invitation.objects.filter(id__in=ids)
+            if archive:
+                ArchivedInvitation.objects.bulk_create(
+                    [ArchivedInvitation(**row) for row in batch.values(*ARCHIVED_FIELDS)],
+                    ignore_conflicts=True
+                )
+            batch.delete()
+        invalidate_counters(created_by_id for _, created_by_id in rows)
+        removed += len(ids)
+
+
+BULK_INVITATION_LIMIT = 5000
+DELIVERY_BATCH_SIZE = 100
+# После стольких временных ошибок (4xx) приглашение больше не отправляется
+MAX_DELIVERY_ATTEMPTS = 5
+
+EMAIL_SEPARATORS = re.compile(r'[\s,;]+')
+
+
+class BulkInvitationResult:
+    """Outcome of create_bulk_invitations."""
+
+    def __init__(self):
+        self.created = []
+        self.already_invited = []
+
+
+def parse_email_list(text='', csv_lines=None):
+    """
+    Collect emails from pasted text and/or CSV lines.
+
+    CSV rows contribute their 'email' column when the header has one,
+    otherwise their first column. Returns (unique lowercased emails in input
+    order, invalid entries, number of repeated entries).
+    """
+    candidates = [token for token in EMAIL_SEPARATORS.split(text or '') if token]
+    if csv_lines is not None:
+        rows = list(csv.reader(csv_lines))
+        header = [cell.strip().lower() for cell in rows[0]] if rows else []
+        column = 0
+        if 'email' in header:
+            column = header.index('email')
+            rows = rows[1:]
+        candidates.extend(row[column].strip() for row in rows if len(row) > column and row[column].strip())
+
+    emails, invalid, seen = [], [], set()
+    duplicates = 0
+    for candidate in candidates:
+        email = candidate.lower()
+        try:
+            validate_email(email)
+        except ValidationError:
+            invalid.append(candidate)
+            continue
+        if email in seen:
+            duplicates += 1
+            continue
+        seen.add(email)
+        emails.append(email)
+    return emails, invalid, duplicates
+
+
+def _taken_emails(emails, company, team):
+    """Emails that already belong to a member of the target or have an open invitation, in one query."""
+    if team is not None:
+        members = TeamUsers.objects.filter(team=team)
+        invited = Invitation.objects.active().filter(team=team)
+    else:
+        members = CompanyUsers.objects.filter(company=company)
+        invited = Invitation.objects.active().filter(company=company, team__isnull=True)
+    members = members.annotate(address=Lower('user__email')).filter(address__in=emails).values_list('address')
+    invited = invited.annotate(address=Lower('email')).filter(address__in=emails).values_list('address')
+    return {address for address, in members.union(invited)}
+
+
+def create_bulk_invitations(created_by, company, emails, team=None, is_manager_invite=False):
+    """
+    Create one invitation per email that is neither a member of the target nor already invited.
+
+    Invitations are bulk-created with sent_at empty, which queues them for
+    deliver_pending_invitations.
+    """
+    result = BulkInvitationResult()
+    taken = _taken_emails(emails, company, team)
+    result.already_invited = [email for email in emails if email in taken]
+    expires_at = timezone.now() + timedelta(days=7)
+    result.created = Invitation.objects.bulk_create([
+        Invitation(
+            created_by=created_by,
+            invitation_type=Invitation.TYPE_TEAM if team is not None else Invitation.TYPE_COMPANY,
+            company=company,
+            team=team,
+            email=email,
+            is_manager_invite=is_manager_invite,
+            expires_at=expires_at,
+        )
+        for email in emails
+        if email not in taken
+    ])
+    invalidate_counters([created_by.id])
+    return result
+
+
+def _invitation_message(invitation):
+    context = {
+        'invitation': invitation,
+        'accept_url': f"{settings.SITE_URL}{invitation.get_absolute_url()}",
+    }
+    return EmailMessage(
+        subject=render_to_string('invitations/email/invitation_subject.txt', context).strip(),
+        body=render_to_string('invitations/email/invitation.txt', context),
+        to=[invitation.email],
+    )
+
+
+def _is_permanent(exc):
+    """SMTP 5xx answers (refused recipient, rejected data) will not succeed on retry."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    return exc.smtp_code >= 500
+
+
+def _record_failure(invitation, exc):
+    invitation.delivery_attempts += 1
+    invitation.delivery_error = str(exc)[:1000]
+    if _is_permanent(exc) or invitation.delivery_attempts >= MAX_DELIVERY_ATTEMPTS:
+        invitation.delivery_failed_at = timezone.now()
+    invitation.save(update_fields=['delivery_attempts', 'delivery_error', 'delivery_failed_at'])
+
+
+def deliver_pending_invitations(batch_size=DELIVERY_BATCH_SIZE, connection=None):
+    """
+    Email every queued (unsent, active) invitation, batch by batch, over one mail connection.
+
+    The connection is opened once and reused for all batches. Messages are
+    sent one by one and each invitation is marked sent as soon as the server
+    accepts it, so a dropped connection never re-sends accepted mail. A
+    refused message is recorded on the invitation instead of stopping the
+    run: permanent (5xx) errors and the MAX_DELIVERY_ATTEMPTS-th transient
+    one take it out of the queue. Returns the number of sent invitations.
+    """
+    connection = connection or get_connection()
+    sent = 0
+    pending = Invitation.objects.active().filter(
+        sent_at__isnull=True, delivery_failed_at__isnull=True, email__isnull=False
+    ).exclude(email='').select_related('company', 'team', 'created_by').order_by('created_at', 'id')
+
+    connection.open()
+    try:
+        last = None
+        while True:
+            # Идём по (created_at, id): отклонённые в этом запуске остаются в очереди, но не повторяются
+            batch = pending if last is None else pending.filter(
+                Q(created_at__gt=last.created_at) | Q(created_at=last.created_at, id__gt=last.id)
+            )
+            batch = list(batch[:batch_size])
+            if not batch:
+                return sent
+            for invitation in batch:
+                try:
+                    connection.send_messages([_invitation_message(invitation)])
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as exc:
+                    logger.warning("Invitation %s to %s was not delivered: %s", invitation.id, invitation.email, exc)
+                    _record_failure(invitation, exc)
+                    continue
+                Invitation.objects.filter(id=invitation.id).update(sent_at=timezone.now())
+                sent += 1
+            last = batch[-1]
+    finally:
+        connection.close()
@@ -0,0 +1,14 @@
+from jobs.queue import PRIORITY_HIGH, enqueue, task
+from .services import deliver_pending_invitations
+
+DELIVER_TASK = 'invitations.deliver'
+
+
+@task(DELIVER_TASK, priority=PRIORITY_HIGH)
+def deliver_invitations_task():
+    deliver_pending_invitations()
+
+
+def queue_delivery():
+    """Ask a worker to email queued invitations; a delivery already waiting covers new ones too."""
+    return enqueue(DELIVER_TASK, key=DELIVER_TASK)
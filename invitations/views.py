@@ -2,12 +2,17 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden, Http404
 from django.contrib import messages
+from django.core.paginator import Paginator
 from django.urls import reverse
 from django.utils import timezone
-from .models import Invitation
-from .forms import InvitationForm, InvitationAcceptForm
+from .models import Invitation, ArchivedInvitation
+from .forms import InvitationForm, InvitationAcceptForm, BulkInvitationForm
+from .services import create_bulk_invitations
+from .tasks import queue_delivery
+from notifications.events import invitations_created
 from companies.models import Company, CompanyUsers
 from teams.models import Team, TeamUsers
+from accounts.permissions import get_permissions
 
 @login_required
 def create_company_invitation(request, company_id):
@@ -15,12 +20,11 @@ def create_company_invitation(request, company_id):
     company = get_object_or_404(Company, id=company_id)
     
     # Check if user has permission
-    try:
-        company_user = CompanyUsers.objects.get(user=request.user, company=company)
-        if not company_user.is_manager and not company_user.is_owner:
-            return HttpResponseForbidden("У вас нет прав для приглашения пользователей в эту компанию")
-    except CompanyUsers.DoesNotExist:
+    perms = get_permissions(request)
+    if not perms.can_view_company(company):
         return HttpResponseForbidden("У вас нет доступа к этой компании")
+    if not perms.can_manage_company(company):
+        return HttpResponseForbidden("У вас нет прав для приглашения пользователей в эту компанию")
     
     if request.method == 'POST':
         form = InvitationForm(request.POST)
@@ -30,6 +34,9 @@ def create_company_invitation(request, company_id):
             invitation.invitation_type = Invitation.TYPE_COMPANY
             invitation.company = company
             invitation.save()
+            if invitation.email:
+                invitations_created([invitation])
+                queue_delivery()
             
             invite_url = request.build_absolute_uri(
                 reverse('invitation_accept', kwargs={'uuid': invitation.id})
@@ -53,20 +60,11 @@ def create_company_invitation(request, company_id):
 @login_required
 def create_team_invitation(request, team_id):
     """Create an invitation to join a team."""
-    team = get_object_or_404(Team, id=team_id)
+    team = get_object_or_404(Team.objects.select_related('company'), id=team_id)
     company = team.company
     
     # Check if user has permission (team manager, team owner, company manager, or company owner)
-    has_permission = False
-    try:
-        team_user = TeamUsers.objects.get(user=request.user, team=team)
-        has_permission = team_user.is_manager or team_user.is_owner
-    except TeamUsers.DoesNotExist:
-        try:
-            company_user = CompanyUsers.objects.get(user=request.user, company=company)
-            has_permission = company_user.is_manager or company_user.is_owner
-        except CompanyUsers.DoesNotExist:
-            pass
+    has_permission = get_permissions(request).can_manage_team(team)
     
     if not has_permission:
         return HttpResponseForbidden("У вас нет прав для приглашения пользователей в эту команду")
@@ -80,6 +78,9 @@ def create_team_invitation(request, team_id):
             invitation.company = company
             invitation.team = team
             invitation.save()
+            if invitation.email:
+                invitations_created([invitation])
+                queue_delivery()
             
             invite_url = request.build_absolute_uri(
                 reverse('invitation_accept', kwargs={'uuid': invitation.id})
@@ -101,9 +102,62 @@ def create_team_invitation(request, team_id):
         'invitation_type': 'команду'
     })
 
+def _bulk_invitation(request, company, team=None):
+    """Shared POST handling of the bulk invitation pages."""
+    result = None
+    if request.method == 'POST':
+        form = BulkInvitationForm(request.POST, request.FILES)
+        if form.is_valid():
+            result = create_bulk_invitations(
+                request.user,
+                company,
+                form.cleaned_data['email_list'],
+                team=team,
+                is_manager_invite=form.cleaned_data['is_manager_invite']
+            )
+            if result.created:
+                invitations_created(result.created)
+                queue_delivery()
+                messages.success(
+                    request,
+                    f"Создано приглашений: {len(result.created)}. Письма будут отправлены в ближайшее время."
+                )
+    else:
+        form = BulkInvitationForm()
+    
+    return render(request, 'invitations/bulk_invitation.html', {
+        'form': form,
+        'result': result,
+        'company': company,
+        'team': team
+    })
+
+@login_required
+def bulk_company_invitation(request, company_id):
+    """Invite a list of emails to a company at once."""
+    company = get_object_or_404(Company, id=company_id)
+    
+    if not get_permissions(request).can_manage_company(company):
+        return HttpResponseForbidden("У вас нет прав для приглашения пользователей в эту компанию")
+    
+    return _bulk_invitation(request, company)
+
+@login_required
+def bulk_team_invitation(request, team_id):
+    """Invite a list of emails to a team at once."""
+    team = get_object_or_404(Team.objects.select_related('company'), id=team_id)
+    
+    if not get_permissions(request).can_manage_team(team):
+        return HttpResponseForbidden("У вас нет прав для приглашения пользователей в эту команду")
+    
+    return _bulk_invitation(request, team.company, team)
+
 def invitation_accept(request, uuid):
     """Handle invitation acceptance."""
-    invitation = get_object_or_404(Invitation, id=uuid)
+    invitation = Invitation.objects.select_related('company', 'team').filter(id=uuid).first()
+    if invitation is None:
+        # Очищенные командой purge_invitations --archive приглашения показываем как истекшие
+        invitation = get_object_or_404(ArchivedInvitation, id=uuid)
     
     # Check if invitation has expired
     if invitation.is_expired:
@@ -169,16 +223,24 @@ def invitation_accept(request, uuid):
         request.session['pending_invitation'] = str(invitation.id)
         return redirect('register')
 
+INVITATIONS_PAGE_SIZE = 25
+
 @login_required
 def invitation_list(request):
     """Show list of invitations created by the user."""
-    invitations = Invitation.objects.filter(created_by=request.user).order_by('-created_at')
+    now = timezone.now()
+    invitations = Invitation.objects.filter(created_by=request.user).select_related('company', 'team')
     
-    # Filter out expired invitations
-    active_invitations = [inv for inv in invitations if not inv.is_expired]
-    expired_invitations = [inv for inv in invitations if inv.is_expired]
+    # Активные и истекшие разделяются в запросе (индекс created_by, expires_at)
+    active_invitations = Paginator(
+        invitations.active(now).order_by('-created_at'), INVITATIONS_PAGE_SIZE
+    ).get_page(request.GET.get('active_page'))
+    expired_invitations = Paginator(
+        invitations.expired(now).order_by('-expires_at'), INVITATIONS_PAGE_SIZE
+    ).get_page(request.GET.get('expired_page'))
     
     return render(request, 'invitations/invitation_list.html', {
         'active_invitations': active_invitations,
-        'expired_invitations': expired_invitations
+        'expired_invitations': expired_invitations,
+        'show_expired': 'expired_page' in request.GET
     })
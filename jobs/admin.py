@@ -0,0 +1,19 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'priority', 'attempts', 'run_at', 'locked_by', 'finished_at')
+    list_filter = ('status', 'task')
+    search_fields = ('task', 'key')
+    readonly_fields = ('created', 'locked_by', 'locked_at', 'finished_at', 'last_error')
+    date_hierarchy = 'created'
+    actions = ['retry_now']
+    
+    @admin.action(description='Retry now')
+    def retry_now(self, request, queryset):
+        updated = queryset.filter(status__in=[Job.STATUS_QUEUED, Job.STATUS_FAILED]).update(
+            status=Job.STATUS_QUEUED, run_at=timezone.now(), attempts=0, key=None
+        )
+        self.message_user(request, f"Queued {updated} job(s)")
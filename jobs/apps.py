@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+    verbose_name = 'Фоновые задачи'
+    
+    def ready(self):
+        # Задачи регистрируются декоратором @task в модулях tasks.py приложений
+        autodiscover_modules('tasks')
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from jobs.worker import PURGE_BATCH_SIZE, RETENTION_DAYS, purge_finished_jobs
+
+
+class Command(BaseCommand):
+    help = 'Delete done and failed jobs finished more than --retention-days ago (run daily from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--retention-days', type=int, default=RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=PURGE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        removed = purge_finished_jobs(retention_days=options['retention_days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {removed} finished job(s)'))
@@ -0,0 +1,74 @@
+import multiprocessing
+import signal
+from django.core.management.base import BaseCommand
+from django.db import connections
+from jobs.worker import POLL_INTERVAL, work, worker_name
+
+
+class StopFlag:
+    """Set by SIGTERM/SIGINT; the worker finishes its current job and exits."""
+
+    def __init__(self):
+        self.stopped = False
+        self.previous = {
+            signum: signal.signal(signum, self.stop) for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+
+    def restore(self):
+        for signum, handler in self.previous.items():
+            signal.signal(signum, handler)
+
+    def stop(self, *args):
+        self.stopped = True
+
+    def __call__(self):
+        return self.stopped
+
+
+def run_worker_process(burst, interval):
+    stop = StopFlag()
+    work(worker_name(), burst=burst, interval=interval, should_stop=stop)
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1, help='Number of worker processes')
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue has no ready jobs instead of polling',
+        )
+        parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help='Polling interval when idle, seconds')
+
+    def handle(self, *args, **options):
+        if options['processes'] <= 1:
+            stop = StopFlag()
+            try:
+                done = work(worker_name(), burst=options['burst'], interval=options['interval'], should_stop=stop)
+            finally:
+                stop.restore()
+            self.stdout.write(f"Ran {done} job(s)")
+            return
+
+        # Дочерние процессы не должны делить унаследованное соединение с БД
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=run_worker_process, args=(options['burst'], options['interval']), daemon=True)
+            for _ in range(options['processes'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Started {len(processes)} worker process(es)")
+
+        def forward(signum, frame):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for process in processes:
+            process.join()
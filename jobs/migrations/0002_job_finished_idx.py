@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 13:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("jobs", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(("status__in", ["done", "failed"])),
+                fields=["finished_at"],
+                name="job_finished_idx",
+            ),
+        ),
+    ]
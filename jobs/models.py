@@ -0,0 +1,54 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+class Job(models.Model):
+    """A unit of background work stored in the database and run by jobs.worker."""
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    task = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, blank=True)
+    # Пока задача в очереди, второй такой же ключ не ставится (см. jobs.queue.enqueue)
+    key = models.CharField(max_length=200, null=True, blank=True)
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            # Выборка воркера: только готовые к запуску задачи, в порядке приоритета
+            models.Index(
+                fields=['-priority', 'run_at', 'id'],
+                name='job_ready_idx',
+                condition=Q(status='queued')
+            ),
+            models.Index(fields=['locked_at'], name='job_running_idx', condition=Q(status='running')),
+            # Очистка завершённых задач (purge_finished_jobs)
+            models.Index(
+                fields=['finished_at'],
+                name='job_finished_idx',
+                condition=Q(status__in=['done', 'failed'])
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['key'], name='job_queued_key_uniq', condition=Q(status='queued')),
+        ]
+    
+    def __str__(self):
+        return f"{self.task} #{self.id} ({self.status})"
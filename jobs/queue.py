@@ -0,0 +1,76 @@
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from .models import Job
+
+PRIORITY_LOW = -10
+PRIORITY_NORMAL = 0
+PRIORITY_HIGH = 10
+
+MAX_ATTEMPTS = 5
+
+_registry = {}
+
+
+class Task:
+    """A registered background function with its default priority and retry limit."""
+
+    def __init__(self, name, func, priority, max_attempts):
+        self.name = name
+        self.func = func
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def __call__(self, **payload):
+        return self.func(**payload)
+
+    def enqueue(self, **payload):
+        return enqueue(self.name, payload)
+
+
+def task(name, priority=PRIORITY_NORMAL, max_attempts=MAX_ATTEMPTS):
+    """
+    Register a function as a background task under a stable name.
+
+    The function takes keyword arguments only; they are stored as the job's
+    JSON payload, so pass ids rather than model instances.
+    """
+    def decorator(func):
+        _registry[name] = Task(name, func, priority, max_attempts)
+        return _registry[name]
+    return decorator
+
+
+def get_task(name):
+    return _registry[name]
+
+
+def enqueue(name, payload=None, priority=None, delay=0, key=None, run_at=None):
+    """
+    Queue a job for a registered task and return it.
+
+    The row is written in the caller's transaction: a rolled back request
+    never leaves a job behind, and workers only see it after commit. With a
+    key, nothing is queued while a job with the same key is still waiting;
+    the existing job will pick up the new work, and None is returned.
+    run_at schedules the job for a moment instead of a delay in seconds.
+    """
+    registered = get_task(name)
+    job = Job(
+        task=name,
+        payload=payload or {},
+        key=key,
+        priority=registered.priority if priority is None else priority,
+        max_attempts=registered.max_attempts,
+        run_at=run_at or timezone.now() + timedelta(seconds=delay),
+    )
+    if key is None:
+        job.save()
+        return job
+    # Частичный уникальный индекс по key отсекает дубль без гонки между запросами
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return None
+    return job
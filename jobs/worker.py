@@ -0,0 +1,204 @@
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import nullcontext
+from datetime import timedelta
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Job
+from .queue import get_task
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0
+# Задержка перед повтором: BACKOFF_BASE * 2^(попытка-1), но не больше BACKOFF_MAX
+BACKOFF_BASE = 10
+BACKOFF_MAX = 3600
+# Воркер обновляет locked_at выполняемой задачи раз в HEARTBEAT_INTERVAL секунд;
+# задача без отметки дольше STALE_AFTER считается брошенной упавшим воркером
+HEARTBEAT_INTERVAL = 60
+STALE_AFTER = timedelta(minutes=10)
+# Завершённые задачи хранятся столько дней (purge_finished_jobs)
+RETENTION_DAYS = 14
+PURGE_BATCH_SIZE = 1000
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+
+
+def claim_job(worker, now=None, task=None):
+    """
+    Lock the most urgent ready job (of one task, if given) for this worker and return it, or None.
+
+    On Postgres the row is picked with FOR UPDATE SKIP LOCKED, so concurrent
+    workers never wait on each other. SQLite ignores FOR UPDATE; there the
+    conditional UPDATE on status makes a claim succeed for only one worker.
+    """
+    now = now or timezone.now()
+    ready = Job.objects.filter(status=Job.STATUS_QUEUED, run_at__lte=now).order_by('-priority', 'run_at', 'id')
+    if task is not None:
+        ready = ready.filter(task=task)
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    # В SQLite читающая транзакция не может стать пишущей при конкуренции, поэтому там без atomic
+    with transaction.atomic() if skip_locked else nullcontext():
+        job = (ready.select_for_update(skip_locked=True) if skip_locked else ready).first()
+        if job is None:
+            return None
+        # key снимаем сразу: пока задача выполняется, такую же можно поставить снова
+        claimed = Job.objects.filter(id=job.id, status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_RUNNING, locked_by=worker, locked_at=now, key=None, attempts=F('attempts') + 1
+        )
+    if not claimed:
+        return None
+    job.status = Job.STATUS_RUNNING
+    job.locked_by = worker
+    job.locked_at = now
+    job.key = None
+    job.attempts += 1
+    return job
+
+
+def _finish(job, **fields):
+    Job.objects.filter(id=job.id).update(locked_by='', locked_at=None, **fields)
+    for name, value in fields.items():
+        setattr(job, name, value)
+
+
+def complete_job(job):
+    _finish(job, status=Job.STATUS_DONE, last_error='', finished_at=timezone.now())
+
+
+def fail_job(job, error, retry=True):
+    """Queue a retry with exponential backoff, or give up when out of attempts (or retry is False)."""
+    if not retry or job.attempts >= job.max_attempts:
+        logger.error("Job %s (%s) failed after %s attempts", job.id, job.task, job.attempts)
+        _finish(job, status=Job.STATUS_FAILED, last_error=error, finished_at=timezone.now())
+    else:
+        logger.warning("Job %s (%s) failed, attempt %s; retrying", job.id, job.task, job.attempts)
+        _finish(job, status=Job.STATUS_QUEUED, last_error=error, run_at=timezone.now() + retry_delay(job.attempts))
+
+
+class Heartbeat:
+    """
+    Refresh a running job's locked_at from a side thread while the job runs.
+
+    requeue_stale_jobs only takes jobs whose heartbeat stopped, so a long
+    healthy job is never handed to a second worker.
+    """
+
+    def __init__(self, job, interval=HEARTBEAT_INTERVAL):
+        self.job = job
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.beat, name=f"heartbeat-{job.id}", daemon=True)
+
+    def beat(self):
+        running = Job.objects.filter(id=self.job.id, status=Job.STATUS_RUNNING, locked_by=self.job.locked_by)
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    running.update(locked_at=timezone.now())
+                except DatabaseError:
+                    logger.warning("Heartbeat of job %s failed", self.job.id, exc_info=True)
+        finally:
+            # У потока своё соединение с БД
+            connection.close()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+
+def run_job(job, heartbeat_interval=HEARTBEAT_INTERVAL):
+    """Run a claimed job; on failure queue a retry with exponential backoff or give up. Returns success."""
+    try:
+        registered = get_task(job.task)
+    except KeyError:
+        fail_job(job, f"Unknown task {job.task}", retry=False)
+        return False
+
+    try:
+        with Heartbeat(job, heartbeat_interval):
+            registered(**job.payload)
+    except Exception:
+        fail_job(job, traceback.format_exc())
+        return False
+    finally:
+        # Задача могла долго держать соединение; следующей нужна живая сессия
+        close_old_connections()
+
+    complete_job(job)
+    return True
+
+
+def requeue_stale_jobs(stale_after=STALE_AFTER, now=None):
+    """Return jobs left running by a crashed worker to the queue (or fail them when out of attempts)."""
+    cutoff = (now or timezone.now()) - stale_after
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING, locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.STATUS_FAILED, locked_by='', locked_at=None, last_error="Worker lost", finished_at=now or timezone.now()
+    )
+    requeued = stale.update(status=Job.STATUS_QUEUED, locked_by='', locked_at=None, last_error="Worker lost")
+    return requeued + failed
+
+
+def purge_finished_jobs(retention_days=RETENTION_DAYS, batch_size=PURGE_BATCH_SIZE, now=None):
+    """
+    Delete done and failed jobs finished more than retention_days ago, in batches.
+
+    Returns the number of deleted jobs.
+    """
+    cutoff = (now or timezone.now()) - timedelta(days=retention_days)
+    finished = Job.objects.filter(status__in=[Job.STATUS_DONE, Job.STATUS_FAILED], finished_at__lt=cutoff)
+    removed = 0
+    while True:
+        ids = list(finished.order_by('finished_at').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return removed
+        Job.objects.filter(id__in=ids).delete()
+        removed += len(ids)
+
+
+def work(worker=None, burst=False, interval=POLL_INTERVAL, should_stop=lambda: False):
+    """
+    Claim and run jobs until should_stop() is true.
+
+    With burst the loop ends as soon as the queue has nothing ready.
+    Returns the number of jobs run.
+    """
+    worker = worker or worker_name()
+    done = 0
+    last_recovery = None
+    while not should_stop():
+        if last_recovery is None or time.monotonic() - last_recovery > STALE_AFTER.total_seconds() / 2:
+            requeue_stale_jobs()
+            last_recovery = time.monotonic()
+
+        try:
+            job = claim_job(worker)
+        except DatabaseError:
+            # Например, SQLite занята другим воркером — попробуем на следующем круге
+            logger.warning("Worker %s could not claim a job", worker, exc_info=True)
+            time.sleep(interval)
+            continue
+        if job is not None:
+            run_job(job)
+            done += 1
+            continue
+        if burst:
+            break
+        time.sleep(interval)
+    return done
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Notification
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'recipient', 'event', 'text', 'created', 'sent_at')
+    list_filter = ('event',)
+    list_select_related = ('recipient',)
+    search_fields = ('recipient__email', 'text')
+    readonly_fields = ('created',)
+    date_hierarchy = 'created'
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import smtplib
+import time
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils.module_loading import import_string
+from telegram import Bot
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
+
+logger = logging.getLogger(__name__)
+
+# Предельная длина одного сообщения Bot API
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+class ChannelError(Exception):
+    """Delivery to one recipient failed; other recipients can still be served."""
+
+
+class RateLimiter:
+    """Spaces calls to wait() so that no more than rate happen per second."""
+
+    def __init__(self, rate, clock=time.monotonic, sleep=time.sleep):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self.next_at = None
+
+    def wait(self):
+        if not self.interval:
+            return
+        now = self.clock()
+        if self.next_at is not None and now < self.next_at:
+            self.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+class Channel:
+    """
+    A way to deliver a digest to a user.
+
+    A channel is opened once per digest run and reused for every recipient;
+    send() is throttled to the channel's rate.
+    """
+    name = ''
+    rate = None
+
+    def __init__(self):
+        self.limiter = RateLimiter(self.rate)
+
+    def accepts(self, user):
+        return False
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def deliver(self, user, subject, body):
+        raise NotImplementedError
+
+    def send(self, user, subject, body):
+        self.limiter.wait()
+        self.deliver(user, subject, body)
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class EmailChannel(Channel):
+    """Digest emails over one SMTP session."""
+    name = 'email'
+
+    def __init__(self):
+        self.rate = settings.NOTIFICATION_EMAIL_RATE
+        super().__init__()
+        self.connection = None
+
+    def accepts(self, user):
+        return bool(user.email)
+
+    def open(self):
+        self.connection = get_connection()
+        self.connection.open()
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+
+    def deliver(self, user, subject, body):
+        message = EmailMessage(subject=subject, body=body, to=[user.email], connection=self.connection)
+        try:
+            message.send()
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError) as exc:
+            raise ChannelError(str(exc)) from exc
+
+
+def _telegram_length(text):
+    # Telegram считает длину в кодовых единицах UTF-16
+    return len(text.encode('utf-16-le')) // 2
+
+
+def split_message(text, limit=TELEGRAM_MESSAGE_LIMIT):
+    """Split text into parts of at most limit characters, at line breaks where possible."""
+    parts, current = [], ''
+    for line in text.splitlines(keepends=True):
+        if _telegram_length(current + line) > limit and current:
+            parts.append(current)
+            current = ''
+        # Строку длиннее лимита режем как есть
+        while _telegram_length(line) > limit:
+            cut = limit
+            while _telegram_length(line[:cut]) > limit:
+                cut -= 1
+            parts.append(line[:cut])
+            line = line[cut:]
+        current += line
+    parts.append(current)
+    return [part.rstrip('\n') for part in parts if part.strip()] or [text]
+
+
+def make_bot():
+    """
+    The project's Telegram client, a python-telegram-bot Bot.
+
+    Digests (TelegramChannel) and the login bot (accounts.telegram_bot) both
+    send through it, with send_text below.
+    """
+    return Bot(settings.TELEGRAM_BOT_TOKEN, base_url=f"{settings.TELEGRAM_API_URL}/bot")
+
+
+async def send_text(bot, chat_id, text):
+    """Send text to a chat, split at the Bot API limit; waits out one flood-control reply per part."""
+    for part in split_message(text):
+        try:
+            await bot.send_message(chat_id, part, disable_web_page_preview=True)
+        except RetryAfter as exc:
+            # Telegram сам говорит, сколько подождать; одна повторная попытка
+            await asyncio.sleep(exc.retry_after)
+            await bot.send_message(chat_id, part, disable_web_page_preview=True)
+
+
+class TelegramChannel(Channel):
+    """Digest messages through the shared Bot, reusing its HTTP connection for the whole run."""
+    name = 'telegram'
+
+    def __init__(self):
+        self.rate = settings.NOTIFICATION_TELEGRAM_RATE
+        super().__init__()
+        self.bot = None
+        self.loop = None
+
+    def accepts(self, user):
+        return bool(self.bot and user.telegram_id)
+
+    def open(self):
+        if not settings.TELEGRAM_BOT_TOKEN:
+            return
+        # Рассылка дайджестов синхронная: асинхронный Bot работает в собственном цикле событий
+        self.loop = asyncio.new_event_loop()
+        self.bot = make_bot()
+        self.loop.run_until_complete(self.bot.initialize())
+
+    def close(self):
+        if self.loop is None:
+            return
+        self.loop.run_until_complete(self.bot.shutdown())
+        self.loop.close()
+
+    def deliver(self, user, subject, body):
+        try:
+            self.loop.run_until_complete(send_text(self.bot, user.telegram_id, f"{subject}\n\n{body}"))
+        except TelegramError as exc:
+            # Сбой соединения роняет задачу для повтора; отказ API касается только этого получателя
+            if isinstance(exc, NetworkError) and not isinstance(exc, BadRequest):
+                raise
+            raise ChannelError(str(exc)) from exc
+
+
+def load_channels():
+    return [import_string(path)() for path in settings.NOTIFICATION_CHANNELS]
@@ -0,0 +1,96 @@
+import logging
+from contextlib import ExitStack
+from itertools import groupby
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils import timezone
+from .channels import ChannelError, load_channels
+from .models import Notification
+
+logger = logging.getLogger(__name__)
+
+# Сколько получателей обрабатывается за один проход по outbox
+DIGEST_BATCH_SIZE = 200
+
+
+def render_digest(user, notifications):
+    """Return (subject, body) of one user's digest."""
+    context = {
+        'user': user,
+        'notifications': sorted(notifications, key=lambda notification: (notification.event, notification.id)),
+        'count': len(notifications),
+        'site_url': settings.SITE_URL,
+    }
+    return (
+        render_to_string('notifications/digest_subject.txt', context).strip(),
+        render_to_string('notifications/digest.txt', context),
+    )
+
+
+def send_digests(batch_size=DIGEST_BATCH_SIZE, channels=None):
+    """
+    Fold every unsent notification into one digest per recipient and deliver it.
+
+    All channels are opened once for the run and reused for every recipient.
+    A recipient's notifications are marked sent when at least one channel
+    accepted the digest, and stay in the outbox for the next run when every
+    accepting channel failed. Recipients no channel accepts at all (say, no
+    Telegram chat while Telegram is the only channel) are skipped: their
+    notifications leave the outbox unsent instead of being re-read forever.
+    Connection-level errors propagate so the job is retried; digests accepted
+    before the error are marked sent first, so the retry does not repeat them.
+    Returns the number of delivered digests.
+    """
+    channels = load_channels() if channels is None else channels
+    unsent = Notification.objects.filter(sent_at__isnull=True)
+    delivered = 0
+    last_recipient_id = 0
+    with ExitStack() as stack:
+        for channel in channels:
+            stack.enter_context(channel)
+
+        while True:
+            recipient_ids = list(
+                unsent.filter(recipient_id__gt=last_recipient_id).order_by('recipient_id')
+                .values_list('recipient_id', flat=True).distinct()[:batch_size]
+            )
+            if not recipient_ids:
+                return delivered
+            last_recipient_id = recipient_ids[-1]
+
+            batch = unsent.filter(recipient_id__in=recipient_ids).select_related('recipient').order_by('recipient_id', 'id')
+            sent_ids = []
+            skipped_ids = []
+            try:
+                for _, group in groupby(batch, key=lambda notification: notification.recipient_id):
+                    group = list(group)
+                    user = group[0].recipient
+                    targets = [channel for channel in channels if channel.accepts(user)]
+                    if not targets:
+                        logger.info("No channel accepts user %s, skipping %d notification(s)", user.id, len(group))
+                        skipped_ids.extend(notification.id for notification in group)
+                        continue
+                    subject, body = render_digest(user, group)
+                    accepted = False
+                    try:
+                        for channel in targets:
+                            try:
+                                channel.send(user, subject, body)
+                                accepted = True
+                            except ChannelError as exc:
+                                logger.warning("Digest for user %s via %s failed: %s", user.id, channel.name, exc)
+                    finally:
+                        # Канал уже принял дайджест — не отправляем его повторно, даже если следующий канал упал
+                        if accepted:
+                            sent_ids.extend(notification.id for notification in group)
+                            delivered += 1
+            finally:
+                # Отмечаем доставленное до ошибки соединения, иначе повтор задачи пришлёт дубли
+                mark_sent(sent_ids + skipped_ids, batch_size)
+
+
+def mark_sent(ids, batch_size=DIGEST_BATCH_SIZE):
+    """Take notifications out of the outbox, at most batch_size ids per UPDATE."""
+    now = timezone.now()
+    for start in range(0, len(ids), batch_size):
+        Notification.objects.filter(id__in=ids[start:start + batch_size]).update(sent_at=now)
@@ -0,0 +1,97 @@
+from django.db.models.functions import Lower
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from invitations.models import Invitation
+from reviews.models import Achievement
+from teams.models import Team
+from .models import Notification
+from .tasks import queue_digests
+
+
+def notify(notifications):
+    """Write outbox entries in one INSERT and make sure a digest run is scheduled."""
+    if not notifications:
+        return
+    Notification.objects.bulk_create(notifications)
+    queue_digests()
+
+
+def invitations_created(invitations):
+    """
+    Tell registered users about invitations sent to their email.
+
+    Those invitations are marked sent, so the digest replaces the standalone
+    invitation email that unregistered addresses still get.
+    """
+    by_email = {invitation.email.lower(): invitation for invitation in invitations if invitation.email}
+    if not by_email:
+        return
+    users = dict(
+        User.objects.annotate(address=Lower('email')).filter(address__in=by_email).values_list('address', 'id')
+    )
+    notify([
+        Notification(
+            recipient_id=user_id,
+            event=Notification.EVENT_INVITATION,
+            text=f"{by_email[address].created_by.user_name} приглашает вас в «{by_email[address].target_name}»",
+            url=by_email[address].get_absolute_url(),
+        )
+        for address, user_id in users.items()
+    ])
+    Invitation.objects.filter(id__in=[by_email[address].id for address in users]).update(sent_at=timezone.now())
+
+
+def reviewers_assigned(pairs):
+    """Notify reviewers of (user_id, achievement_id) assignments, one query for the achievements."""
+    pairs = set(pairs)
+    if not pairs:
+        return
+    achievements = Achievement.objects.select_related('perfreview__user').in_bulk(
+        {achievement_id for _, achievement_id in pairs}
+    )
+    notify([
+        Notification(
+            recipient_id=user_id,
+            event=Notification.EVENT_REVIEWER_ASSIGNED,
+            text=f"Оцените достижение «{achievements[achievement_id].title}» "
+                 f"({achievements[achievement_id].perfreview.user.user_name})",
+            url=reverse('achievement_score', kwargs={'achievement_id': achievement_id}),
+        )
+        for user_id, achievement_id in sorted(pairs)
+        if achievement_id in achievements and achievements[achievement_id].perfreview.user_id != user_id
+    ])
+
+
+def scores_submitted(review, reviewer, count):
+    """Notify a review's owner that a reviewer scored count of their achievements."""
+    if not count or review.user_id == reviewer.id:
+        return
+    notify([
+        Notification(
+            recipient_id=review.user_id,
+            event=Notification.EVENT_SCORE_SUBMITTED,
+            text=f"{reviewer.user_name} оценил(а) достижений: {count}",
+            url=reverse('perfreview_detail', kwargs={'review_id': review.id}),
+        )
+    ])
+
+
+def reviews_launched(team_users):
+    """Notify employees that a review was launched for them; team_users are (user_id, team_id) pairs."""
+    team_users = list(team_users)
+    if not team_users:
+        return
+    team_names = dict(
+        Team.objects.filter(id__in={team_id for _, team_id in team_users}).values_list('id', 'team_name')
+    )
+    url = reverse('perfreview_list')
+    notify([
+        Notification(
+            recipient_id=user_id,
+            event=Notification.EVENT_REVIEW_LAUNCHED,
+            text=f"Запущено перфревью в команде «{team_names[team_id]}» — добавьте свои достижения",
+            url=url,
+        )
+        for user_id, team_id in team_users
+    ])
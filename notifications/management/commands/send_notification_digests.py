@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from notifications.digests import DIGEST_BATCH_SIZE, send_digests
+
+
+class Command(BaseCommand):
+    help = 'Deliver pending notifications now, one digest per recipient'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DIGEST_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        delivered = send_digests(batch_size=options['batch_size'])
+        self.stdout.write(f"Delivered {delivered} digest(s)")
@@ -0,0 +1,37 @@
+from django.db import models
+from django.db.models import Q
+from accounts.models import User
+
+class Notification(models.Model):
+    """
+    An outbox entry: one event for one user, waiting to be folded into a digest.
+
+    The text is rendered when the event is recorded, so building digests
+    needs no queries beyond the outbox itself.
+    """
+    EVENT_INVITATION = 'invitation_created'
+    EVENT_REVIEWER_ASSIGNED = 'reviewer_assigned'
+    EVENT_SCORE_SUBMITTED = 'score_submitted'
+    EVENT_REVIEW_LAUNCHED = 'review_launched'
+    EVENT_CHOICES = [
+        (EVENT_INVITATION, 'Приглашения'),
+        (EVENT_REVIEWER_ASSIGNED, 'Назначены ревьюером'),
+        (EVENT_SCORE_SUBMITTED, 'Новые оценки'),
+        (EVENT_REVIEW_LAUNCHED, 'Запущенные перфревью'),
+    ]
+    
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notifications')
+    event = models.CharField(max_length=30, choices=EVENT_CHOICES)
+    text = models.CharField(max_length=500)
+    url = models.CharField(max_length=500, blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            # Сборка дайджестов идёт по получателям с неотправленными событиями
+            models.Index(fields=['recipient', 'id'], name='notification_unsent_idx', condition=Q(sent_at__isnull=True)),
+        ]
+    
+    def __str__(self):
+        return f"{self.event} for {self.recipient_id}"
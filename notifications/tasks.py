@@ -0,0 +1,20 @@
+from django.conf import settings
+from jobs.queue import enqueue, task
+from .digests import send_digests
+
+SEND_DIGESTS_TASK = 'notifications.send_digests'
+
+
+@task(SEND_DIGESTS_TASK)
+def send_digests_task():
+    send_digests()
+
+
+def queue_digests():
+    """
+    Schedule a digest run NOTIFICATION_DIGEST_DELAY seconds from now.
+
+    While that run is waiting no other is queued, so events recorded in the
+    meantime are delivered together, one digest per recipient.
+    """
+    return enqueue(SEND_DIGESTS_TASK, delay=settings.NOTIFICATION_DIGEST_DELAY, key=SEND_DIGESTS_TASK)
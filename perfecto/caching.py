@@ -0,0 +1,18 @@
+from django.core.cache import cache
+from django.db import connection, transaction
+
+
+def delete_after_commit(keys):
+    """
+    Delete cache keys now and once more when the current transaction commits.
+
+    The first delete lets the writing request read its own changes; the
+    second drops values that concurrent requests re-cached from the state
+    before the commit. Outside a transaction the keys are deleted once.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    cache.delete_many(keys)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: cache.delete_many(keys))
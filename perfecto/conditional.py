@@ -0,0 +1,109 @@
+import hashlib
+import time
+from functools import wraps
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.db.models import Count, DateTimeField, IntegerField, Max, Subquery
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from accounts.counters import get_counters
+
+
+def count_subquery(queryset, group_by):
+    """Scalar subquery with the number of rows in queryset; group_by is the field all rows share."""
+    grouped = queryset.order_by().values(group_by)
+    return Subquery(grouped.annotate(stamp_count=Count('pk')).values('stamp_count'), output_field=IntegerField())
+
+
+def latest_subquery(queryset, group_by, field='edited'):
+    grouped = queryset.order_by().values(group_by)
+    output_field = DateTimeField() if field == 'edited' else IntegerField()
+    return Subquery(grouped.annotate(stamp_latest=Max(field)).values('stamp_latest'), output_field=output_field)
+
+
+def stamp(name, queryset, group_by, field='edited'):
+    """
+    Annotations fingerprinting a set of rows: their count and latest `field`.
+
+    The count catches deletions, the maximum catches inserts and updates.
+    Tables without `edited` (plain m2m links) pass field='id'.
+    """
+    return {
+        f'{name}_count': count_subquery(queryset, group_by),
+        f'{name}_latest': latest_subquery(queryset, group_by, field),
+    }
+
+
+def page_stamp(queryset, *fields, **annotations):
+    """
+    Evaluate the page's fingerprint in one query: the object's own `edited`,
+    extra fields (which may span relations) and the subquery annotations.
+    Returns a dict, or None when the object does not exist.
+    """
+    return queryset.annotate(**annotations).values('edited', *fields, *annotations).first()
+
+
+def _window_start():
+    """Start of the current FRAGMENT_CACHE_TIMEOUT window, as a Unix timestamp."""
+    timeout = max(settings.FRAGMENT_CACHE_TIMEOUT, 1)
+    return int(time.time() // timeout * timeout)
+
+
+def _etag(request, values, window):
+    parts = [
+        settings.APP_RELEASE,
+        # Имена и должности пользователей валидаторы не видят; как и фрагменты, страница живёт не дольше окна
+        window,
+        request.user.id,
+        # CSRF-секрет в закэшированной странице меняется при входе вместе с ключом сессии
+        getattr(getattr(request, 'session', None), 'session_key', None),
+        bool(getattr(request, 'htmx', False)),
+        # Бейджи навбара: кэшированные счётчики, сбрасываемые сигналами
+        sorted(get_counters(request.user.id).items()),
+        sorted(values.items()),
+    ]
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def conditional_page(validator):
+    """
+    Answer GET/HEAD with 304 Not Modified while the page's validator is unchanged.
+
+    validator(request, *args, **kwargs) returns a dict of values that change
+    whenever the page would render differently (usually from page_stamp()
+    plus the viewer's role), or None to render normally, e.g. when the
+    viewer has no access. The dict is hashed together with the viewer into
+    the ETag; its latest datetime becomes Last-Modified. The view itself runs
+    only on a mismatch, so a repeat visit costs the validator query alone.
+
+    Validators do not cover User rows (profile edits), so both validators
+    also move on every FRAGMENT_CACHE_TIMEOUT window: a renamed user shows
+    up within two windows, once the cached fragments have expired too.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            # Флеш-сообщения показываются один раз, их нельзя спрятать за 304
+            if request.method not in ('GET', 'HEAD') or get_messages(request):
+                return view(request, *args, **kwargs)
+            values = validator(request, *args, **kwargs)
+            if values is None:
+                return view(request, *args, **kwargs)
+
+            window = _window_start()
+            etag = _etag(request, values, window)
+            moments = [int(value.timestamp()) for value in values.values() if hasattr(value, 'timestamp')]
+            last_modified = max(moments + [window])
+
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.headers.setdefault('ETag', etag)
+                response.headers.setdefault('Last-Modified', http_date(last_modified))
+                # Браузер хранит страницу, но перепроверяет её при каждом заходе
+                patch_cache_control(response, private=True, no_cache=True)
+                patch_vary_headers(response, ('Cookie', 'HX-Request'))
+            return response
+        return wrapper
+    return decorator
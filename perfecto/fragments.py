@@ -0,0 +1,45 @@
+from uuid import uuid4
+from django.conf import settings
+from django.core.cache import cache
+from .caching import delete_after_commit
+
+# Версии живут без срока; сами фрагменты — FRAGMENT_CACHE_TIMEOUT
+VERSION_PREFIX = 'fragment_version:v1:'
+
+SCOPE_COMPANY = 'company'
+SCOPE_TEAM = 'team'
+SCOPE_REVIEW = 'review'
+
+
+def _version_key(scope, object_id):
+    return f'{VERSION_PREFIX}{scope}:{object_id}'
+
+
+def fragment_version(scope, object_id):
+    """
+    Return the current version stamp of an object's cached fragments.
+
+    The stamp goes into {% cache %} keys, so bumping it makes every fragment
+    rendered for the object unreachable at once.
+    """
+    key = _version_key(scope, object_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        # Два запроса могли создать версию одновременно — берём ту, что попала в кэш
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_versions(scope, object_ids):
+    """Invalidate cached fragments of the given objects."""
+    delete_after_commit(_version_key(scope, object_id) for object_id in set(object_ids))
+
+
+def fragment_context(scope, object_id):
+    """Template context for {% cache fragment_timeout name object.id fragment_version %}."""
+    return {
+        'fragment_version': fragment_version(scope, object_id),
+        'fragment_timeout': settings.FRAGMENT_CACHE_TIMEOUT,
+    }
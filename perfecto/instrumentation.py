@@ -0,0 +1,183 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from functools import wraps
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+logger = logging.getLogger(__name__)
+access_logger = logging.getLogger('perfecto.access')
+
+# Метрики текущего запроса; None вне InstrumentationMiddleware (команды, воркер)
+_current = ContextVar('request_metrics', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    """A view ran more queries than its query_budget() allows."""
+
+
+class RequestMetrics:
+    """Database and template timings collected while one request is served."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.budget = None
+        self.started = time.perf_counter()
+
+    @property
+    def duplicates(self):
+        """Executions repeating an SQL statement already run (same text, any params)."""
+        return sum(count - 1 for count in self.statements.values())
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+            self.statements[sql] += 1
+
+    def server_timing(self, total):
+        """Value of the Server-Timing header, durations in milliseconds."""
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries, {self.duplicates} duplicates"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+
+def current_metrics():
+    """Metrics of the request being served, or None outside the middleware."""
+    return _current.get()
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+
+def _wrap_connections(wrapper):
+    stack = ExitStack()
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(wrapper))
+    return stack
+
+
+class InstrumentationMiddleware:
+    """
+    Count queries, DB time, duplicate statements and template render time.
+
+    The numbers go to the Server-Timing header (SERVER_TIMING setting), where
+    browser devtools show them, and to the 'perfecto.access' log, one record
+    per request with the values also attached as `extra` fields for
+    structured formatters. Goes first in MIDDLEWARE to cover the others.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            with _wrap_connections(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total = time.perf_counter() - metrics.started
+        if settings.SERVER_TIMING:
+            response['Server-Timing'] = metrics.server_timing(total)
+        self.log(request, response, metrics, total)
+        return response
+
+    def log(self, request, response, metrics, total):
+        match = getattr(request, 'resolver_match', None)
+        user = getattr(request, 'user', None)
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'user_id': user.id if user is not None and user.is_authenticated else None,
+            'duration_ms': round(total * 1000, 1),
+            'queries': metrics.queries,
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'duplicates': metrics.duplicates,
+            'template_ms': round(metrics.template_time * 1000, 1),
+            'query_budget': metrics.budget,
+        }
+        access_logger.info(
+            ' '.join(f'{key}=%s' for key in fields), *fields.values(), extra={'request_metrics': fields}
+        )
+
+
+def query_budget(max_queries):
+    """
+    Declare how many queries the view may run (rendering included).
+
+    Going over the budget logs a warning, or raises QueryBudgetExceeded when
+    QUERY_BUDGET_STRICT is on (as in the test settings). Middleware queries
+    such as the session and user lookups do not count.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            counter = _QueryCounter()
+            with _wrap_connections(counter):
+                response = view(request, *args, **kwargs)
+            metrics = current_metrics()
+            if metrics is not None:
+                metrics.budget = max_queries
+            if counter.queries > max_queries:
+                message = f"{request.path} ran {counter.queries} queries, budget is {max_queries}"
+                if settings.QUERY_BUDGET_STRICT:
+                    raise QueryBudgetExceeded(message)
+                logger.warning("Query budget exceeded: %s", message)
+            return response
+        return wrapper
+    return decorator
+
+
+class _TimedTemplate(Template):
+    """Backend template adding its render time to the request metrics."""
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics()
+        if metrics is None:
+            return super().render(context, request)
+        # Шаблоны, отрисованные внутри другого (виджеты, crispy), уже входят в его время
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    DjangoTemplates backend whose render time is reported by InstrumentationMiddleware.
+
+    Render time includes the queries of lazy querysets evaluated by the template.
+    """
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name).template, self)
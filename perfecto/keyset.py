@@ -0,0 +1,110 @@
+import base64
+import datetime
+import json
+from functools import reduce
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One keyset page: items plus the cursor of the next page (or None)."""
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder обрезает микросекунды до миллисекунд, а курсору нужно точное значение
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    # Даты уходят в ISO-строки; фильтр по полю модели сам разбирает их обратно
+    return base64.urlsafe_b64encode(json.dumps(values, cls=_CursorEncoder).encode()).decode()
+
+
+def decode_cursor(cursor, size):
+    """Return the list of ordering values from a cursor, or None if it is malformed."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, UnicodeError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+def _value(item, lookup):
+    return reduce(getattr, lookup.lstrip('-').split('__'), item)
+
+
+def _after(ordering, values):
+    """Q for rows strictly after values in the ordering (row-value comparison)."""
+    condition = Q()
+    for index in reversed(range(len(ordering))):
+        lookup = ordering[index].lstrip('-')
+        operator = 'lt' if ordering[index].startswith('-') else 'gt'
+        further = Q(**{f'{lookup}__{operator}': values[index]})
+        condition = further if index == len(ordering) - 1 else further | (
+            Q(**{lookup: values[index]}) & condition
+        )
+    return condition
+
+
+def _field(queryset, lookup):
+    """Model or annotation field a (possibly related) ordering lookup points to."""
+    name = lookup.lstrip('-')
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    model = queryset.model
+    for part in name.split('__'):
+        field = model._meta.get_field(part)
+        model = field.related_model
+    return field
+
+
+def _cursor_values(queryset, ordering, values):
+    """Cursor values converted to their fields' types, or None if any does not fit."""
+    try:
+        return [_field(queryset, lookup).to_python(value) for lookup, value in zip(ordering, values)]
+    except (ValidationError, TypeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, ordering, cursor=None, page_size=50):
+    """
+    Return a KeysetPage of queryset ordered by the ordering lookups.
+
+    Lookups sort ascending, or descending with a '-' prefix as in order_by().
+    The last lookup must be unique (usually 'id') and none may be NULL.
+    Lookups may span relations ('user__user_name') or name annotations. A
+    page costs one query whatever its depth; a malformed cursor restarts
+    from the first page.
+    """
+    queryset = queryset.order_by(*ordering)
+    values = decode_cursor(cursor, len(ordering)) if cursor else None
+    # Курсор приходит от клиента: значения приводим к типам полей заранее, иначе ошибка всплывёт при выполнении запроса
+    values = _cursor_values(queryset, ordering, values) if values is not None else None
+    if values is not None:
+        queryset = queryset.filter(_after(ordering, values))
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor([_value(items[-1], lookup) for lookup in ordering])
+    return KeysetPage(items, next_cursor)
@@ -1,5 +1,6 @@
 import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -51,9 +52,14 @@ INSTALLED_APPS = [
     'teams',
     'reviews',
     'invitations',
+    'jobs',
+    'notifications',
+    'api',
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы учитывать запросы к БД всех остальных middleware
+    'perfecto.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -69,7 +75,8 @@ ROOT_URLCONF = 'perfecto.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates, сообщающий время отрисовки в Server-Timing
+        'BACKEND': 'perfecto.instrumentation.TimedDjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -78,6 +85,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'accounts.context_processors.counters',
             ],
         },
     },
@@ -98,6 +106,81 @@ DATABASES = {
     }
 }
 
+# Cache
+# Роли, счётчики, версии фрагментов и nonce входа сбрасываются через кэш, поэтому он должен быть
+# общим для всех воркеров gunicorn. Без DEBUG по умолчанию это DatabaseCache (таблицу создаёт
+# manage.py createcachetable в entrypoint.prod.sh); локальный кэш процесса допустим только при DEBUG
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+DATABASE_CACHE_BACKEND = 'django.core.cache.backends.db.DatabaseCache'
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or (LOCAL_CACHE_BACKEND if DEBUG else DATABASE_CACHE_BACKEND)
+if not DEBUG and CACHE_BACKEND == LOCAL_CACHE_BACKEND:
+    raise ImproperlyConfigured(
+        "CACHE_BACKEND must name a cache shared by all workers when DEBUG is off, not LocMemCache"
+    )
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION', 'perfecto_cache' if CACHE_BACKEND == DATABASE_CACHE_BACKEND else 'perfecto'
+        ),
+    }
+}
+
+# Фрагменты страниц сбрасываются сигналами; срок жизни подбирает то, что сигналы не видят (правки профиля).
+# Тот же срок ограничивает жизнь ETag страниц (perfecto/conditional.py)
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', '3600'))
+
+# Версия релиза входит в ETag страниц: после деплоя с новыми шаблонами браузеры их перезапросят
+APP_RELEASE = os.environ.get('APP_RELEASE', '')
+
+# Инструментирование запросов (perfecto/instrumentation.py): число запросов к БД,
+# их время и время шаблонов уходят в заголовок Server-Timing и в лог perfecto.access.
+# Заголовок раскрывает любому клиенту устройство страниц, поэтому по умолчанию он есть только при DEBUG
+SERVER_TIMING = os.environ.get('SERVER_TIMING', str(DEBUG)).lower() == 'true'
+# Превышение @query_budget: True — исключение, False — предупреждение в лог
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', 'False').lower() == 'true'
+ACCESS_LOG_LEVEL = os.environ.get('ACCESS_LOG_LEVEL', 'INFO')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'perfecto.access': {'handlers': ['console'], 'level': ACCESS_LOG_LEVEL, 'propagate': False},
+    },
+}
+
+# Email
+# В разработке письма печатаются в консоль; в production задаётся SMTP из .env.prod
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', '25'))
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'False').lower() == 'true'
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', '30'))
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'Perfecto <noreply@localhost>')
+
+# Публичный адрес сайта для ссылок в письмах
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000').rstrip('/')
+
+# Уведомления: события копятся в outbox и уходят дайджестом не чаще раза в NOTIFICATION_DIGEST_DELAY секунд
+NOTIFICATION_CHANNELS = [
+    'notifications.channels.EmailChannel',
+    'notifications.channels.TelegramChannel',
+]
+NOTIFICATION_DIGEST_DELAY = int(os.environ.get('NOTIFICATION_DIGEST_DELAY', '300'))
+# Ограничения скорости отправки, сообщений в секунду
+NOTIFICATION_EMAIL_RATE = float(os.environ.get('NOTIFICATION_EMAIL_RATE', '10'))
+NOTIFICATION_TELEGRAM_RATE = float(os.environ.get('NOTIFICATION_TELEGRAM_RATE', '25'))
+TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN', '')
+TELEGRAM_API_URL = os.environ.get('TELEGRAM_API_URL', 'https://api.telegram.org')
+TELEGRAM_BOT_USERNAME = os.environ.get('TELEGRAM_BOT_USERNAME', '')
+# Время жизни одноразовой ссылки для входа через Telegram, секунды
+TELEGRAM_LOGIN_TTL = int(os.environ.get('TELEGRAM_LOGIN_TTL', '600'))
+
 # Auth
 AUTH_USER_MODEL = 'accounts.User'
 
@@ -137,6 +220,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
     ],
 }
 
@@ -13,11 +13,14 @@ PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.MD5PasswordHasher',
 ]
 
-# Don't print database logs during tests
+# Don't print database logs during tests; loggers created by imports stay enabled for caplog
 LOGGING = {
     'version': 1,
-    'disable_existing_loggers': True,
+    'disable_existing_loggers': False,
 }
 
 # Make tests run faster
 DEBUG = False
+
+# Views that outgrow their query budget fail the tests
+QUERY_BUDGET_STRICT = True
@@ -4,6 +4,7 @@ from accounts.views import home_view
 from django.http import JsonResponse
 from django.conf import settings
 from django.conf.urls.static import static
+from accounts.permissions import role_cache_stats
 
 # Health check endpoint для проверки работоспособности приложения
 def health_check(request):
@@ -14,7 +15,8 @@ def health_check(request):
     return JsonResponse({
         "status": "ok",
         "app": "perfecto",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "role_cache": role_cache_stats(),
     })
 
 urlpatterns = [
@@ -25,6 +27,7 @@ urlpatterns = [
     path('teams/', include('teams.urls')),
     path('reviews/', include('reviews.urls')),
     path('invitations/', include('invitations.urls')),
+    path('api/v1/', include('api.urls')),
     path('health-check/', health_check, name='health_check'),
 ]
 
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import PerfReview, Achievement, AchievementScore
+from .search import KIND_ACHIEVEMENT, KIND_COMMENT, match_filter
+from .models import (
+    PerfReview, Achievement, AchievementScore, AchievementScoreSummary, ReviewScoreSummary, ReviewCycle
+)
 
 @admin.register(PerfReview)
 class PerfReviewAdmin(admin.ModelAdmin):
@@ -12,10 +15,42 @@ class PerfReviewAdmin(admin.ModelAdmin):
 class AchievementAdmin(admin.ModelAdmin):
     list_display = ('title', 'perfreview', 'self_score', 'created')
     list_filter = ('self_score', 'created')
-    search_fields = ('title', 'perfreview__user__email')
+    search_fields = ('perfreview__user__email',)
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Заголовки ищем по полнотекстовому индексу, а не icontains
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            queryset |= self.model.objects.filter(match_filter(KIND_ACHIEVEMENT, search_term))
+        return queryset, may_have_duplicates
 
 @admin.register(AchievementScore)
 class AchievementScoreAdmin(admin.ModelAdmin):
     list_display = ('achievement', 'user', 'score')
     list_filter = ('score', 'created')
-    search_fields = ('achievement__title', 'user__email', 'comment')
+    search_fields = ('user__email',)
+    
+    def get_search_results(self, request, queryset, search_term):
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            queryset |= self.model.objects.filter(match_filter(KIND_COMMENT, search_term))
+        return queryset, may_have_duplicates
+
+@admin.register(AchievementScoreSummary)
+class AchievementScoreSummaryAdmin(admin.ModelAdmin):
+    list_display = ('achievement', 'score_count', 'mean_score', 'min_score', 'max_score', 'self_peer_gap')
+    list_select_related = ('achievement',)
+    readonly_fields = ('edited',)
+
+@admin.register(ReviewScoreSummary)
+class ReviewScoreSummaryAdmin(admin.ModelAdmin):
+    list_display = ('perfreview', 'score_count', 'mean_score', 'min_score', 'max_score', 'self_peer_gap')
+    list_select_related = ('perfreview__user', 'perfreview__team')
+    readonly_fields = ('edited',)
+
+@admin.register(ReviewCycle)
+class ReviewCycleAdmin(admin.ModelAdmin):
+    list_display = ('name', 'company', 'status', 'starts_on', 'closes_on', 'members_processed', 'members_total')
+    list_filter = ('status',)
+    list_select_related = ('company',)
+    readonly_fields = ('members_total', 'members_processed', 'reviews_created', 'last_membership_id', 'created', 'edited')
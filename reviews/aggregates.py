@@ -0,0 +1,240 @@
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Min, Sum
+from .models import AchievementScore, AchievementScoreSummary, ReviewScoreSummary
+
+SUMMARY_FIELDS = ('score_count', 'score_total', 'min_score', 'max_score', 'mean_score', 'self_peer_gap')
+REBUILD_BATCH_SIZE = 1000
+
+
+def _refresh_derived(summary, self_score):
+    """Recalculate mean and self-vs-peer gap from count and total."""
+    if summary.score_count:
+        summary.mean_score = summary.score_total / summary.score_count
+        summary.self_peer_gap = summary.mean_score - self_score
+    else:
+        summary.min_score = summary.max_score = None
+        summary.mean_score = summary.self_peer_gap = None
+
+
+def apply_score_change(achievement, old_score, new_score):
+    """
+    Update summaries after one score was added, changed or removed.
+
+    old_score is None for a new score, new_score is None for a deleted one.
+    Count and total are adjusted by the delta; min/max are re-read from the
+    achievement's own scores only when the old value was the current extreme.
+    A missing summary is rebuilt from the raw scores instead, since the
+    delta would be applied to scores the summary never counted.
+    """
+    with transaction.atomic():
+        summary = AchievementScoreSummary.objects.select_for_update().filter(achievement_id=achievement.id).first()
+        if summary is None:
+            # При каскадном удалении оценок не остаётся, и сводка не создаётся заново
+            rebuilt = list(compute_achievement_summaries([achievement.id]))
+            if rebuilt:
+                rebuilt[0].save()
+                rollup_review(achievement.perfreview_id)
+            return
+
+        if old_score is not None:
+            summary.score_count -= 1
+            summary.score_total -= old_score
+        if new_score is not None:
+            summary.score_count += 1
+            summary.score_total += new_score
+
+        if old_score is not None and old_score != new_score and old_score in (summary.min_score, summary.max_score):
+            extremes = AchievementScore.objects.filter(achievement_id=achievement.id).aggregate(
+                low=Min('score'), high=Max('score')
+            )
+            summary.min_score, summary.max_score = extremes['low'], extremes['high']
+        elif new_score is not None:
+            summary.min_score = new_score if summary.min_score is None else min(summary.min_score, new_score)
+            summary.max_score = new_score if summary.max_score is None else max(summary.max_score, new_score)
+
+        _refresh_derived(summary, achievement.self_score)
+        summary.save()
+        rollup_review(achievement.perfreview_id, create=new_score is not None)
+
+
+def apply_self_score_change(achievement):
+    """Refresh the self-vs-peer gap after an achievement's self score changed."""
+    updated = AchievementScoreSummary.objects.filter(
+        achievement_id=achievement.id, mean_score__isnull=False
+    ).update(self_peer_gap=F('mean_score') - achievement.self_score)
+    if updated:
+        rollup_review(achievement.perfreview_id, create=False)
+
+
+def _review_values(review_id):
+    """Aggregate a review's achievement summaries into review summary values."""
+    values = AchievementScoreSummary.objects.filter(
+        achievement__perfreview_id=review_id, score_count__gt=0
+    ).aggregate(
+        score_count=Sum('score_count'),
+        score_total=Sum('score_total'),
+        min_score=Min('min_score'),
+        max_score=Max('max_score'),
+        self_peer_gap=Avg('self_peer_gap'),
+    )
+    values['score_count'] = values['score_count'] or 0
+    values['score_total'] = values['score_total'] or 0
+    values['mean_score'] = (
+        values['score_total'] / values['score_count'] if values['score_count'] else None
+    )
+    return values
+
+
+def rollup_review(review_id, create=True):
+    """Recompute a review summary from its achievement summaries (never from raw scores)."""
+    values = _review_values(review_id)
+    if create:
+        ReviewScoreSummary.objects.update_or_create(perfreview_id=review_id, defaults=values)
+    else:
+        ReviewScoreSummary.objects.filter(perfreview_id=review_id).update(**values)
+
+
+def compute_achievement_summaries(achievement_ids=None):
+    """Yield fresh AchievementScoreSummary objects computed from raw scores."""
+    scores = AchievementScore.objects.all()
+    if achievement_ids is not None:
+        scores = scores.filter(achievement_id__in=achievement_ids)
+    rows = scores.values(
+        'achievement_id', 'achievement__self_score'
+    ).annotate(
+        score_count=Count('id'),
+        score_total=Sum('score'),
+        min_score=Min('score'),
+        max_score=Max('score'),
+    ).order_by('achievement_id')
+
+    for row in rows.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        summary = AchievementScoreSummary(
+            achievement_id=row['achievement_id'],
+            score_count=row['score_count'],
+            score_total=row['score_total'],
+            min_score=row['min_score'],
+            max_score=row['max_score'],
+        )
+        _refresh_derived(summary, row['achievement__self_score'])
+        yield summary
+
+
+def refresh_achievement_summaries(achievement_ids, review_id):
+    """
+    Recompute summaries of the given achievements after a bulk write.
+
+    bulk_create/bulk_update bypass the score signals, so batch writers call
+    this instead: only the touched achievements' scores are aggregated, in one
+    grouped query, and the review summary is rolled up once.
+    """
+    summaries = list(compute_achievement_summaries(achievement_ids))
+    with transaction.atomic():
+        AchievementScoreSummary.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=['achievement'],
+            update_fields=list(SUMMARY_FIELDS) + ['edited'],
+        )
+        rollup_review(review_id)
+
+
+def _compute_review_summaries():
+    """Yield ReviewScoreSummary objects rolled up from stored achievement summaries."""
+    rows = AchievementScoreSummary.objects.values('achievement__perfreview_id').annotate(
+        count=Sum('score_count'),
+        total=Sum('score_total'),
+        low=Min('min_score'),
+        high=Max('max_score'),
+        gap=Avg('self_peer_gap'),
+    ).order_by('achievement__perfreview_id')
+
+    for row in rows.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        yield ReviewScoreSummary(
+            perfreview_id=row['achievement__perfreview_id'],
+            score_count=row['count'],
+            score_total=row['total'],
+            min_score=row['low'],
+            max_score=row['high'],
+            mean_score=row['total'] / row['count'],
+            self_peer_gap=row['gap'],
+        )
+
+
+def _bulk_insert(model, objects):
+    batch = []
+    created = 0
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            created += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def rebuild_summaries():
+    """Drop and rebuild every score summary from raw scores. Returns (achievements, reviews)."""
+    with transaction.atomic():
+        ReviewScoreSummary.objects.all().delete()
+        AchievementScoreSummary.objects.all().delete()
+        achievements = _bulk_insert(AchievementScoreSummary, compute_achievement_summaries())
+        reviews = _bulk_insert(ReviewScoreSummary, _compute_review_summaries())
+    return achievements, reviews
+
+
+def _differs(stored, expected, fields=SUMMARY_FIELDS):
+    for field in fields:
+        a, b = getattr(stored, field), getattr(expected, field)
+        if a is None or b is None:
+            if a is not b:
+                return True
+        elif abs(a - b) > 1e-9:
+            return True
+    return False
+
+
+def verify_summaries():
+    """
+    Compare stored summaries with values computed from raw scores.
+
+    Returns (achievement_ids, review_ids) whose summary is missing, stale or orphaned.
+    """
+    stored = {
+        summary.achievement_id: summary
+        for summary in AchievementScoreSummary.objects.filter(score_count__gt=0).iterator(
+            chunk_size=REBUILD_BATCH_SIZE
+        )
+    }
+    bad_achievements = []
+    for expected in compute_achievement_summaries():
+        summary = stored.pop(expected.achievement_id, None)
+        if summary is None or _differs(summary, expected):
+            bad_achievements.append(expected.achievement_id)
+    bad_achievements.extend(stored)
+
+    stored_reviews = {
+        summary.perfreview_id: summary
+        for summary in ReviewScoreSummary.objects.filter(score_count__gt=0).iterator(
+            chunk_size=REBUILD_BATCH_SIZE
+        )
+    }
+    review_rows = AchievementScore.objects.values('achievement__perfreview_id').annotate(
+        score_count=Count('id'),
+        score_total=Sum('score'),
+        min_score=Min('score'),
+        max_score=Max('score'),
+    ).order_by('achievement__perfreview_id')
+    bad_reviews = []
+    for row in review_rows.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        review_id = row.pop('achievement__perfreview_id')
+        summary = stored_reviews.pop(review_id, None)
+        expected = ReviewScoreSummary(perfreview_id=review_id, **row)
+        if summary is None or _differs(summary, expected, SUMMARY_FIELDS[:4]):
+            bad_reviews.append(review_id)
+    bad_reviews.extend(stored_reviews)
+
+    return sorted(bad_achievements), sorted(bad_reviews)
@@ -4,3 +4,6 @@ class ReviewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'reviews'
     verbose_name = 'Перформанс ревью'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
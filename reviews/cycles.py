@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime, time
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import ReviewCycle, PerfReview
+from teams.models import TeamUsers
+from notifications.events import reviews_launched
+from perfecto.fragments import SCOPE_TEAM, bump_versions
+from accounts.counters import invalidate_counters
+
+logger = logging.getLogger(__name__)
+
+# Сколько участников команд обрабатывается за одну транзакцию
+CHUNK_SIZE = 1000
+
+
+def start_cycle(company, name, starts_on, closes_on, created_by=None):
+    """
+    Register a cycle for the whole company; reviews are created later by process_cycle_chunk.
+
+    The fan-out waits for starts_on: queue_cycle schedules it for that day
+    and chunks of a cycle that has not started yet create nothing.
+    """
+    return ReviewCycle.objects.create(
+        company=company,
+        name=name,
+        starts_on=starts_on,
+        closes_on=closes_on,
+        created_by=created_by,
+        members_total=TeamUsers.objects.filter(team__company=company).count(),
+    )
+
+
+def cycle_start_moment(cycle):
+    """Local midnight of the cycle's start date, when its reviews may be created."""
+    return timezone.make_aware(datetime.combine(cycle.starts_on, time.min))
+
+
+def process_cycle_chunk(cycle_id, chunk_size=CHUNK_SIZE):
+    """
+    Create reviews for the next chunk of team memberships of a cycle.
+
+    The chunk's reviews and the cycle's cursor (last TeamUsers.id) are saved
+    in one transaction, so an interrupted run resumes where it stopped and a
+    repeated chunk is absorbed by the per-cycle unique constraint. Members
+    with an open review outside cycles in that team are skipped, as in
+    launch_team_reviews. Only employees whose review was actually created
+    are notified. Returns True while there is more work left.
+    """
+    with transaction.atomic():
+        cycle = ReviewCycle.objects.select_for_update().get(id=cycle_id)
+        if cycle.status not in (ReviewCycle.STATUS_PENDING, ReviewCycle.STATUS_RUNNING) or cycle.is_scheduled:
+            return False
+        if cycle.status == ReviewCycle.STATUS_PENDING:
+            # Между созданием и стартом цикла состав команд мог измениться
+            cycle.members_total = TeamUsers.objects.filter(team__company_id=cycle.company_id).count()
+
+        memberships = list(
+            TeamUsers.objects.filter(
+                team__company_id=cycle.company_id, id__gt=cycle.last_membership_id
+            ).order_by('id').values_list('id', 'user_id', 'team_id')[:chunk_size]
+        )
+        if not memberships:
+            cycle.status = ReviewCycle.STATUS_DONE
+            cycle.save(update_fields=['status', 'edited'])
+            return False
+
+        pairs = {(user_id, team_id) for _, user_id, team_id in memberships}
+        chunk_reviews = PerfReview.objects.filter(
+            user_id__in={user_id for user_id, _ in pairs}, team_id__in={team_id for _, team_id in pairs}
+        )
+        # Фильтр по user_id и team_id по отдельности шире пар, лишнее отсекаем пересечением
+        existing = pairs & set(
+            chunk_reviews.filter(Q(cycle=cycle) | Q(cycle__isnull=True, is_closed=False)).values_list('user_id', 'team_id')
+        )
+        PerfReview.objects.bulk_create(
+            [
+                PerfReview(cycle=cycle, user_id=user_id, team_id=team_id)
+                for user_id, team_id in sorted(pairs - existing)
+            ],
+            ignore_conflicts=True
+        )
+        # ignore_conflicts не сообщает, какие строки вставлены, — перечитываем ревью цикла
+        created = (pairs - existing) & set(chunk_reviews.filter(cycle=cycle).values_list('user_id', 'team_id'))
+        reviews_launched(sorted(created))
+        bump_versions(SCOPE_TEAM, [team_id for _, team_id in created])
+        invalidate_counters(user_id for user_id, _ in created)
+        cycle.status = ReviewCycle.STATUS_RUNNING
+        cycle.last_membership_id = memberships[-1][0]
+        cycle.members_processed += len(memberships)
+        cycle.reviews_created = PerfReview.objects.filter(cycle=cycle).count()
+        cycle.save()
+    return True
+
+
+def run_cycle(cycle_id, chunk_size=CHUNK_SIZE):
+    """Process a cycle chunk by chunk until every membership is covered."""
+    while process_cycle_chunk(cycle_id, chunk_size):
+        pass
+
+
+def close_due_cycles(today=None):
+    """Close launched cycles whose close date has passed, closing their reviews too."""
+    today = today or timezone.localdate()
+    closed = 0
+    for cycle in ReviewCycle.objects.filter(status=ReviewCycle.STATUS_DONE, closes_on__lt=today):
+        with transaction.atomic():
+            # update() не трогает auto_now; edited нужен API-синхронизации и версиям страниц
+            reviews = PerfReview.objects.filter(cycle=cycle)
+            reviews.update(is_closed=True, edited=timezone.now())
+            # Открытые ревью видны в составе команд
+            bump_versions(SCOPE_TEAM, reviews.values_list('team_id', flat=True).distinct())
+            cycle.status = ReviewCycle.STATUS_CLOSED
+            cycle.save(update_fields=['status', 'edited'])
+        closed += 1
+        logger.info("Closed review cycle %s", cycle.id)
+    return closed
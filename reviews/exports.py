@@ -0,0 +1,80 @@
+import csv
+import json
+from .models import PerfReview
+
+EXPORT_CHUNK_SIZE = 2000
+
+FORMAT_CSV = 'csv'
+FORMAT_JSONL = 'jsonl'
+FORMATS = {
+    FORMAT_CSV: 'text/csv; charset=utf-8',
+    FORMAT_JSONL: 'application/x-ndjson; charset=utf-8',
+}
+
+# (колонка выгрузки, lookup в PerfReview.objects.values())
+EXPORT_COLUMNS = [
+    ('review_id', 'id'),
+    ('employee_email', 'user__email'),
+    ('employee_name', 'user__user_name'),
+    ('team', 'team__team_name'),
+    ('review_created', 'created'),
+    ('review_closed', 'is_closed'),
+    ('achievement_id', 'achievements__id'),
+    ('achievement_title', 'achievements__title'),
+    ('self_score', 'achievements__self_score'),
+    ('reviewer_email', 'achievements__scores__user__email'),
+    ('score', 'achievements__scores__score'),
+    ('comment', 'achievements__scores__comment'),
+    ('score_created', 'achievements__scores__created'),
+]
+EXPORT_HEADER = [column for column, _ in EXPORT_COLUMNS]
+
+
+class Echo:
+    """File-like object whose write() returns the value, so csv.writer can feed a generator."""
+
+    def write(self, value):
+        return value
+
+
+def export_rows(team_id=None, company_id=None):
+    """
+    Yield one dict per (achievement, score) pair; achievements without scores
+    yield one row with empty score columns, and reviews without achievements
+    one row with empty achievement columns.
+
+    Rows are read as plain values over LEFT JOINs in chunks through a
+    server-side cursor, so memory does not grow with the export size.
+    """
+    reviews = PerfReview.objects.all()
+    if company_id is not None:
+        reviews = reviews.filter(team__company_id=company_id)
+    if team_id is not None:
+        reviews = reviews.filter(team_id=team_id)
+
+    lookups = [lookup for _, lookup in EXPORT_COLUMNS]
+    rows = reviews.values_list(*lookups).order_by('id', 'achievements__id', 'achievements__scores__id')
+    for values in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield {
+            column: value.isoformat() if hasattr(value, 'isoformat') else value
+            for column, value in zip(EXPORT_HEADER, values)
+        }
+
+
+def stream_csv(rows):
+    """Yield CSV lines, header first so the response starts before the query runs."""
+    writer = csv.DictWriter(Echo(), fieldnames=EXPORT_HEADER)
+    yield writer.writerow(dict(zip(EXPORT_HEADER, EXPORT_HEADER)))
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def stream_export(export_format, rows):
+    if export_format == FORMAT_JSONL:
+        return stream_jsonl(rows)
+    return stream_csv(rows)
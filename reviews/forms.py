@@ -1,7 +1,8 @@
 from django import forms
-from .models import PerfReview, Achievement, AchievementScore
+from .models import PerfReview, Achievement, AchievementScore, ReviewCycle
 from accounts.models import User
 from companies.models import CompanyUsers
+from accounts.widgets import UserPickerMultipleWidget
 
 class PerfReviewForm(forms.ModelForm):
     class Meta:
@@ -11,7 +12,7 @@ class PerfReviewForm(forms.ModelForm):
 class AchievementForm(forms.ModelForm):
     reviewers = forms.ModelMultipleChoiceField(
         queryset=None,
-        widget=forms.CheckboxSelectMultiple,
+        widget=UserPickerMultipleWidget(),
         required=False
     )
     
@@ -28,6 +29,7 @@ class AchievementForm(forms.ModelForm):
             company = team.company
             company_users = CompanyUsers.objects.filter(company=company).values_list('user_id', flat=True)
             self.fields['reviewers'].queryset = User.objects.filter(id__in=company_users)
+            self.fields['reviewers'].widget.company_id = company.id
         else:
             self.fields['reviewers'].queryset = User.objects.none()
 
@@ -38,3 +40,64 @@ class AchievementScoreForm(forms.ModelForm):
         widgets = {
             'comment': forms.Textarea(attrs={'rows': 3}),
         }
+
+class BatchScoreForm(forms.Form):
+    """One row of the batch scoring formset; leaving the score empty skips the achievement."""
+    achievement_id = forms.IntegerField(widget=forms.HiddenInput)
+    score = forms.TypedChoiceField(
+        choices=[('', '—')] + AchievementScore.SCORE_CHOICES,
+        coerce=int,
+        empty_value=None,
+        required=False
+    )
+    comment = forms.CharField(widget=forms.Textarea(attrs={'rows': 2}), required=False)
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('comment') and cleaned_data.get('score') is None:
+            self.add_error('score', "Укажите оценку для комментария")
+        return cleaned_data
+
+class BaseBatchScoreFormSet(forms.BaseFormSet):
+    def __init__(self, *args, **kwargs):
+        self.allowed_ids = kwargs.pop('allowed_ids', set())
+        super().__init__(*args, **kwargs)
+    
+    def clean(self):
+        if any(self.errors):
+            return
+        seen = set()
+        for form in self.forms:
+            achievement_id = form.cleaned_data.get('achievement_id')
+            if achievement_id not in self.allowed_ids or achievement_id in seen:
+                raise forms.ValidationError("Некорректный список достижений")
+            seen.add(achievement_id)
+
+BatchScoreFormSet = forms.formset_factory(BatchScoreForm, formset=BaseBatchScoreFormSet, extra=0)
+
+class ReviewCycleForm(forms.ModelForm):
+    class Meta:
+        model = ReviewCycle
+        fields = ['name', 'starts_on', 'closes_on']
+        widgets = {
+            'starts_on': forms.DateInput(attrs={'type': 'date'}),
+            'closes_on': forms.DateInput(attrs={'type': 'date'}),
+        }
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        starts_on = cleaned_data.get('starts_on')
+        closes_on = cleaned_data.get('closes_on')
+        if starts_on and closes_on and closes_on < starts_on:
+            self.add_error('closes_on', "Дата закрытия не может быть раньше даты начала")
+        return cleaned_data
+
+class AchievementImportForm(forms.Form):
+    FORMAT_CHOICES = [
+        ('', 'По расширению файла'),
+        ('csv', 'CSV'),
+        ('jsonl', 'JSONL'),
+    ]
+    
+    file = forms.FileField(label='Файл')
+    format = forms.ChoiceField(label='Формат', choices=FORMAT_CHOICES, required=False)
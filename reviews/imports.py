@@ -0,0 +1,216 @@
+import codecs
+import csv
+import json
+import re
+from django.db import transaction
+from django.db.models.functions import Lower
+from accounts.models import User
+from notifications.events import reviewers_assigned
+from perfecto.fragments import SCOPE_REVIEW, SCOPE_TEAM, bump_versions
+from .exports import FORMAT_CSV, FORMAT_JSONL
+from .inbox import add_pending
+from .models import Achievement, PerfReview
+
+IMPORT_CHUNK_SIZE = 500
+# Сколько ошибок показывать в интерфейсе; в результате хранятся все
+MAX_SHOWN_ERRORS = 100
+
+EMAIL_SEPARATORS = re.compile(r'[\s,;]+')
+INTEGER = re.compile(r'[+-]?\d+')
+
+
+class ImportResult:
+    """Outcome of an import: number of created achievements and (line, message) errors."""
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    @property
+    def shown_errors(self):
+        return self.errors[:MAX_SHOWN_ERRORS]
+
+
+def guess_format(filename):
+    return FORMAT_JSONL if filename.lower().endswith(('.jsonl', '.ndjson', '.json')) else FORMAT_CSV
+
+
+def decode_lines(binary_lines):
+    """Decode an iterable of byte lines (e.g. an UploadedFile) without reading it whole."""
+    return codecs.iterdecode(binary_lines, 'utf-8-sig')
+
+
+def read_rows(lines, import_format):
+    """
+    Yield (line_number, row) pairs from an iterable of text lines.
+
+    row is None for a line that cannot be parsed, so it is reported as an
+    error instead of aborting the import.
+    """
+    if import_format == FORMAT_JSONL:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield number, row if isinstance(row, dict) else None
+    else:
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+
+
+def _split_emails(value):
+    # Email сравниваем без учёта регистра: в файлах его пишут как попало
+    if isinstance(value, (list, tuple)):
+        return [str(email).strip().lower() for email in value if str(email).strip()]
+    return [email.lower() for email in EMAIL_SEPARATORS.split(str(value or '')) if email]
+
+
+def _parse_score(value):
+    """Return the score as an int, or None when it is not a whole number (3.7 is not rounded)."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    text = str(value or '').strip()
+    return int(text) if INTEGER.fullmatch(text) else None
+
+
+def _parse_row(row, with_employee):
+    """Return (cleaned row, None) or (None, error message)."""
+    title = str(row.get('title') or '').strip()
+    if not title:
+        return None, "Не указан заголовок достижения"
+    self_score = _parse_score(row.get('self_score'))
+    if self_score is None or not 1 <= self_score <= 5:
+        return None, "Самооценка должна быть целым числом от 1 до 5"
+    employee = str(row.get('employee_email') or '').strip().lower()
+    if with_employee and not employee:
+        return None, "Не указан email сотрудника (employee_email)"
+    return {
+        'title': title,
+        'self_score': self_score,
+        'reviewers': _split_emails(row.get('reviewers')),
+        'employee': employee,
+    }, None
+
+
+def _import_chunk(chunk, review, cycle, company_id, result):
+    parsed = []
+    for line, row in chunk:
+        if row is None:
+            result.add_error(line, "Не удалось разобрать строку")
+            continue
+        cleaned, error = _parse_row(row, with_employee=cycle is not None)
+        if error:
+            result.add_error(line, error)
+        else:
+            parsed.append((line, cleaned))
+    if not parsed:
+        return
+
+    # Один запрос на все email ревьюеров чанка, только среди сотрудников компании
+    emails = {email for _, cleaned in parsed for email in cleaned['reviewers']}
+    reviewer_ids = dict(
+        User.objects.annotate(email_lower=Lower('email')).filter(
+            email_lower__in=emails, company_relations__company_id=company_id
+        ).values_list('email_lower', 'id')
+    ) if emails else {}
+
+    if cycle is not None:
+        employees = {cleaned['employee'] for _, cleaned in parsed}
+        review_ids = {}
+        review_teams = {}
+        for email, review_id, team_id in PerfReview.objects.annotate(email_lower=Lower('user__email')).filter(
+            cycle=cycle, email_lower__in=employees
+        ).values_list('email_lower', 'id', 'team_id'):
+            # Сотрудник в нескольких командах цикла — строку нельзя отнести к одному ревью
+            review_ids[email] = None if email in review_ids else review_id
+            review_teams[review_id] = team_id
+    else:
+        review_teams = {review.id: review.team_id}
+
+    achievements = []
+    reviewers = []
+    for line, cleaned in parsed:
+        missing = [email for email in cleaned['reviewers'] if email not in reviewer_ids]
+        if missing:
+            result.add_error(line, f"Ревьюеры не найдены в компании: {', '.join(missing)}")
+            continue
+        if cycle is None:
+            review_id = review.id
+        else:
+            if cleaned['employee'] not in review_ids:
+                result.add_error(line, f"Нет ревью в цикле для {cleaned['employee']}")
+                continue
+            review_id = review_ids[cleaned['employee']]
+            if review_id is None:
+                result.add_error(line, f"У {cleaned['employee']} несколько ревью в цикле")
+                continue
+        achievements.append(
+            Achievement(perfreview_id=review_id, title=cleaned['title'], self_score=cleaned['self_score'])
+        )
+        reviewers.append({reviewer_ids[email] for email in cleaned['reviewers']})
+
+    if not achievements:
+        return
+
+    Through = Achievement.reviewers.through
+    with transaction.atomic():
+        Achievement.objects.bulk_create(achievements)
+        links = [
+            Through(achievement_id=achievement.id, user_id=user_id)
+            for achievement, user_ids in zip(achievements, reviewers)
+            for user_id in user_ids
+        ]
+        Through.objects.bulk_create(links)
+        # bulk_create не вызывает m2m_changed, поэтому очередь оценок пополняем сами
+        pairs = [(link.user_id, link.achievement_id) for link in links]
+        add_pending(pairs)
+        reviewers_assigned(pairs)
+        touched = {achievement.perfreview_id for achievement in achievements}
+        bump_versions(SCOPE_REVIEW, touched)
+        bump_versions(SCOPE_TEAM, [review_teams[review_id] for review_id in touched])
+    result.created += len(achievements)
+
+
+def import_achievements(rows, review=None, cycle=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Create achievements from (line_number, row) pairs into a review or a cycle.
+
+    Rows carry title, self_score, reviewers (emails) and, for a cycle,
+    employee_email. Rows are validated and written chunk by chunk, each chunk
+    in its own transaction: invalid rows are reported in the result and the
+    valid ones are still created. A file that stops decoding (not UTF-8, NUL
+    bytes) keeps the rows read so far and reports the rest as one error.
+    """
+    if (review is None) == (cycle is None):
+        raise ValueError("Pass exactly one of review or cycle")
+    company_id = cycle.company_id if cycle is not None else review.team.company_id
+
+    result = ImportResult()
+    chunk = []
+    line = 0
+    try:
+        for line, row in rows:
+            chunk.append((line, row))
+            if len(chunk) >= chunk_size:
+                _import_chunk(chunk, review, cycle, company_id, result)
+                chunk = []
+    except UnicodeDecodeError:
+        # Файл читается потоком: строки до ошибки импортируются, остаток отклоняется
+        result.add_error(line + 1, "Файл должен быть в кодировке UTF-8, дальше строки не прочитаны")
+    except csv.Error as e:
+        result.add_error(line + 1, f"Не удалось разобрать CSV ({e}), дальше строки не прочитаны")
+    if chunk:
+        _import_chunk(chunk, review, cycle, company_id, result)
+    result.errors.sort()
+    return result
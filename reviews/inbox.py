@@ -0,0 +1,66 @@
+from accounts.counters import get_counters, invalidate_counters
+from .models import Achievement, AchievementScore, PendingScore
+
+
+def pending_count(user_id):
+    """Number of achievements the user still has to score (cached with the other badge counters)."""
+    return get_counters(user_id)['pending_scores']
+
+
+def invalidate_pending_counts(user_ids):
+    invalidate_counters(user_ids)
+
+
+def add_pending(pairs):
+    """
+    Queue (user_id, achievement_id) pairs in the inbox unless already scored.
+
+    Costs two queries however many pairs are given.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return
+    achievement_ids = {achievement_id for _, achievement_id in pairs}
+    user_ids = {user_id for user_id, _ in pairs}
+    scored = set(
+        AchievementScore.objects.filter(
+            achievement_id__in=achievement_ids, user_id__in=user_ids
+        ).values_list('user_id', 'achievement_id')
+    )
+    reviews = dict(
+        Achievement.objects.filter(id__in=achievement_ids).values_list('id', 'perfreview_id')
+    )
+    PendingScore.objects.bulk_create(
+        [
+            PendingScore(user_id=user_id, achievement_id=achievement_id, perfreview_id=reviews[achievement_id])
+            for user_id, achievement_id in pairs - scored
+            if achievement_id in reviews
+        ],
+        ignore_conflicts=True
+    )
+    invalidate_pending_counts(user_ids)
+
+
+def remove_pending(user_ids, achievement_ids):
+    """Drop inbox entries for every combination of the given users and achievements."""
+    if not user_ids or not achievement_ids:
+        return
+    PendingScore.objects.filter(user_id__in=user_ids, achievement_id__in=achievement_ids).delete()
+    invalidate_pending_counts(user_ids)
+
+
+def clear_pending(user_id=None, achievement_id=None):
+    """Drop every inbox entry of a user or of an achievement (reviewers.clear())."""
+    entries = PendingScore.objects.filter(
+        **({'user_id': user_id} if user_id is not None else {'achievement_id': achievement_id})
+    )
+    user_ids = set(entries.values_list('user_id', flat=True))
+    entries.delete()
+    invalidate_pending_counts(user_ids)
+
+
+def pending_for_user(user):
+    """Inbox queryset with everything the inbox page renders joined in."""
+    return PendingScore.objects.filter(user=user).select_related(
+        'achievement', 'perfreview__user', 'perfreview__team'
+    ).order_by('-created', '-id')
@@ -0,0 +1,52 @@
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from perfecto.keyset import keyset_page
+from .models import PerfReview, Achievement
+from accounts.permissions import get_membership_map
+
+PAGE_SIZE = 25
+ORDERING = ['-created', '-id']
+
+TAB_MY = 'my'
+TAB_REVIEWING = 'reviewing'
+TAB_TEAM = 'team'
+TABS = (TAB_MY, TAB_REVIEWING, TAB_TEAM)
+
+
+def tab_queryset(tab, user):
+    """Unordered, unannotated queryset of reviews shown in a tab of perfreview_list."""
+    reviews = PerfReview.objects.all()
+    if tab == TAB_MY:
+        return reviews.filter(user=user)
+    if tab == TAB_REVIEWING:
+        # EXISTS вместо JOIN + DISTINCT по M2M ревьюеров
+        reviewing = Achievement.reviewers.through.objects.filter(
+            achievement__perfreview=OuterRef('pk'), user=user
+        )
+        return reviews.filter(Exists(reviewing)).exclude(user=user)
+    if tab == TAB_TEAM:
+        # Команды, где пользователь менеджер, берём из кэша ролей
+        team_ids = [
+            team_id
+            for team_id, (is_manager, is_owner) in get_membership_map(user.id)['teams'].items()
+            if is_manager
+        ]
+        return reviews.filter(team_id__in=team_ids).exclude(user=user)
+    raise ValueError(f"Unknown tab: {tab}")
+
+
+def review_page(tab, user, cursor=None, page_size=PAGE_SIZE):
+    """
+    Return a KeysetPage for a tab, ordered by (created, id) descending.
+
+    Rows come with user/team joined and an achievement_count annotation, so
+    rendering a page costs one query whatever the page or tab size.
+    """
+    achievement_count = Achievement.objects.filter(
+        perfreview=OuterRef('pk')
+    ).order_by().values('perfreview').annotate(total=Count('id')).values('total')
+
+    reviews = tab_queryset(tab, user).select_related('user', 'team').annotate(
+        achievement_count=Coalesce(Subquery(achievement_count, output_field=IntegerField()), 0)
+    )
+    return keyset_page(reviews, ORDERING, cursor, page_size)
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews.exports import FORMAT_CSV, FORMAT_JSONL
+from reviews.imports import IMPORT_CHUNK_SIZE, guess_format, import_achievements, read_rows
+from reviews.models import PerfReview, ReviewCycle
+
+
+class Command(BaseCommand):
+    help = 'Import achievements from a CSV or JSONL file into a review or a whole review cycle'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument('--review', type=int, help='PerfReview id')
+        target.add_argument('--cycle', type=int, help='ReviewCycle id; rows must have employee_email')
+        parser.add_argument('--format', choices=[FORMAT_CSV, FORMAT_JSONL])
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        review = cycle = None
+        try:
+            if options['review']:
+                review = PerfReview.objects.select_related('team').get(id=options['review'])
+            else:
+                cycle = ReviewCycle.objects.get(id=options['cycle'])
+        except (PerfReview.DoesNotExist, ReviewCycle.DoesNotExist) as e:
+            raise CommandError(str(e))
+
+        import_format = options['format'] or guess_format(options['path'])
+        with open(options['path'], encoding='utf-8-sig', newline='') as f:
+            result = import_achievements(
+                read_rows(f, import_format), review=review, cycle=cycle, chunk_size=options['chunk_size']
+            )
+
+        for line, message in result.errors:
+            self.stderr.write(f"line {line}: {message}")
+        self.stdout.write(f"Created {result.created} achievements, {len(result.errors)} row(s) rejected")
@@ -0,0 +1,42 @@
+import time
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from reviews.cycles import CHUNK_SIZE, close_due_cycles, process_cycle_chunk
+from reviews.models import ReviewCycle
+
+
+class Command(BaseCommand):
+    help = 'Fan out started review cycles into reviews in chunks and close due cycles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new cycles instead of exiting when idle',
+        )
+        parser.add_argument('--interval', type=float, default=5.0, help='Polling interval with --loop, seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            self.process_once(options['chunk_size'])
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def process_once(self, chunk_size):
+        cycle_ids = list(
+            ReviewCycle.objects.filter(
+                status__in=[ReviewCycle.STATUS_PENDING, ReviewCycle.STATUS_RUNNING],
+                starts_on__lte=timezone.localdate()
+            ).order_by('id').values_list('id', flat=True)
+        )
+        for cycle_id in cycle_ids:
+            chunks = 0
+            while process_cycle_chunk(cycle_id, chunk_size):
+                chunks += 1
+            self.stdout.write(f"Cycle {cycle_id}: processed {chunks} chunk(s)")
+
+        closed = close_due_cycles()
+        if closed:
+            self.stdout.write(f"Closed {closed} cycle(s)")
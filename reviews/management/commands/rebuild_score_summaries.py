@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from reviews.aggregates import rebuild_summaries, verify_summaries
+
+
+class Command(BaseCommand):
+    help = 'Rebuild achievement and review score summaries from raw scores, or verify them'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify-only',
+            action='store_true',
+            help='Only compare stored summaries with raw scores, do not rebuild',
+        )
+
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            achievements, reviews = rebuild_summaries()
+            self.stdout.write(
+                f"Rebuilt {achievements} achievement summaries and {reviews} review summaries"
+            )
+
+        bad_achievements, bad_reviews = verify_summaries()
+        if bad_achievements or bad_reviews:
+            raise CommandError(
+                f"Summary mismatch: achievements {bad_achievements[:20]}, reviews {bad_reviews[:20]}"
+            )
+        self.stdout.write(self.style.SUCCESS('Score summaries are consistent'))
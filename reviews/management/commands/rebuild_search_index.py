@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from reviews.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = 'Create missing full-text search objects for achievements and score comments and reindex them'
+
+    def handle(self, *args, **options):
+        install_search_index(connection)
+        self.stdout.write(self.style.SUCCESS(f'Search index rebuilt ({connection.vendor})'))
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0002_alter_perfreview_user"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="perfreview",
+            name="is_closed",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="perfreview",
+            index=models.Index(
+                fields=["team", "is_closed", "user"], name="perfreview_team_open_idx"
+            ),
+        ),
+    ]
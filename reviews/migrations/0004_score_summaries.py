@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0003_perfreview_is_closed"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AchievementScoreSummary",
+            fields=[
+                (
+                    "achievement",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="score_summary",
+                        serialize=False,
+                        to="reviews.achievement",
+                    ),
+                ),
+                ("score_count", models.PositiveIntegerField(default=0)),
+                ("score_total", models.PositiveIntegerField(default=0)),
+                ("min_score", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("max_score", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("mean_score", models.FloatField(blank=True, null=True)),
+                ("self_peer_gap", models.FloatField(blank=True, null=True)),
+                ("edited", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Achievement Score Summaries",
+            },
+        ),
+        migrations.CreateModel(
+            name="ReviewScoreSummary",
+            fields=[
+                (
+                    "perfreview",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="score_summary",
+                        serialize=False,
+                        to="reviews.perfreview",
+                    ),
+                ),
+                ("score_count", models.PositiveIntegerField(default=0)),
+                ("score_total", models.PositiveIntegerField(default=0)),
+                ("min_score", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("max_score", models.PositiveSmallIntegerField(blank=True, null=True)),
+                ("mean_score", models.FloatField(blank=True, null=True)),
+                ("self_peer_gap", models.FloatField(blank=True, null=True)),
+                ("edited", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Review Score Summaries",
+            },
+        ),
+    ]
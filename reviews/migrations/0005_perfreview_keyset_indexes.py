@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0004_score_summaries"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="perfreview",
+            index=models.Index(
+                fields=["user", "-created", "-id"], name="perfreview_user_keyset_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="perfreview",
+            index=models.Index(
+                fields=["team", "-created", "-id"], name="perfreview_team_keyset_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,64 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:54
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("reviews", "0005_perfreview_keyset_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PendingScore",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                (
+                    "achievement",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pending_scores",
+                        to="reviews.achievement",
+                    ),
+                ),
+                (
+                    "perfreview",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pending_scores",
+                        to="reviews.perfreview",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pending_scores",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Pending Scores",
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-created"], name="pendingscore_user_idx"
+                    )
+                ],
+                "unique_together": {("user", "achievement")},
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+from django.db import migrations
+from django.db.models import Exists, OuterRef
+
+BATCH_SIZE = 1000
+
+
+def backfill_pending_scores(apps, schema_editor):
+    Achievement = apps.get_model("reviews", "Achievement")
+    AchievementScore = apps.get_model("reviews", "AchievementScore")
+    PendingScore = apps.get_model("reviews", "PendingScore")
+    Reviewers = Achievement.reviewers.through
+
+    scored = AchievementScore.objects.filter(
+        achievement_id=OuterRef("achievement_id"), user_id=OuterRef("user_id")
+    )
+    rows = (
+        Reviewers.objects.filter(~Exists(scored))
+        .values_list("user_id", "achievement_id", "achievement__perfreview_id")
+        .order_by("id")
+    )
+    batch = []
+    for user_id, achievement_id, perfreview_id in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(
+            PendingScore(
+                user_id=user_id, achievement_id=achievement_id, perfreview_id=perfreview_id
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            PendingScore.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        PendingScore.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0006_pending_scores"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_pending_scores, migrations.RunPython.noop),
+    ]
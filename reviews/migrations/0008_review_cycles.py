@@ -0,0 +1,95 @@
+# Generated by Django 4.2.7 on 2026-10-18 12:56
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("companies", "0002_alter_company_users_alter_companyusers_company_and_more"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("reviews", "0007_backfill_pending_scores"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReviewCycle",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=255)),
+                ("starts_on", models.DateField()),
+                ("closes_on", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pending"),
+                            ("running", "Running"),
+                            ("done", "Launched"),
+                            ("closed", "Closed"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                    ),
+                ),
+                ("members_total", models.PositiveIntegerField(default=0)),
+                ("members_processed", models.PositiveIntegerField(default=0)),
+                ("reviews_created", models.PositiveIntegerField(default=0)),
+                ("last_membership_id", models.BigIntegerField(default=0)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("edited", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="reviewcycle",
+            name="company",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="review_cycles",
+                to="companies.company",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reviewcycle",
+            name="created_by",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="created_cycles",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="perfreview",
+            name="cycle",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="reviews",
+                to="reviews.reviewcycle",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="reviewcycle",
+            index=models.Index(fields=["status", "id"], name="reviewcycle_status_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="perfreview",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("cycle__isnull", False)),
+                fields=("cycle", "user", "team"),
+                name="perfreview_unique_per_cycle",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def install(apps, schema_editor):
+    from reviews.search import install_search_index
+
+    install_search_index(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    from reviews.search import drop_search_index
+
+    drop_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0008_review_cycles"),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
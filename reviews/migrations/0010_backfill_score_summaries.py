@@ -0,0 +1,80 @@
+from django.db import migrations
+from django.db.models import Avg, Count, Max, Min, Sum
+
+BATCH_SIZE = 1000
+SUMMARY_FIELDS = ["score_count", "score_total", "min_score", "max_score", "mean_score", "self_peer_gap", "edited"]
+
+
+def _flush(model, batch, unique_field):
+    # Сводки, созданные сигналами до бэкфилла, могли считать дельты от пустой строки — перезаписываем
+    model.objects.bulk_create(
+        batch, update_conflicts=True, unique_fields=[unique_field], update_fields=SUMMARY_FIELDS
+    )
+
+
+def backfill_score_summaries(apps, schema_editor):
+    AchievementScore = apps.get_model("reviews", "AchievementScore")
+    AchievementScoreSummary = apps.get_model("reviews", "AchievementScoreSummary")
+    ReviewScoreSummary = apps.get_model("reviews", "ReviewScoreSummary")
+
+    rows = (
+        AchievementScore.objects.values("achievement_id", "achievement__self_score")
+        .annotate(count=Count("id"), total=Sum("score"), low=Min("score"), high=Max("score"))
+        .order_by("achievement_id")
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        mean = row["total"] / row["count"]
+        batch.append(
+            AchievementScoreSummary(
+                achievement_id=row["achievement_id"],
+                score_count=row["count"],
+                score_total=row["total"],
+                min_score=row["low"],
+                max_score=row["high"],
+                mean_score=mean,
+                self_peer_gap=mean - row["achievement__self_score"],
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            _flush(AchievementScoreSummary, batch, "achievement")
+            batch = []
+    if batch:
+        _flush(AchievementScoreSummary, batch, "achievement")
+
+    rows = (
+        AchievementScoreSummary.objects.filter(score_count__gt=0)
+        .values("achievement__perfreview_id")
+        .annotate(count=Sum("score_count"), total=Sum("score_total"), low=Min("min_score"),
+                  high=Max("max_score"), gap=Avg("self_peer_gap"))
+        .order_by("achievement__perfreview_id")
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(
+            ReviewScoreSummary(
+                perfreview_id=row["achievement__perfreview_id"],
+                score_count=row["count"],
+                score_total=row["total"],
+                min_score=row["low"],
+                max_score=row["high"],
+                mean_score=row["total"] / row["count"],
+                self_peer_gap=row["gap"],
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            _flush(ReviewScoreSummary, batch, "perfreview")
+            batch = []
+    if batch:
+        _flush(ReviewScoreSummary, batch, "perfreview")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reviews", "0009_search_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_score_summaries, migrations.RunPython.noop),
+    ]
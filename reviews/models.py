@@ -1,17 +1,83 @@
 from django.db import models
+from django.utils import timezone
 from accounts.models import User
+from companies.models import Company
 from teams.models import Team
 
+class ReviewCycle(models.Model):
+    """A company-wide review round; its reviews are created in chunks by reviews.cycles."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_CLOSED = 'closed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Launched'),
+        (STATUS_CLOSED, 'Closed'),
+    ]
+    
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='review_cycles')
+    name = models.CharField(max_length=255)
+    starts_on = models.DateField()
+    closes_on = models.DateField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_cycles')
+    # Прогресс рассылки: курсор по TeamUsers.id позволяет продолжить с места остановки
+    members_total = models.PositiveIntegerField(default=0)
+    members_processed = models.PositiveIntegerField(default=0)
+    reviews_created = models.PositiveIntegerField(default=0)
+    last_membership_id = models.BigIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+    edited = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='reviewcycle_status_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.name} ({self.company.company_name})"
+    
+    @property
+    def is_scheduled(self):
+        """A pending cycle whose start date has not come yet."""
+        return self.status == self.STATUS_PENDING and self.starts_on > timezone.localdate()
+    
+    @property
+    def progress_percent(self):
+        if not self.members_total:
+            return 100 if self.status in (self.STATUS_DONE, self.STATUS_CLOSED) else 0
+        return min(100, self.members_processed * 100 // self.members_total)
+
 class PerfReview(models.Model):
     """Performance review model for tracking user reviews in teams."""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='perfreview_set')
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='reviews')
+    cycle = models.ForeignKey(
+        ReviewCycle, on_delete=models.SET_NULL, null=True, blank=True, related_name='reviews'
+    )
+    is_closed = models.BooleanField(default=False)
     created = models.DateTimeField(auto_now_add=True)
     edited = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name_plural = 'Performance Reviews'
         unique_together = ('user', 'team', 'created')
+        constraints = [
+            # Одно перфревью на сотрудника и команду в рамках цикла
+            models.UniqueConstraint(
+                fields=['cycle', 'user', 'team'],
+                condition=models.Q(cycle__isnull=False),
+                name='perfreview_unique_per_cycle',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['team', 'is_closed', 'user'], name='perfreview_team_open_idx'),
+            # Keyset-пагинация списка перфревью по (created, id)
+            models.Index(fields=['user', '-created', '-id'], name='perfreview_user_keyset_idx'),
+            models.Index(fields=['team', '-created', '-id'], name='perfreview_team_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"Review for {self.user.user_name} in {self.team.team_name}"
@@ -46,3 +112,60 @@ class AchievementScore(models.Model):
     
     def __str__(self):
         return f"Score for {self.achievement} by {self.user.user_name}"
+
+class AchievementScoreSummary(models.Model):
+    """Denormalized score aggregates for an achievement, maintained by reviews.aggregates."""
+    achievement = models.OneToOneField(
+        Achievement, on_delete=models.CASCADE, primary_key=True, related_name='score_summary'
+    )
+    score_count = models.PositiveIntegerField(default=0)
+    score_total = models.PositiveIntegerField(default=0)
+    min_score = models.PositiveSmallIntegerField(null=True, blank=True)
+    max_score = models.PositiveSmallIntegerField(null=True, blank=True)
+    mean_score = models.FloatField(null=True, blank=True)
+    # Средняя оценка ревьюеров минус самооценка
+    self_peer_gap = models.FloatField(null=True, blank=True)
+    edited = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'Achievement Score Summaries'
+    
+    def __str__(self):
+        return f"Summary for {self.achievement}"
+
+class ReviewScoreSummary(models.Model):
+    """Denormalized score aggregates for a whole review, rolled up from achievement summaries."""
+    perfreview = models.OneToOneField(
+        PerfReview, on_delete=models.CASCADE, primary_key=True, related_name='score_summary'
+    )
+    score_count = models.PositiveIntegerField(default=0)
+    score_total = models.PositiveIntegerField(default=0)
+    min_score = models.PositiveSmallIntegerField(null=True, blank=True)
+    max_score = models.PositiveSmallIntegerField(null=True, blank=True)
+    mean_score = models.FloatField(null=True, blank=True)
+    # Средний разрыв между оценкой ревьюеров и самооценкой по оценённым достижениям
+    self_peer_gap = models.FloatField(null=True, blank=True)
+    edited = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = 'Review Score Summaries'
+    
+    def __str__(self):
+        return f"Summary for {self.perfreview}"
+
+class PendingScore(models.Model):
+    """Achievement a reviewer still has to score; kept in sync by reviews.inbox."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pending_scores')
+    achievement = models.ForeignKey(Achievement, on_delete=models.CASCADE, related_name='pending_scores')
+    perfreview = models.ForeignKey(PerfReview, on_delete=models.CASCADE, related_name='pending_scores')
+    created = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        verbose_name_plural = 'Pending Scores'
+        unique_together = ('user', 'achievement')
+        indexes = [
+            models.Index(fields=['user', '-created'], name='pendingscore_user_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.email} → {self.achievement}"
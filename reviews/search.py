@@ -0,0 +1,224 @@
+import re
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import BooleanField, CharField, Exists, F, FloatField, OuterRef, Q, Value
+from django.db.models.expressions import RawSQL
+from accounts.permissions import get_membership_map
+from .models import Achievement, AchievementScore
+
+SEARCH_PAGE_SIZE = 20
+
+KIND_ACHIEVEMENT = 'achievement'
+KIND_COMMENT = 'comment'
+
+# (таблица, индексируемая колонка) для каждого вида документов
+SEARCH_TABLES = {
+    KIND_ACHIEVEMENT: ('reviews_achievement', 'title'),
+    KIND_COMMENT: ('reviews_achievementscore', 'comment'),
+}
+
+WORD = re.compile(r'\w+')
+
+
+def _postgres_index_sql(table, column):
+    # Генерируемая колонка пересчитывается самой БД при любой записи, включая bulk_create
+    return [
+        f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('russian', coalesce({column}, ''))) STORED",
+        f"CREATE INDEX IF NOT EXISTS {table}_search_idx ON {table} USING gin (search_vector)",
+    ]
+
+
+def _sqlite_index_sql(table, column):
+    # External-content FTS5 таблица, синхронизируемая триггерами
+    fts = f"{table}_fts"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def _sqlite_drop_sql(table, column):
+    fts = f"{table}_fts"
+    return [
+        f"DROP TRIGGER IF EXISTS {fts}_ai",
+        f"DROP TRIGGER IF EXISTS {fts}_ad",
+        f"DROP TRIGGER IF EXISTS {fts}_au",
+        f"DROP TABLE IF EXISTS {fts}",
+    ]
+
+
+def _postgres_drop_sql(table, column):
+    return [
+        f"DROP INDEX IF EXISTS {table}_search_idx",
+        f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector",
+    ]
+
+
+def _run(conn, builder):
+    with conn.cursor() as cursor:
+        for table, column in SEARCH_TABLES.values():
+            for sql in builder(table, column):
+                cursor.execute(sql)
+
+
+def install_search_index(conn=connection):
+    """
+    Create (or repair) the full-text index and rebuild it from current rows.
+
+    Idempotent. On SQLite, migrations that rebuild reviews_achievement or
+    reviews_achievementscore drop the sync triggers; run the
+    rebuild_search_index command after such migrations.
+    """
+    if conn.vendor == 'postgresql':
+        _run(conn, _postgres_index_sql)
+    elif conn.vendor == 'sqlite':
+        _run(conn, _sqlite_index_sql)
+
+
+def drop_search_index(conn=connection):
+    if conn.vendor == 'postgresql':
+        _run(conn, _postgres_drop_sql)
+    elif conn.vendor == 'sqlite':
+        _run(conn, _sqlite_drop_sql)
+
+
+def _fts5_query(query):
+    """Turn user input into a safe FTS5 query: every word as a quoted prefix, all required."""
+    return ' '.join(f'"{word}"*' for word in WORD.findall(query))
+
+
+def _match_and_rank(kind, query):
+    """Return (filter expression, rank expression) for documents of a kind on the current backend."""
+    table, column = SEARCH_TABLES[kind]
+    if connection.vendor == 'postgresql':
+        tsquery = "websearch_to_tsquery('russian', %s)"
+        return (
+            RawSQL(f'"{table}"."search_vector" @@ {tsquery}', [query], output_field=BooleanField()),
+            RawSQL(f'ts_rank("{table}"."search_vector", {tsquery})', [query], output_field=FloatField()),
+        )
+    if connection.vendor == 'sqlite':
+        fts = f"{table}_fts"
+        match = _fts5_query(query)
+        return (
+            RawSQL(
+                f'"{table}"."id" IN (SELECT rowid FROM {fts} WHERE {fts} MATCH %s)',
+                [match], output_field=BooleanField()
+            ),
+            # bm25 тем меньше, чем релевантнее документ
+            RawSQL(
+                f'(SELECT -bm25({fts}) FROM {fts} WHERE {fts} MATCH %s AND rowid = "{table}"."id")',
+                [match], output_field=FloatField()
+            ),
+        )
+    return Q(**{f'{column}__icontains': query}), Value(0.0, output_field=FloatField())
+
+
+def match_filter(kind, query):
+    """Full-text filter for a queryset of the kind's model (used by the admin search)."""
+    return _match_and_rank(kind, query)[0]
+
+
+def visible_reviews_q(user, prefix=''):
+    """
+    Q limiting rows to reviews the user may view, mirroring PermissionResolver.can_view_review.
+
+    prefix is the lookup path to PerfReview from the queried model, e.g.
+    'perfreview'; leave it empty to filter PerfReview itself.
+    """
+    def lookup(name):
+        return f'{prefix}__{name}' if prefix else name
+
+    membership = get_membership_map(user.id)
+    managed_teams = [
+        team_id for team_id, (is_manager, is_owner) in membership['teams'].items() if is_manager or is_owner
+    ]
+    managed_companies = [
+        company_id for company_id, (is_manager, is_owner) in membership['companies'].items() if is_manager or is_owner
+    ]
+    reviewing = Achievement.reviewers.through.objects.filter(
+        achievement__perfreview=OuterRef(prefix or 'pk'), user=user
+    )
+    return (
+        Q(**{lookup('user'): user})
+        | Q(**{lookup('team_id__in'): managed_teams})
+        | Q(**{lookup('team__company_id__in'): managed_companies})
+        | Exists(reviewing)
+    )
+
+
+def search_queryset(user, query):
+    """
+    Ranked union of matching achievements and score comments the user may see.
+
+    Yields (kind, hit_id, rank) tuples ordered by relevance.
+    """
+    match, rank = _match_and_rank(KIND_ACHIEVEMENT, query)
+    achievements = Achievement.objects.filter(match).filter(visible_reviews_q(user, 'perfreview')).annotate(
+        kind=Value(KIND_ACHIEVEMENT, output_field=CharField()), hit_id=F('id'), rank=rank
+    ).values_list('kind', 'hit_id', 'rank')
+
+    match, rank = _match_and_rank(KIND_COMMENT, query)
+    comments = AchievementScore.objects.filter(match).filter(
+        visible_reviews_q(user, 'achievement__perfreview')
+    ).annotate(
+        kind=Value(KIND_COMMENT, output_field=CharField()), hit_id=F('id'), rank=rank
+    ).values_list('kind', 'hit_id', 'rank')
+
+    return achievements.union(comments, all=True).order_by('-rank', 'kind', '-hit_id')
+
+
+class SearchHit:
+    """One search result: the achievement and, for comment hits, the matching score."""
+
+    def __init__(self, kind, achievement, score, rank):
+        self.kind = kind
+        self.achievement = achievement
+        self.score = score
+        self.rank = rank
+
+    @property
+    def is_comment(self):
+        return self.kind == KIND_COMMENT
+
+
+def search_page(user, query, page_number=1, page_size=SEARCH_PAGE_SIZE):
+    """
+    Return a Paginator page of SearchHit objects for the query.
+
+    The page costs a count, the ranked union and two lookups by id,
+    whatever the page size.
+    """
+    query = query.strip()
+    if connection.vendor == 'sqlite' and not _fts5_query(query):
+        query = ''
+    rows = search_queryset(user, query) if query else Achievement.objects.none()
+    page = Paginator(rows, page_size).get_page(page_number)
+
+    rows = list(page.object_list)
+    achievement_ids = [hit_id for kind, hit_id, _ in rows if kind == KIND_ACHIEVEMENT]
+    score_ids = [hit_id for kind, hit_id, _ in rows if kind == KIND_COMMENT]
+    achievements = Achievement.objects.select_related(
+        'perfreview__user', 'perfreview__team'
+    ).in_bulk(achievement_ids)
+    scores = AchievementScore.objects.select_related(
+        'user', 'achievement__perfreview__user', 'achievement__perfreview__team'
+    ).in_bulk(score_ids)
+
+    hits = []
+    for kind, hit_id, rank in rows:
+        if kind == KIND_ACHIEVEMENT:
+            hits.append(SearchHit(kind, achievements[hit_id], None, rank))
+        else:
+            score = scores[hit_id]
+            hits.append(SearchHit(kind, score.achievement, score, rank))
+    page.object_list = hits
+    return page
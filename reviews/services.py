@@ -0,0 +1,158 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Prefetch
+from django.shortcuts import get_object_or_404
+from .models import PerfReview, Achievement, AchievementScore
+from .aggregates import refresh_achievement_summaries
+from .inbox import remove_pending
+from teams.models import Team, TeamUsers
+from notifications.events import reviews_launched, scores_submitted
+from perfecto.fragments import SCOPE_REVIEW, SCOPE_TEAM, bump_versions
+from accounts.counters import invalidate_counters
+
+# Размер пачки для bulk_create при массовом запуске перфревью
+LAUNCH_BATCH_SIZE = 500
+
+
+def launch_team_reviews(team, batch_size=LAUNCH_BATCH_SIZE):
+    """
+    Create a PerfReview for every team member in one batched write.
+
+    Members who already have an open review in this team are skipped, so
+    repeated launches (e.g. a double click) do not create duplicates.
+    Returns a summary dict with 'members', 'created' and 'skipped' counts.
+    """
+    with transaction.atomic():
+        # Блокируем строку команды, чтобы параллельные запуски шли по очереди
+        Team.objects.select_for_update().filter(id=team.id).exists()
+
+        member_ids = set(
+            TeamUsers.objects.filter(team=team).values_list('user_id', flat=True)
+        )
+        open_ids = set(
+            PerfReview.objects.filter(
+                team=team, is_closed=False, user_id__in=member_ids
+            ).values_list('user_id', flat=True)
+        )
+        new_reviews = [
+            PerfReview(user_id=user_id, team=team)
+            for user_id in sorted(member_ids - open_ids)
+        ]
+        PerfReview.objects.bulk_create(new_reviews, batch_size=batch_size)
+        reviews_launched((review.user_id, team.id) for review in new_reviews)
+        bump_versions(SCOPE_TEAM, [team.id])
+        invalidate_counters(review.user_id for review in new_reviews)
+
+    return {
+        'members': len(member_ids),
+        'created': len(new_reviews),
+        'skipped': len(open_ids),
+    }
+
+
+def _score_summary(obj):
+    """Return the materialized score summary of a review/achievement, or None."""
+    try:
+        return obj.score_summary
+    except ObjectDoesNotExist:
+        return None
+
+
+def load_review(review_id):
+    """Load a review with its team, company, subject and score summary attached."""
+    review = get_object_or_404(
+        PerfReview.objects.select_related('user', 'team', 'team__company', 'score_summary'),
+        id=review_id
+    )
+    review.summary = _score_summary(review)
+    return review
+
+
+def load_review_achievements(review, user):
+    """
+    Load the review's achievements with everything perfreview_detail renders.
+
+    Each achievement gets precomputed attributes for the template:
+    reviewer_list, score_list (with score.user loaded), summary (score
+    aggregates or None), user_is_reviewer and user_has_scored for the given
+    user. Costs a fixed number of queries whatever the review size.
+    """
+    achievements = list(
+        review.achievements.select_related('score_summary').order_by('id').prefetch_related(
+            'reviewers',
+            Prefetch(
+                'scores',
+                queryset=AchievementScore.objects.select_related('user').order_by('id')
+            ),
+        )
+    )
+    
+    for achievement in achievements:
+        achievement.reviewer_list = list(achievement.reviewers.all())
+        achievement.score_list = list(achievement.scores.all())
+        achievement.summary = _score_summary(achievement)
+        achievement.user_is_reviewer = any(r.id == user.id for r in achievement.reviewer_list)
+        achievement.user_has_scored = any(s.user_id == user.id for s in achievement.score_list)
+    
+    return achievements
+
+
+def assigned_achievements(review, user):
+    """Achievements of the review the user is a reviewer for, with the user's existing score attached."""
+    achievements = list(
+        Achievement.objects.filter(perfreview=review, reviewers=user).order_by('id')
+    )
+    scores = {
+        score.achievement_id: score
+        for score in AchievementScore.objects.filter(
+            achievement__in=achievements, user=user
+        )
+    }
+    for achievement in achievements:
+        achievement.user_score = scores.get(achievement.id)
+    return achievements
+
+
+def save_batch_scores(review, user, achievements, entries):
+    """
+    Upsert the user's scores for several achievements in one transaction.
+
+    achievements are the ones returned by assigned_achievements(); entries is
+    a list of (achievement_id, score, comment). Changed and new scores are
+    written with a single INSERT ... ON CONFLICT (achievement, user) UPDATE,
+    which also keeps a double submit from failing on the unique constraint.
+    Returns a dict with 'created' and 'updated' counts.
+    """
+    by_id = {achievement.id: achievement for achievement in achievements}
+    rows = []
+    created = updated = 0
+    
+    for achievement_id, score, comment in entries:
+        existing = by_id[achievement_id].user_score
+        if existing is None:
+            created += 1
+        elif existing.score != score or existing.comment != comment:
+            updated += 1
+        else:
+            continue
+        rows.append(AchievementScore(
+            achievement_id=achievement_id, user=user, score=score, comment=comment
+        ))
+    
+    if rows:
+        with transaction.atomic():
+            AchievementScore.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['achievement', 'user'],
+                update_fields=['score', 'comment', 'edited'],
+            )
+            achievement_ids = [row.achievement_id for row in rows]
+            refresh_achievement_summaries(achievement_ids, review.id)
+            remove_pending([user.id], achievement_ids)
+            scores_submitted(review, user, created)
+            # bulk_create не шлёт post_save, версии фрагментов ревью и команды сбрасываем сами
+            bump_versions(SCOPE_REVIEW, [review.id])
+            bump_versions(SCOPE_TEAM, [review.team_id])
+    
+    return {'created': created, 'updated': updated}
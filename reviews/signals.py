@@ -0,0 +1,110 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_init, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from .models import Achievement, AchievementScore, PerfReview
+from .aggregates import apply_score_change, apply_self_score_change, rollup_review
+from . import inbox
+from notifications import events
+from perfecto.fragments import SCOPE_REVIEW, SCOPE_TEAM, bump_versions
+
+
+@receiver(post_init, sender=AchievementScore)
+def remember_loaded_score(sender, instance, **kwargs):
+    """Keep the score as loaded from the DB to compute deltas on save."""
+    instance._loaded_score = instance.score if instance.pk else None
+
+
+@receiver(post_save, sender=AchievementScore)
+def update_summaries_on_score_save(sender, instance, created, **kwargs):
+    old_score = None if created else instance._loaded_score
+    if old_score != instance.score or created:
+        apply_score_change(instance.achievement, old_score, instance.score)
+    instance._loaded_score = instance.score
+    if created:
+        inbox.remove_pending([instance.user_id], [instance.achievement_id])
+
+
+@receiver(post_delete, sender=AchievementScore)
+def update_summaries_on_score_delete(sender, instance, origin=None, **kwargs):
+    apply_score_change(instance.achievement, instance._loaded_score, None)
+    # Возвращаем достижение во входящие, только если удаляли саму оценку, а не каскадом
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if origin_model is AchievementScore and instance.achievement.reviewers.filter(id=instance.user_id).exists():
+        inbox.add_pending([(instance.user_id, instance.achievement_id)])
+
+
+@receiver(post_init, sender=Achievement)
+def remember_loaded_self_score(sender, instance, **kwargs):
+    instance._loaded_self_score = instance.self_score if instance.pk else None
+
+
+@receiver(post_save, sender=Achievement)
+def update_gap_on_self_score_change(sender, instance, created, **kwargs):
+    if not created and instance._loaded_self_score != instance.self_score:
+        apply_self_score_change(instance)
+    instance._loaded_self_score = instance.self_score
+
+
+@receiver(post_delete, sender=Achievement)
+def rollup_review_on_achievement_delete(sender, instance, **kwargs):
+    # Сводка достижения удаляется каскадом раньше его оценок, и apply_score_change
+    # не доходит до ревью — пересчитываем его по оставшимся сводкам
+    rollup_review(instance.perfreview_id, create=False)
+
+
+@receiver(m2m_changed, sender=Achievement.reviewers.through)
+def sync_inbox_on_reviewers_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep the reviewer inbox in sync with Achievement.reviewers (either side of the M2M)."""
+    if action == 'post_add':
+        if reverse:
+            pairs = [(instance.id, achievement_id) for achievement_id in pk_set]
+        else:
+            pairs = [(user_id, instance.id) for user_id in pk_set]
+        inbox.add_pending(pairs)
+        events.reviewers_assigned(pairs)
+    elif action == 'post_remove':
+        if reverse:
+            inbox.remove_pending([instance.id], pk_set)
+        else:
+            inbox.remove_pending(pk_set, [instance.id])
+    elif action == 'pre_clear':
+        if reverse:
+            inbox.clear_pending(user_id=instance.id)
+        else:
+            inbox.clear_pending(achievement_id=instance.id)
+
+
+def _bump_team_of_review(review_id):
+    # Достижения и оценки попадают в статистику состава на странице команды
+    bump_versions(SCOPE_TEAM, PerfReview.objects.filter(id=review_id).values_list('team_id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Achievement)
+def bump_review_version_on_achievement(sender, instance, **kwargs):
+    bump_versions(SCOPE_REVIEW, [instance.perfreview_id])
+    _bump_team_of_review(instance.perfreview_id)
+
+
+@receiver([post_save, post_delete], sender=AchievementScore)
+def bump_review_version_on_score(sender, instance, **kwargs):
+    review_id = instance.achievement.perfreview_id
+    bump_versions(SCOPE_REVIEW, [review_id])
+    _bump_team_of_review(review_id)
+
+
+@receiver(m2m_changed, sender=Achievement.reviewers.through)
+def bump_review_version_on_reviewers(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        bump_versions(SCOPE_REVIEW, [instance.perfreview_id])
+    elif action == 'pre_clear':
+        bump_versions(SCOPE_REVIEW, instance.reviewing_achievements.values_list('perfreview_id', flat=True))
+    elif pk_set:
+        bump_versions(SCOPE_REVIEW, Achievement.objects.filter(id__in=pk_set).values_list('perfreview_id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=PerfReview)
+def bump_team_version_on_review(sender, instance, **kwargs):
+    # Страница команды показывает открытые ревью участников, поэтому сбрасываем и при правке
+    bump_versions(SCOPE_TEAM, [instance.team_id])
@@ -0,0 +1,28 @@
+from django.utils import timezone
+from jobs.queue import enqueue, task
+from .cycles import cycle_start_moment, run_cycle
+from .models import ReviewCycle
+
+RUN_CYCLE_TASK = 'reviews.run_cycle'
+
+
+@task(RUN_CYCLE_TASK)
+def run_cycle_task(cycle_id):
+    cycle = ReviewCycle.objects.filter(id=cycle_id).first()
+    if cycle is None:
+        return
+    if cycle.is_scheduled:
+        # Задачу запустили раньше даты старта (например, «Retry now» в админке) — откладываем снова
+        queue_cycle(cycle)
+        return
+    # Цикл продолжается с сохранённого курсора, поэтому повтор после сбоя безопасен
+    run_cycle(cycle_id)
+
+
+def queue_cycle(cycle):
+    """Hand a cycle to the background workers, scheduled for its start date."""
+    start = cycle_start_moment(cycle)
+    return enqueue(
+        RUN_CYCLE_TASK, {'cycle_id': cycle.id}, key=f"cycle:{cycle.id}",
+        run_at=start if start > timezone.now() else None
+    )
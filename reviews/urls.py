@@ -3,9 +3,18 @@ from . import views
 
 urlpatterns = [
     path('', views.perfreview_list, name='perfreview_list'),
+    path('inbox/', views.review_inbox, name='review_inbox'),
+    path('search/', views.review_search, name='review_search'),
     path('team/<int:team_id>/create/', views.perfreviews_create, name='perfreview_create_team'),
     path('team/<int:team_id>/user/<int:user_id>/create/', views.perfreviews_create, name='perfreview_create_user'),
     path('<int:review_id>/', views.perfreview_detail, name='perfreview_detail'),
     path('<int:review_id>/achievement/create/', views.achievement_create, name='achievement_create'),
+    path('<int:review_id>/achievement/import/', views.achievement_import, name='achievement_import'),
+    path('<int:review_id>/score/', views.achievement_score_batch, name='achievement_score_batch'),
     path('achievement/<int:achievement_id>/score/', views.achievement_score, name='achievement_score'),
+    path('company/<int:company_id>/cycles/create/', views.review_cycle_create, name='review_cycle_create'),
+    path('team/<int:team_id>/export/', views.review_export_team, name='review_export_team'),
+    path('company/<int:company_id>/export/', views.review_export_company, name='review_export_company'),
+    path('cycles/<int:cycle_id>/', views.review_cycle_detail, name='review_cycle_detail'),
+    path('cycles/<int:cycle_id>/import/', views.review_cycle_import, name='review_cycle_import'),
 ]
@@ -1,37 +1,53 @@
 from django.shortcuts import render, redirect, get_object_or_404
+from django.core.paginator import Paginator
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
-from .models import PerfReview, Achievement, AchievementScore
-from .forms import PerfReviewForm, AchievementForm, AchievementScoreForm
-from teams.models import Team, TeamUsers
-from companies.models import CompanyUsers
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+from django.contrib import messages
+from django.db.models import Exists
+from django.utils.functional import SimpleLazyObject
+from .models import PerfReview, Achievement, AchievementScore, ReviewCycle
+from .forms import (
+    PerfReviewForm, AchievementForm, AchievementScoreForm, BatchScoreFormSet, ReviewCycleForm,
+    AchievementImportForm
+)
+from . import listing
+from .cycles import start_cycle
+from .tasks import queue_cycle
+from notifications.events import reviews_launched, scores_submitted
+from .exports import FORMAT_CSV, FORMATS, export_rows, stream_export
+from .imports import decode_lines, guess_format, import_achievements, read_rows
+from .search import search_page
+from .inbox import pending_for_user
+from .services import (
+    launch_team_reviews, load_review, load_review_achievements, assigned_achievements, save_batch_scores
+)
+from teams.models import Team
+from companies.models import Company
 from accounts.models import User
+from accounts.permissions import get_permissions
+from perfecto.conditional import conditional_page, page_stamp, stamp
+from perfecto.fragments import SCOPE_REVIEW, fragment_context
+from perfecto.instrumentation import query_budget
 
 @login_required
+@query_budget(15)
 def perfreview_list(request):
-    """Display performance reviews."""
-    # Мои перфревью
-    my_reviews = PerfReview.objects.filter(user=request.user)
+    """Display performance reviews in three keyset-paginated tabs."""
+    tab = request.GET.get('tab')
     
-    # Перфревью на оценку (где я ревьюер)
-    managed_reviews = PerfReview.objects.filter(
-        achievements__reviewers=request.user
-    ).distinct().exclude(user=request.user)
+    # HTMX "Загрузить ещё": отдаём только следующую страницу одной вкладки
+    if request.htmx and tab in listing.TABS:
+        page = listing.review_page(tab, request.user, cursor=request.GET.get('cursor'))
+        return render(request, 'reviews/_perfreview_rows.html', {'page': page, 'tab': tab})
     
-    # Перфревью команды (где я менеджер или владелец)
-    # Было: teams_managed = Team.objects.filter(teamusers__user=request.user, teamusers__is_manager=True)
-    # Заменяем на:
-    teams_managed = Team.objects.filter(team_users__user=request.user, team_users__is_manager=True)
-    
-    team_reviews = PerfReview.objects.filter(
-        team__in=teams_managed
-    ).exclude(user=request.user)
-    
-    context = {
-        'my_reviews': my_reviews,
-        'managed_reviews': managed_reviews,
-        'team_reviews': team_reviews,
-    }
+    context = {}
+    for tab, name in (
+        (listing.TAB_MY, 'my_reviews'),              # Мои перфревью
+        (listing.TAB_REVIEWING, 'managed_reviews'),  # Перфревью на оценку (где я ревьюер)
+        (listing.TAB_TEAM, 'team_reviews'),          # Перфревью команды (где я менеджер)
+    ):
+        context[name] = listing.review_page(tab, request.user)
+        context[f'{name}_count'] = listing.tab_queryset(tab, request.user).count()
     
     return render(request, 'reviews/perfreview_list.html', context)
 
@@ -43,23 +59,16 @@ def perfreviews_create(request, team_id=None, user_id=None):
         # Team review
         team = get_object_or_404(Team, id=team_id)
         # Check permissions
-        try:
-            team_user = TeamUsers.objects.get(user=request.user, team=team)
-            if not team_user.is_manager and not team_user.is_owner:
-                # Check if user is company manager
-                company_user = CompanyUsers.objects.get(user=request.user, company=team.company)
-                if not company_user.is_manager and not company_user.is_owner:
-                    return HttpResponseForbidden("You don't have permission to create reviews for this team")
-        except (TeamUsers.DoesNotExist, CompanyUsers.DoesNotExist):
+        if not get_permissions(request).can_manage_team(team):
             return HttpResponseForbidden("You don't have permission to create reviews for this team")
         
-        # Create reviews for all team members
-        # Было: team_members = User.objects.filter(teamusers__team=team)
-        # Заменяем на:
-        team_members = User.objects.filter(team_relations__team=team)
-        
-        for member in team_members:
-            PerfReview.objects.create(user=member, team=team)
+        # Create reviews for all team members in one batched write
+        summary = launch_team_reviews(team)
+        messages.success(
+            request,
+            f"Перфревью запущено: создано {summary['created']}, "
+            f"пропущено (уже есть открытое) {summary['skipped']}."
+        )
         
         return redirect('team_detail', team_id=team.id)
     
@@ -69,77 +78,73 @@ def perfreviews_create(request, team_id=None, user_id=None):
         team = get_object_or_404(Team, id=team_id)
         
         # Check permissions
-        has_permission = False
-        try:
-            # Check if requester is team manager
-            team_user = TeamUsers.objects.get(user=request.user, team=team)
-            has_permission = team_user.is_manager or team_user.is_owner
-        except TeamUsers.DoesNotExist:
-            pass
-        
-        if not has_permission:
-            try:
-                # Check if requester is company manager
-                company_user = CompanyUsers.objects.get(user=request.user, company=team.company)
-                has_permission = company_user.is_manager or company_user.is_owner
-            except CompanyUsers.DoesNotExist:
-                pass
-        
-        if not has_permission:
+        if not get_permissions(request).can_manage_team(team):
             return HttpResponseForbidden("You don't have permission to create reviews")
         
         # Create the review
         review = PerfReview.objects.create(user=user, team=team)
+        reviews_launched([(user.id, team.id)])
         return redirect('perfreview_detail', review_id=review.id)
     
     else:
         return redirect('dashboard')
 
+def perfreview_detail_stamp(request, review_id):
+    """Version of everything perfreview_detail shows, in one query."""
+    reviewing = Achievement.reviewers.through.objects.filter(achievement__perfreview_id=review_id)
+    values = page_stamp(
+        PerfReview.objects.filter(id=review_id),
+        'user_id', 'team_id', 'team__company_id', 'team__edited', 'score_summary__edited',
+        **stamp('achievements', Achievement.objects.filter(perfreview_id=review_id), 'perfreview_id'),
+        **stamp(
+            'scores', AchievementScore.objects.filter(achievement__perfreview_id=review_id),
+            'achievement__perfreview_id'
+        ),
+        **stamp('reviewers', reviewing, 'achievement__perfreview_id', field='id'),
+        is_reviewer=Exists(reviewing.filter(user_id=request.user.id)),
+    )
+    if values is None:
+        return None
+    team = Team(id=values['team_id'], company_id=values['team__company_id'])
+    is_subject = values['user_id'] == request.user.id
+    is_manager = get_permissions(request).can_manage_team(team)
+    if not (is_subject or is_manager or values['is_reviewer']):
+        return None
+    values['is_manager'] = is_manager
+    return values
+
 @login_required
+@conditional_page(perfreview_detail_stamp)
+@query_budget(15)
 def perfreview_detail(request, review_id):
     """View a specific performance review."""
-    review = get_object_or_404(PerfReview, id=review_id)
-    achievements = Achievement.objects.filter(perfreview=review)
+    review = load_review(review_id)
     
     # Check permissions
-    is_subject = review.user == request.user
-    
-    is_manager = False
-    try:
-        team_user = TeamUsers.objects.get(user=request.user, team=review.team)
-        is_manager = team_user.is_manager or team_user.is_owner
-    except TeamUsers.DoesNotExist:
-        try:
-            company_user = CompanyUsers.objects.get(user=request.user, company=review.team.company)
-            is_manager = company_user.is_manager or company_user.is_owner
-        except CompanyUsers.DoesNotExist:
-            pass
-    
-    is_reviewer = Achievement.objects.filter(perfreview=review, reviewers=request.user).exists()
-    
-    # Create a dictionary to track which achievements the user has already scored
-    user_scored_achievements = {}
-    if is_reviewer:
-        # Get all scores by this user for achievements in this review
-        from django.db.models import Q
-        user_scores = AchievementScore.objects.filter(
-            achievement__perfreview=review,
-            user=request.user
-        ).values_list('achievement_id', flat=True)
-        
-        # Create a dictionary where keys are achievement IDs and values are True if scored
-        for achievement in achievements:
-            user_scored_achievements[achievement.id] = achievement.id in user_scores
+    perms = get_permissions(request)
+    is_subject = perms.is_review_subject(review)
+    is_manager = perms.can_manage_review(review)
+    # Only the viewer's own assignments are loaded here; the shared achievement list is a cached fragment
+    assigned = assigned_achievements(review, request.user)
+    is_reviewer = bool(assigned)
     
     if not (is_subject or is_manager or is_reviewer):
         return HttpResponseForbidden("You don't have permission to view this review")
     
+    # Track which achievements the user has already scored
+    user_scored_achievements = {
+        achievement.id: achievement.user_score is not None for achievement in assigned
+    }
+    
     context = {
         'review': review,
-        'achievements': achievements,
+        # Achievements, reviewers and scores are loaded only when a fragment has to be rendered
+        'achievements': SimpleLazyObject(lambda: load_review_achievements(review, request.user)),
+        'pending_achievements': [achievement for achievement in assigned if achievement.user_score is None],
         'is_subject': is_subject,
         'is_manager': is_manager,
-        'user_scored_achievements': user_scored_achievements
+        'user_scored_achievements': user_scored_achievements,
+        **fragment_context(SCOPE_REVIEW, review.id),
     }
     
     return render(request, 'reviews/perfreview_detail.html', context)
@@ -147,22 +152,10 @@ def perfreview_detail(request, review_id):
 @login_required
 def achievement_create(request, review_id):
     """Create a new achievement for a performance review."""
-    review = get_object_or_404(PerfReview, id=review_id)
+    review = get_object_or_404(PerfReview.objects.select_related('team'), id=review_id)
     
     # Check permissions
-    is_subject = review.user == request.user
-    is_manager = False
-    try:
-        team_user = TeamUsers.objects.get(user=request.user, team=review.team)
-        is_manager = team_user.is_manager or team_user.is_owner
-    except TeamUsers.DoesNotExist:
-        try:
-            company_user = CompanyUsers.objects.get(user=request.user, company=review.team.company)
-            is_manager = company_user.is_manager or company_user.is_owner
-        except CompanyUsers.DoesNotExist:
-            pass
-    
-    if not (is_subject or is_manager):
+    if not get_permissions(request).can_edit_review(review):
         return HttpResponseForbidden("You don't have permission to add achievements to this review")
     
     if request.method == 'POST':
@@ -188,24 +181,13 @@ def achievement_create(request, review_id):
 @login_required
 def achievement_score(request, achievement_id):
     """Score an achievement as a reviewer."""
-    achievement = get_object_or_404(Achievement, id=achievement_id)
+    achievement = get_object_or_404(
+        Achievement.objects.select_related('perfreview__team'), id=achievement_id
+    )
     
     # Check permissions
-    if request.user not in achievement.reviewers.all():
-        is_manager = False
-        try:
-            team_user = TeamUsers.objects.get(user=request.user, team=achievement.perfreview.team)
-            is_manager = team_user.is_manager or team_user.is_owner
-        except TeamUsers.DoesNotExist:
-            try:
-                company_user = CompanyUsers.objects.get(user=request.user, 
-                                                      company=achievement.perfreview.team.company)
-                is_manager = company_user.is_manager or company_user.is_owner
-            except CompanyUsers.DoesNotExist:
-                pass
-        
-        if not is_manager:
-            return HttpResponseForbidden("You are not a reviewer for this achievement")
+    if not get_permissions(request).can_score_achievement(achievement):
+        return HttpResponseForbidden("You are not a reviewer for this achievement")
     
     # Check if user already scored this achievement
     try:
@@ -220,6 +202,8 @@ def achievement_score(request, achievement_id):
             new_score.achievement = achievement
             new_score.user = request.user
             new_score.save()
+            if score is None:
+                scores_submitted(achievement.perfreview, request.user, 1)
             return redirect('perfreview_detail', review_id=achievement.perfreview.id)
     else:
         form = AchievementScoreForm(instance=score)
@@ -228,3 +212,198 @@ def achievement_score(request, achievement_id):
         'form': form,
         'achievement': achievement
     })
+
+@login_required
+def achievement_score_batch(request, review_id):
+    """Score every achievement of a review assigned to the current reviewer in one submit."""
+    review = get_object_or_404(PerfReview.objects.select_related('user', 'team'), id=review_id)
+    achievements = assigned_achievements(review, request.user)
+    
+    if not achievements:
+        return HttpResponseForbidden("You are not a reviewer for this review")
+    
+    allowed_ids = {achievement.id for achievement in achievements}
+    
+    if request.method == 'POST':
+        formset = BatchScoreFormSet(request.POST, allowed_ids=allowed_ids)
+        if formset.is_valid():
+            entries = [
+                (form.cleaned_data['achievement_id'], form.cleaned_data['score'], form.cleaned_data['comment'])
+                for form in formset
+                if form.cleaned_data.get('score') is not None
+            ]
+            result = save_batch_scores(review, request.user, achievements, entries)
+            messages.success(
+                request,
+                f"Оценки сохранены: новых {result['created']}, обновлено {result['updated']}."
+            )
+            return redirect('perfreview_detail', review_id=review.id)
+    else:
+        formset = BatchScoreFormSet(
+            initial=[
+                {
+                    'achievement_id': achievement.id,
+                    'score': achievement.user_score.score if achievement.user_score else None,
+                    'comment': achievement.user_score.comment if achievement.user_score else '',
+                }
+                for achievement in achievements
+            ],
+            allowed_ids=allowed_ids
+        )
+    
+    by_id = {achievement.id: achievement for achievement in achievements}
+    rows = []
+    for form in formset:
+        try:
+            achievement_id = int(form['achievement_id'].value())
+        except (TypeError, ValueError):
+            achievement_id = None
+        rows.append((by_id.get(achievement_id), form))
+    
+    return render(request, 'reviews/achievement_score_batch.html', {
+        'review': review,
+        'formset': formset,
+        'rows': rows
+    })
+
+@login_required
+@query_budget(10)
+def review_inbox(request):
+    """Achievements across all reviews that the current user still has to score."""
+    paginator = Paginator(pending_for_user(request.user), 25)
+    page = paginator.get_page(request.GET.get('page'))
+    
+    return render(request, 'reviews/review_inbox.html', {
+        'page': page
+    })
+
+@login_required
+def review_search(request):
+    """Full-text search over achievement titles and score comments the user may view."""
+    query = request.GET.get('q', '')
+    page = search_page(request.user, query, request.GET.get('page'))
+    
+    template = 'reviews/_search_results.html' if request.htmx else 'reviews/review_search.html'
+    return render(request, template, {
+        'query': query,
+        'page': page
+    })
+
+@login_required
+def review_cycle_create(request, company_id):
+    """Launch a review cycle for every team of a company; reviews are created in the background."""
+    company = get_object_or_404(Company, id=company_id)
+    
+    if not get_permissions(request).can_manage_company(company):
+        return HttpResponseForbidden("You don't have permission to launch review cycles for this company")
+    
+    if request.method == 'POST':
+        form = ReviewCycleForm(request.POST)
+        if form.is_valid():
+            cycle = start_cycle(
+                company,
+                form.cleaned_data['name'],
+                form.cleaned_data['starts_on'],
+                form.cleaned_data['closes_on'],
+                created_by=request.user
+            )
+            queue_cycle(cycle)
+            if cycle.is_scheduled:
+                messages.success(request, f"Цикл перфревью запустится {cycle.starts_on:%d.%m.%Y}.")
+            else:
+                messages.success(request, "Цикл перфревью поставлен в очередь на запуск.")
+            return redirect('review_cycle_detail', cycle_id=cycle.id)
+    else:
+        form = ReviewCycleForm()
+    
+    return render(request, 'reviews/review_cycle_form.html', {
+        'form': form,
+        'company': company
+    })
+
+@login_required
+def review_cycle_detail(request, cycle_id):
+    """Show a review cycle and its launch progress (polled by HTMX while running)."""
+    cycle = get_object_or_404(ReviewCycle.objects.select_related('company'), id=cycle_id)
+    
+    if not get_permissions(request).can_view_company(cycle.company):
+        return HttpResponseForbidden("You don't have access to this company")
+    
+    template = 'reviews/_cycle_progress.html' if request.htmx else 'reviews/review_cycle_detail.html'
+    return render(request, template, {'cycle': cycle})
+
+def _export_response(request, filename, rows):
+    export_format = request.GET.get('format', FORMAT_CSV)
+    if export_format not in FORMATS:
+        export_format = FORMAT_CSV
+    response = StreamingHttpResponse(
+        stream_export(export_format, rows), content_type=FORMATS[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+@login_required
+def review_export_team(request, team_id):
+    """Stream every review, achievement and score of a team as CSV or JSONL."""
+    team = get_object_or_404(Team.objects.select_related('company'), id=team_id)
+    
+    if not get_permissions(request).can_manage_team(team):
+        return HttpResponseForbidden("You don't have permission to export this team's reviews")
+    
+    return _export_response(request, f"team-{team.id}-reviews", export_rows(team_id=team.id))
+
+@login_required
+def review_export_company(request, company_id):
+    """Stream every review, achievement and score of a company as CSV or JSONL."""
+    company = get_object_or_404(Company, id=company_id)
+    
+    if not get_permissions(request).can_manage_company(company):
+        return HttpResponseForbidden("You don't have permission to export this company's reviews")
+    
+    return _export_response(request, f"company-{company.id}-reviews", export_rows(company_id=company.id))
+
+def _handle_import(request, review=None, cycle=None):
+    """Run an uploaded achievement import; returns (form, result or None)."""
+    result = None
+    if request.method == 'POST':
+        form = AchievementImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            import_format = form.cleaned_data['format'] or guess_format(upload.name)
+            rows = read_rows(decode_lines(upload), import_format)
+            result = import_achievements(rows, review=review, cycle=cycle)
+            if result.created:
+                messages.success(request, f"Импортировано достижений: {result.created}")
+    else:
+        form = AchievementImportForm()
+    return form, result
+
+@login_required
+def achievement_import(request, review_id):
+    """Bulk-create achievements of a review from an uploaded CSV/JSONL file."""
+    review = get_object_or_404(PerfReview.objects.select_related('team', 'user'), id=review_id)
+    
+    if not get_permissions(request).can_edit_review(review):
+        return HttpResponseForbidden("You don't have permission to add achievements to this review")
+    
+    form, result = _handle_import(request, review=review)
+    return render(request, 'reviews/achievement_import.html', {
+        'form': form,
+        'result': result,
+        'review': review
+    })
+
+@login_required
+def review_cycle_import(request, cycle_id):
+    """Bulk-create achievements for the reviews of a cycle; rows name the employee by email."""
+    cycle = get_object_or_404(ReviewCycle.objects.select_related('company'), id=cycle_id)
+    
+    if not get_permissions(request).can_manage_company(cycle.company):
+        return HttpResponseForbidden("You don't have permission to import achievements for this cycle")
+    
+    form, result = _handle_import(request, cycle=cycle)
+    return render(request, 'reviews/achievement_import.html', {
+        'form': form,
+        'result': result,
+        'cycle': cycle
+    })
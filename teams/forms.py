@@ -2,6 +2,7 @@ from django import forms
 from .models import Team
 from accounts.models import User
 from companies.models import CompanyUsers
+from accounts.widgets import UserPickerWidget
 
 class TeamForm(forms.ModelForm):
     class Meta:
@@ -12,7 +13,7 @@ class TeamForm(forms.ModelForm):
         }
 
 class TeamUserForm(forms.Form):
-    user = forms.ModelChoiceField(queryset=None)
+    user = forms.ModelChoiceField(queryset=None, widget=UserPickerWidget())
     is_manager = forms.BooleanField(required=False, initial=False)
     
     def __init__(self, *args, **kwargs):
@@ -23,5 +24,6 @@ class TeamUserForm(forms.Form):
             # Only show users that are part of the company
             company_user_ids = CompanyUsers.objects.filter(company=company).values_list('user_id', flat=True)
             self.fields['user'].queryset = User.objects.filter(id__in=company_user_ids)
+            self.fields['user'].widget.company_id = company.id
         else:
             self.fields['user'].queryset = User.objects.none()
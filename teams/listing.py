@@ -0,0 +1,51 @@
+from django.db.models import Count, Q, Sum
+from perfecto.keyset import keyset_page
+from reviews.models import PerfReview
+from .models import TeamUsers
+
+ROSTER_PAGE_SIZE = 50
+ROSTER_ORDERING = ['user__user_name', 'id']
+
+# Часть team_detail, которую HTMX подгружает отдельно (?section=)
+SECTION_MEMBERS = 'members'
+
+
+def member_stats(team, user_ids):
+    """
+    Review statistics of the given team members, in one grouped query.
+
+    Returns {user_id: {'open_reviews', 'achievements', 'peer_score'}} for
+    members with at least one review in the team. peer_score is the mean of
+    all reviewer scores on the member's achievements, or None if unscored.
+    """
+    # Сводка одна на достижение, поэтому соединение review -> achievement -> summary не дублирует суммы
+    rows = PerfReview.objects.filter(team=team, user_id__in=user_ids).values('user_id').annotate(
+        open_reviews=Count('id', filter=Q(is_closed=False), distinct=True),
+        achievement_count=Count('achievements', distinct=True),
+        score_total=Sum('achievements__score_summary__score_total'),
+        score_count=Sum('achievements__score_summary__score_count'),
+    ).order_by()
+    return {
+        row['user_id']: {
+            'open_reviews': row['open_reviews'],
+            'achievements': row['achievement_count'],
+            'peer_score': row['score_total'] / row['score_count'] if row['score_count'] else None,
+        }
+        for row in rows
+    }
+
+
+def roster_page(team, cursor=None, page_size=ROSTER_PAGE_SIZE):
+    """
+    Return a KeysetPage of team members by name, each with a `stats` dict.
+
+    A page costs two queries whatever the team size or page depth: the
+    members with their users, and the grouped statistics of that page.
+    """
+    members = TeamUsers.objects.filter(team=team).select_related('user')
+    page = keyset_page(members, ROSTER_ORDERING, cursor, page_size)
+    stats = member_stats(team, [member.user_id for member in page]) if len(page) else {}
+    empty = {'open_reviews': 0, 'achievements': 0, 'peer_score': None}
+    for member in page:
+        member.stats = stats.get(member.user_id, empty)
+    return page
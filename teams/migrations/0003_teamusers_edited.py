@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 15:12
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("teams", "0002_alter_team_users_alter_teamusers_team_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="teamusers",
+            name="edited",
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
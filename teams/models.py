@@ -20,6 +20,8 @@ class TeamUsers(models.Model):
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='team_users')
     is_manager = models.BooleanField(default=False)
     is_owner = models.BooleanField(default=False)
+    # Смена роли должна менять версию страницы (perfecto.conditional)
+    edited = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name_plural = 'Team Users'
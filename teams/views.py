@@ -1,9 +1,16 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import HttpResponseForbidden, Http404
+from django.utils.functional import SimpleLazyObject
 from .models import Team, TeamUsers
 from .forms import TeamForm, TeamUserForm
-from companies.models import Company, CompanyUsers
+from .listing import SECTION_MEMBERS, roster_page
+from companies.models import Company
+from accounts.permissions import get_permissions
+from perfecto.conditional import conditional_page, page_stamp, stamp
+from perfecto.fragments import SCOPE_TEAM, fragment_context
+from perfecto.instrumentation import query_budget
+from reviews.models import Achievement, AchievementScoreSummary, PerfReview
 
 @login_required
 def team_list(request):
@@ -17,12 +24,11 @@ def team_create(request, company_id):
     company = get_object_or_404(Company, id=company_id)
     
     # Check if user is manager or owner of the company
-    try:
-        user_company = CompanyUsers.objects.get(user=request.user, company=company)
-        if not (user_company.is_manager or user_company.is_owner):
-            return HttpResponseForbidden("You don't have permissions to create teams in this company")
-    except CompanyUsers.DoesNotExist:
+    perms = get_permissions(request)
+    if not perms.can_view_company(company):
         return HttpResponseForbidden("You don't have access to this company")
+    if not perms.can_manage_company(company):
+        return HttpResponseForbidden("You don't have permissions to create teams in this company")
     
     if request.method == 'POST':
         form = TeamForm(request.POST)
@@ -47,53 +53,75 @@ def team_create(request, company_id):
         'company': company
     })
 
+def team_detail_stamp(request, team_id):
+    """Version of everything team_detail shows, in one query."""
+    values = page_stamp(
+        Team.objects.filter(id=team_id),
+        'company_id', 'company__edited',
+        **stamp('members', TeamUsers.objects.filter(team_id=team_id), 'team_id'),
+        **stamp('reviews', PerfReview.objects.filter(team_id=team_id), 'team_id'),
+        # Статистика участников: достижения и оценки ревьюеров
+        **stamp('achievements', Achievement.objects.filter(perfreview__team_id=team_id), 'perfreview__team_id'),
+        **stamp(
+            'scores',
+            AchievementScoreSummary.objects.filter(achievement__perfreview__team_id=team_id),
+            'achievement__perfreview__team_id',
+        ),
+    )
+    if values is None:
+        return None
+    team = Team(id=team_id, company_id=values['company_id'])
+    perms = get_permissions(request)
+    if not perms.can_view_team(team):
+        return None
+    values.update(is_manager=perms.can_manage_team(team), is_owner=perms.is_team_owner(team))
+    return values
+
 @login_required
+@conditional_page(team_detail_stamp)
+@query_budget(12)
 def team_detail(request, team_id):
     """View team details."""
-    team = get_object_or_404(Team, id=team_id)
+    team = get_object_or_404(Team.objects.select_related('company'), id=team_id)
     
     # Check if user is part of this team or the company
-    try:
-        user_team = TeamUsers.objects.get(user=request.user, team=team)
-        is_team_manager = user_team.is_manager
-        is_team_owner = user_team.is_owner
-    except TeamUsers.DoesNotExist:
-        # Check if user is a company manager/owner
-        try:
-            user_company = CompanyUsers.objects.get(user=request.user, company=team.company)
-            is_team_manager = user_company.is_manager or user_company.is_owner
-            is_team_owner = user_company.is_owner
-        except CompanyUsers.DoesNotExist:
-            return HttpResponseForbidden("You don't have access to this team")
-    
-    team_users = TeamUsers.objects.filter(team=team)
+    perms = get_permissions(request)
+    if not perms.can_view_team(team):
+        return HttpResponseForbidden("You don't have access to this team")
+    is_team_manager = perms.can_manage_team(team)
+    is_team_owner = perms.is_team_owner(team)
     
     context = {
         'team': team,
         'company': team.company,
-        'team_users': team_users,
         'is_manager': is_team_manager,
-        'is_owner': is_team_owner
+        'is_owner': is_team_owner,
+        'can_manage': is_team_manager or is_team_owner,
     }
     
+    # HTMX: следующая страница состава команды
+    cursor = request.GET.get('cursor')
+    if request.htmx and request.GET.get('section') == SECTION_MEMBERS:
+        context['team_users'] = roster_page(team, cursor)
+        return render(request, 'teams/_member_rows.html', context)
+    
+    # Первая страница и счётчики загружаются, только если фрагменты не найдены в кэше
+    context.update({
+        'team_users': SimpleLazyObject(lambda: roster_page(team)),
+        'members_total': lambda: TeamUsers.objects.filter(team=team).count(),
+        'latest_reviews': team.reviews.select_related('user').order_by('-created', '-id')[:5],
+        **fragment_context(SCOPE_TEAM, team.id),
+    })
+    
     return render(request, 'teams/team_detail.html', context)
 
 @login_required
 def team_add_user(request, team_id):
     """Add a user to a team."""
-    team = get_object_or_404(Team, id=team_id)
+    team = get_object_or_404(Team.objects.select_related('company'), id=team_id)
     
     # Check if current user is a team manager, team owner, or company manager/owner
-    has_permission = False
-    try:
-        user_team = TeamUsers.objects.get(user=request.user, team=team)
-        has_permission = user_team.is_manager or user_team.is_owner
-    except TeamUsers.DoesNotExist:
-        try:
-            user_company = CompanyUsers.objects.get(user=request.user, company=team.company)
-            has_permission = user_company.is_manager or user_company.is_owner
-        except CompanyUsers.DoesNotExist:
-            pass
+    has_permission = get_permissions(request).can_manage_team(team)
     
     if not has_permission:
         return HttpResponseForbidden("You don't have permission to add users to this team")
@@ -0,0 +1,89 @@
+import pytest
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from accounts.counters import get_counters
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from invitations.models import Invitation
+from invitations.services import create_bulk_invitations, purge_expired_invitations
+from reviews.models import Achievement, PerfReview
+from reviews.services import launch_team_reviews
+from teams.models import Team, TeamUsers
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email="test@example.com", password="password123", user_name="Test User")
+
+@pytest.fixture
+def company(user):
+    company = Company.objects.create(company_name="Test Company")
+    CompanyUsers.objects.create(user=user, company=company, is_manager=True)
+    return company
+
+@pytest.fixture
+def team(company, user):
+    team = Team.objects.create(team_name="Core", company=company)
+    TeamUsers.objects.create(user=user, team=team)
+    return team
+
+@pytest.mark.django_db
+class TestCounters:
+
+    def test_counts_in_one_query_then_cached(self, user, team, django_assert_num_queries):
+        """Test that all counters come from one query and are then served from the cache"""
+        PerfReview.objects.create(user=user, team=team)
+
+        with django_assert_num_queries(1):
+            counters = get_counters(user.id)
+        with django_assert_num_queries(0):
+            assert get_counters(user.id) == counters
+
+        assert counters == {'companies': 1, 'teams': 1, 'reviews': 1, 'invitations': 0, 'pending_scores': 0}
+
+    def test_signals_invalidate(self, user, company, team):
+        """Test that memberships, reviews, invitations and inbox changes refresh the counters"""
+        get_counters(user.id)
+        TeamUsers.objects.create(user=user, team=Team.objects.create(team_name="Second", company=company))
+        assert get_counters(user.id)['teams'] == 2
+
+        review = PerfReview.objects.create(user=user, team=team)
+        assert get_counters(user.id)['reviews'] == 1
+
+        Invitation.objects.create(
+            created_by=user, invitation_type=Invitation.TYPE_COMPANY, company=company,
+            expires_at=timezone.now() + timedelta(days=7)
+        )
+        assert get_counters(user.id)['invitations'] == 1
+
+        other = User.objects.create_user(email="other@example.com", password="p")
+        achievement = Achievement.objects.create(perfreview=PerfReview.objects.create(user=other, team=team),
+                                                 title="Work", self_score=3)
+        achievement.reviewers.add(user)
+        assert get_counters(user.id)['pending_scores'] == 1
+
+        review.delete()
+        assert get_counters(user.id)['reviews'] == 0
+
+    def test_bulk_paths_invalidate(self, user, company, team):
+        """Test that bulk writes without signals still refresh the counters"""
+        get_counters(user.id)
+        launch_team_reviews(team)
+        assert get_counters(user.id)['reviews'] == 1
+
+        create_bulk_invitations(user, company, ["a@example.com", "b@example.com"])
+        assert get_counters(user.id)['invitations'] == 2
+
+        Invitation.objects.update(expires_at=timezone.now() - timedelta(days=60))
+        purge_expired_invitations()
+        assert get_counters(user.id)['invitations'] == 0
+
+    def test_navbar_uses_cached_counters(self, client, user, team, django_assert_max_num_queries):
+        """Test that a warm dashboard runs no COUNT queries for the badges"""
+        client.force_login(user)
+        client.get(reverse('dashboard'))
+
+        with django_assert_max_num_queries(2) as captured:
+            response = client.get(reverse('dashboard'))
+        assert not any('COUNT' in query['sql'] for query in captured.captured_queries)
+        assert 'ms-1">1<' in response.content.decode('utf-8')
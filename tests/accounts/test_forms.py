@@ -1,6 +1,6 @@
 import pytest
 from accounts.models import User
-from accounts.forms import CustomUserCreationForm, CustomAuthenticationForm, TelegramLoginForm
+from accounts.forms import CustomUserCreationForm, CustomAuthenticationForm, ProfileForm, TelegramLoginForm
 
 @pytest.mark.django_db
 class TestCustomUserCreationForm:
@@ -77,6 +77,19 @@ class TestCustomAuthenticationForm:
         form = CustomAuthenticationForm()
         assert form.fields['username'].label == 'Email'
 
+@pytest.mark.django_db
+class TestProfileForm:
+    
+    def test_taken_telegram_username_is_rejected(self):
+        """Test that a Telegram login already used by another account is rejected"""
+        User.objects.create_user(email='other@example.com', password='pass', user_name='Other', telegram_username='@Taken')
+        user = User.objects.create_user(email='test@example.com', password='pass', user_name='Test')
+        
+        form = ProfileForm(data={'user_name': 'Test', 'user_job': '', 'telegram_username': 'taken'}, instance=user)
+        
+        assert form.is_valid() is False
+        assert 'telegram_username' in form.errors
+
 class TestTelegramLoginForm:
     
     def test_valid_telegram_form(self):
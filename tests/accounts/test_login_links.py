@@ -0,0 +1,94 @@
+import pytest
+from django.core import signing
+from django.urls import reverse
+from accounts.login_links import consume_login_token, issue_login_token, peek_login_token
+from accounts.models import User
+from jobs.models import Job
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email="test@example.com", password="password123", user_name="Test User",
+        telegram_username="@testuser", telegram_id="100"
+    )
+
+@pytest.mark.django_db
+class TestLoginTokens:
+
+    def test_token_is_single_use(self, user):
+        """Test that a token logs in once and is then spent"""
+        token = issue_login_token(user)
+
+        assert peek_login_token(token) == user.id
+        assert consume_login_token(token) == user.id
+        assert consume_login_token(token) is None
+        assert peek_login_token(token) is None
+
+    def test_tampered_token_is_rejected(self, user):
+        """Test that a token re-signed for another user does not verify"""
+        token = issue_login_token(user)
+        data = signing.loads(token, salt='accounts.telegram-login')
+        forged = signing.dumps({'u': user.id + 1, 'n': data['n']}, salt='wrong-salt', compress=True)
+
+        assert consume_login_token(forged) is None
+        assert consume_login_token(token[:-2] + 'xx') is None
+
+    def test_expired_token_is_rejected(self, user, settings):
+        """Test that a token older than the TTL is rejected even if the cache still has it"""
+        settings.TELEGRAM_LOGIN_TTL = -1
+        token = issue_login_token(user)
+        settings.TELEGRAM_LOGIN_TTL = 600
+
+        assert consume_login_token(token) is None
+
+    def test_tokens_are_independent(self, user):
+        """Test that spending one link leaves another one valid"""
+        first = issue_login_token(user)
+        second = issue_login_token(user)
+
+        consume_login_token(first)
+
+        assert consume_login_token(second) == user.id
+
+@pytest.mark.django_db
+class TestTelegramLoginViews:
+
+    def test_request_queues_link_message(self, client, user):
+        """Test that requesting a link queues one bot message with a working link"""
+        response = client.post(reverse('telegram_login'), {'telegram_username': 'TestUser'})
+        client.post(reverse('telegram_login'), {'telegram_username': '@testuser'})
+
+        assert response.status_code == 200
+        job = Job.objects.get()
+        assert job.task == 'accounts.telegram_message'
+        assert job.payload['chat_id'] == "100"
+        token = job.payload['text'].rstrip('/').rsplit('/', 1)[1]
+        assert peek_login_token(token) == user.id
+
+    def test_unknown_user_gets_same_page(self, client):
+        """Test that an unknown username renders the same page and queues nothing"""
+        response = client.post(reverse('telegram_login'), {'telegram_username': '@nobody'})
+
+        assert 'accounts/telegram_link_sent.html' in [t.name for t in response.templates]
+        assert not Job.objects.exists()
+
+    def test_confirm_logs_in_once(self, client, user):
+        """Test that the link page asks for confirmation and the POST logs in once"""
+        url = reverse('telegram_login_confirm', kwargs={'token': issue_login_token(user)})
+
+        assert client.get(url).status_code == 200
+        response = client.post(url)
+        assert response.url == reverse('dashboard')
+        assert int(client.session['_auth_user_id']) == user.id
+
+        client.logout()
+        response = client.post(url)
+        assert response.url == reverse('login')
+        assert '_auth_user_id' not in client.session
+
+    def test_invalid_link_redirects(self, client):
+        """Test that a garbage token redirects to the login page"""
+        response = client.get(reverse('telegram_login_confirm', kwargs={'token': 'garbage'}))
+
+        assert response.status_code == 302
+        assert response.url == reverse('login')
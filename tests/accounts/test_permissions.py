@@ -0,0 +1,142 @@
+import pytest
+from django.core.cache import cache
+from django.test import RequestFactory
+from accounts.models import User
+from accounts.permissions import (
+    PermissionResolver, get_permissions, get_membership_map, role_cache_key, role_cache_stats
+)
+from companies.models import Company, CompanyUsers
+from teams.models import Team, TeamUsers
+from reviews.models import PerfReview, Achievement
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(
+        email="test@example.com",
+        password="password123",
+        user_name="Test User"
+    )
+
+@pytest.fixture
+def other_user():
+    return User.objects.create_user(
+        email="other@example.com",
+        password="password123",
+        user_name="Other User"
+    )
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def team(company):
+    return Team.objects.create(team_name="Test Team", company=company)
+
+@pytest.fixture
+def review(other_user, team):
+    return PerfReview.objects.create(user=other_user, team=team)
+
+@pytest.mark.django_db
+class TestPermissionResolver:
+
+    def test_outsider_has_no_rights(self, user, company, team, review):
+        """Test that a user outside the company has no access"""
+        perms = PermissionResolver(user)
+
+        assert not perms.can_view_company(company)
+        assert not perms.can_view_team(team)
+        assert not perms.can_manage_team(team)
+        assert not perms.can_view_review(review)
+
+    def test_company_manager_manages_teams(self, user, company, team, review):
+        """Test that company managers manage every team of the company"""
+        CompanyUsers.objects.create(user=user, company=company, is_manager=True)
+        perms = PermissionResolver(user)
+
+        assert perms.can_manage_company(company)
+        assert perms.can_manage_team(team)
+        assert perms.can_view_review(review)
+        assert not perms.is_team_owner(team)
+
+    def test_team_member_can_view_but_not_manage(self, user, company, team, review):
+        """Test that plain team members can view the team only"""
+        TeamUsers.objects.create(user=user, team=team)
+        perms = PermissionResolver(user)
+
+        assert perms.can_view_team(team)
+        assert not perms.can_manage_team(team)
+        assert not perms.can_view_review(review)
+
+    def test_reviewer_can_view_and_score(self, user, review):
+        """Test that achievement reviewers can view the review and score"""
+        achievement = Achievement.objects.create(perfreview=review, title="Work", self_score=4)
+        achievement.reviewers.add(user)
+        perms = PermissionResolver(user)
+
+        assert perms.can_view_review(review)
+        assert perms.can_score_achievement(achievement)
+        assert not perms.can_edit_review(review)
+
+    def test_roles_are_loaded_once(self, user, company, team, django_assert_num_queries):
+        """Test that repeated checks reuse the roles loaded by the first one"""
+        TeamUsers.objects.create(user=user, team=team, is_manager=True)
+        perms = PermissionResolver(user)
+
+        with django_assert_num_queries(2):
+            for _ in range(5):
+                perms.can_manage_team(team)
+                perms.can_view_company(company)
+                perms.is_team_owner(team)
+
+    def test_resolver_memoized_on_request(self, user):
+        """Test that get_permissions returns the same resolver for a request"""
+        request = RequestFactory().get('/')
+        request.user = user
+
+        assert get_permissions(request) is get_permissions(request)
+
+@pytest.mark.django_db
+class TestRoleCache:
+
+    def test_second_request_does_no_role_queries(self, user, company, team, django_assert_num_queries):
+        """Test that a cached membership map is reused across resolvers"""
+        TeamUsers.objects.create(user=user, team=team, is_manager=True)
+        PermissionResolver(user).can_manage_team(team)
+
+        with django_assert_num_queries(0):
+            assert PermissionResolver(user).can_manage_team(team)
+
+    def test_membership_change_invalidates_cache(self, user, company, team):
+        """Test that saving or deleting a membership drops the cached map"""
+        assert not PermissionResolver(user).can_view_company(company)
+
+        company_user = CompanyUsers.objects.create(user=user, company=company, is_manager=True)
+        assert PermissionResolver(user).can_manage_company(company)
+
+        company_user.is_manager = False
+        company_user.save()
+        assert not PermissionResolver(user).can_manage_company(company)
+
+        company_user.delete()
+        assert not PermissionResolver(user).can_view_company(company)
+
+    def test_team_save_invalidates_members(self, user, company, team):
+        """Test that saving a team drops its members' cached maps"""
+        TeamUsers.objects.create(user=user, team=team)
+        get_membership_map(user.id)
+
+        team.company = Company.objects.create(company_name="Other Company")
+        team.save()
+
+        assert cache.get(role_cache_key(user.id)) is None
+
+    def test_hit_and_miss_counters(self, user):
+        """Test that role cache lookups are counted"""
+        before = role_cache_stats()
+        get_membership_map(user.id)
+        get_membership_map(user.id)
+        after = role_cache_stats()
+
+        assert after['misses'] - before['misses'] == 1
+        assert after['hits'] - before['hits'] == 1
@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+from accounts.models import User
+from accounts.telegram_bot import BotWorker, make_bot, queue_message
+from jobs.models import Job
+from jobs.worker import work
+
+def run(coroutine_factory):
+    async def main():
+        async with make_bot() as bot:
+            return await coroutine_factory(BotWorker(bot, batch_size=10, rate=0, updates_timeout=0))
+    return asyncio.run(main())
+
+@pytest.mark.django_db(transaction=True)
+class TestBotWorker:
+
+    def test_outbox_is_sent_in_batches(self, telegram_api):
+        """Test that queued messages are taken in batches and sent over one connection"""
+        for i in range(25):
+            queue_message(str(1000 + i), f"Message {i}")
+
+        taken = run(lambda worker: asyncio.gather(*[worker.flush_outbox() for _ in range(3)]))
+
+        assert list(taken) == [10, 10, 5]
+        assert len(telegram_api.sent()) == 25
+        assert telegram_api.connections == 1
+        assert not Job.objects.exclude(status=Job.STATUS_DONE).exists()
+
+    def test_blocked_chat_fails_without_retry(self, telegram_api):
+        """Test that a chat that blocked the bot is failed for good"""
+        telegram_api.blocked.add("666")
+        queue_message("666", "Hello")
+        queue_message("100", "Hello")
+
+        run(lambda worker: worker.flush_outbox())
+
+        assert Job.objects.get(payload__chat_id="666").status == Job.STATUS_FAILED
+        assert Job.objects.get(payload__chat_id="100").status == Job.STATUS_DONE
+
+    def test_start_links_chat(self, telegram_api):
+        """Test that /start stores the chat id for the matching username and replies"""
+        user = User.objects.create_user(
+            email="test@example.com", password="pass", user_name="Test", telegram_username="@TestUser"
+        )
+        telegram_api.add_start("testuser", 4242)
+        telegram_api.add_start("stranger", 777)
+
+        async def handle(worker):
+            await worker.handle_updates()
+            await worker.flush_outbox()
+            # Повторный опрос не должен снова обрабатывать те же обновления
+            return await worker.handle_updates()
+
+        assert run(handle) == 0
+        user.refresh_from_db()
+        assert user.telegram_id == "4242"
+        assert {message['chat_id'] for message in telegram_api.sent()} == {4242, 777}
+
+    def test_long_message_is_split(self, telegram_api):
+        """Test that a message over Telegram's limit is sent in several parts"""
+        queue_message("100", "x" * 5000)
+
+        run(lambda worker: worker.flush_outbox())
+
+        assert [len(message['text']) for message in telegram_api.sent()] == [4096, 904]
+
+    def test_start_with_ambiguous_username_links_nobody(self, telegram_api):
+        """Test that /start does not link a chat to several accounts with the same username"""
+        for email in ("first@example.com", "second@example.com"):
+            User.objects.create_user(email=email, password="pass", user_name="Test", telegram_username="@twin")
+        telegram_api.add_start("twin", 4242)
+
+        async def handle(worker):
+            await worker.handle_updates()
+            await worker.flush_outbox()
+
+        run(handle)
+
+        assert not User.objects.exclude(telegram_id='').exists()
+        assert "нескольких аккаунтах" in telegram_api.sent()[0]['text']
+
+    def test_regular_worker_fallback(self, telegram_api):
+        """Test that run_workers can deliver a queued message without the bot worker"""
+        queue_message("100", "Hello")
+
+        work('test', burst=True)
+
+        assert telegram_api.sent()[0]['text'] == "Hello"
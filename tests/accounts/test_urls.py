@@ -5,7 +5,8 @@ from accounts.views import (
     register_view,
     login_view,
     telegram_login_request,
-    dashboard_view
+    dashboard_view,
+    user_search
 )
 from django.contrib.auth.views import LogoutView
 
@@ -47,3 +48,9 @@ class TestAccountsUrls:
         url = reverse('dashboard')
         assert url == '/accounts/dashboard/'
         assert resolve(url).func == dashboard_view
+    
+    def test_user_search_url(self):
+        """Test URL for the user typeahead"""
+        url = reverse('user_search')
+        assert url == '/accounts/users/search/'
+        assert resolve(url).func == user_search
@@ -0,0 +1,115 @@
+import pytest
+from django.urls import reverse
+from accounts.models import User
+from accounts.lookup import USER_SEARCH_LIMIT, find_users
+from accounts.widgets import SCOPE_CANDIDATES, SCOPE_MEMBERS
+from companies.forms import CompanyUserForm
+from companies.models import Company, CompanyUsers
+from teams.forms import TeamUserForm
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def manager(company):
+    user = User.objects.create_user(email="manager@example.com", password="pass", user_name="Manager")
+    CompanyUsers.objects.create(user=user, company=company, is_manager=True)
+    return user
+
+@pytest.fixture
+def members(company):
+    users = []
+    for i in range(15):
+        user = User.objects.create_user(email=f"anna{i:02d}@example.com", password="pass", user_name=f"Anna {i}")
+        CompanyUsers.objects.create(user=user, company=company)
+        users.append(user)
+    return users
+
+@pytest.fixture
+def outsider():
+    return User.objects.create_user(email="anton@example.com", password="pass", user_name="Boris")
+
+@pytest.mark.django_db
+class TestFindUsers:
+
+    def test_members_prefix_on_email_and_name(self, company, members, outsider):
+        """Test that members are matched by email or name prefix, case-insensitively"""
+        assert find_users("ANNA0", company.id, SCOPE_MEMBERS) == members[:10]
+        assert find_users("anna 1", company.id, SCOPE_MEMBERS) == [members[1]] + members[10:]
+        assert find_users("an", company.id, SCOPE_MEMBERS)[-1] != outsider
+
+    def test_results_are_limited(self, company, members):
+        """Test that no more than the limit is returned"""
+        assert len(find_users("anna", company.id, SCOPE_MEMBERS)) == USER_SEARCH_LIMIT
+
+    def test_candidates_exclude_members_and_need_longer_prefix(self, company, members, outsider):
+        """Test that candidate search skips members and short prefixes"""
+        assert find_users("an", company.id, SCOPE_CANDIDATES) == []
+        assert find_users("ant", company.id, SCOPE_CANDIDATES) == [outsider]
+        assert find_users("ann", company.id, SCOPE_CANDIDATES) == []
+
+@pytest.mark.django_db
+class TestUserSearchView:
+
+    def test_member_search_returns_options(self, client, company, manager, members):
+        """Test that the endpoint renders matching users as options"""
+        client.force_login(members[0])
+
+        response = client.get(reverse('user_search'), {'company': company.id, 'q': 'anna03'})
+
+        assert response.status_code == 200
+        assert b'data-id="%d"' % members[3].id in response.content
+        assert b'<html' not in response.content
+
+    def test_candidates_require_manager(self, client, company, members):
+        """Test that only company managers can search users outside the company"""
+        client.force_login(members[0])
+
+        response = client.get(reverse('user_search'), {'company': company.id, 'scope': SCOPE_CANDIDATES, 'q': 'ant'})
+
+        assert response.status_code == 403
+
+    def test_outsider_cannot_list_members(self, client, company, outsider):
+        """Test that users outside the company cannot search its members"""
+        client.force_login(outsider)
+
+        response = client.get(reverse('user_search'), {'company': company.id, 'q': 'anna'})
+
+        assert response.status_code == 403
+
+    def test_missing_company_is_rejected(self, client, manager):
+        """Test that the company parameter is required"""
+        client.force_login(manager)
+
+        assert client.get(reverse('user_search'), {'q': 'anna'}).status_code == 400
+
+@pytest.mark.django_db
+class TestPickerForms:
+
+    def test_rendering_does_not_load_all_users(self, company, members, django_assert_num_queries):
+        """Test that rendering the form does not materialize the user table"""
+        form = TeamUserForm(company=company)
+
+        with django_assert_num_queries(0):
+            html = form.as_p()
+
+        assert 'anna00@example.com' not in html
+        assert 'company=%d' % company.id in html
+
+    def test_validation_loads_only_submitted_user(self, company, members, outsider, django_assert_num_queries):
+        """Test that a submitted id is checked with a single scoped query"""
+        form = TeamUserForm(data={'user': members[0].id}, company=company)
+        with django_assert_num_queries(1):
+            assert form.is_valid()
+
+        assert not TeamUserForm(data={'user': outsider.id}, company=company).is_valid()
+
+    def test_rerender_shows_selected_user(self, company, members):
+        """Test that a bound form keeps the selected user visible"""
+        form = CompanyUserForm(data={'user': members[2].id}, company=company)
+
+        html = form.as_p()
+
+        assert 'anna02@example.com' in html
+        assert 'value="%d"' % members[2].id in html
@@ -168,3 +168,31 @@ class TestTelegramLoginRequestView:
         
         assert response.status_code == 302
         assert response.url == reverse('login')
+
+@pytest.mark.django_db
+class TestProfileView:
+    
+    def test_profile_requires_login(self, client):
+        """Test that anonymous users are redirected to login"""
+        response = client.get(reverse('profile'))
+        
+        assert response.status_code == 302
+        assert reverse('login') in response.url
+    
+    def test_profile_updates_telegram_username(self, client, user):
+        """Test that the profile form saves the Telegram login and unlinks the old chat"""
+        user.telegram_username = '@old'
+        user.telegram_id = '4242'
+        user.save()
+        client.force_login(user)
+        
+        response = client.post(reverse('profile'), {
+            'user_name': 'Test User',
+            'user_job': '',
+            'telegram_username': 'NewName'
+        })
+        
+        assert response.status_code == 302
+        user.refresh_from_db()
+        assert user.telegram_username == '@NewName'
+        assert user.telegram_id == ''
@@ -0,0 +1,196 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from rest_framework.test import APIClient
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from teams.models import Team, TeamUsers
+from reviews.models import Achievement, AchievementScore, PerfReview
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def team(company):
+    return Team.objects.create(team_name="Core", company=company)
+
+@pytest.fixture
+def manager(company):
+    user = User.objects.create_user(email="manager@example.com", password="password123", user_name="Manager")
+    CompanyUsers.objects.create(user=user, company=company, is_manager=True)
+    return user
+
+@pytest.fixture
+def reviewer(company):
+    user = User.objects.create_user(email="reviewer@example.com", password="password123", user_name="Reviewer")
+    CompanyUsers.objects.create(user=user, company=company)
+    return user
+
+def make_reviews(team, reviewer, count):
+    reviews = []
+    for i in range(count):
+        user = User.objects.create_user(email=f"member{team.id}-{i}@example.com", password="pass", user_name=f"M{i}")
+        TeamUsers.objects.create(user=user, team=team)
+        review = PerfReview.objects.create(user=user, team=team)
+        achievement = Achievement.objects.create(perfreview=review, title=f"Work {i}", self_score=3)
+        achievement.reviewers.add(reviewer)
+        AchievementScore.objects.create(achievement=achievement, user=reviewer, score=4)
+        reviews.append(review)
+    return reviews
+
+@pytest.mark.django_db
+class TestAuthentication:
+
+    def test_anonymous_is_rejected(self, api_client):
+        """Test that the API requires authentication"""
+        assert api_client.get('/api/v1/reviews/').status_code == 401
+
+    def test_jwt_token_grants_access(self, api_client, manager):
+        """Test that a token from the token endpoint authenticates API calls"""
+        response = api_client.post('/api/v1/auth/token/', {'email': 'manager@example.com', 'password': 'password123'})
+        api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+
+        assert api_client.get('/api/v1/companies/').status_code == 200
+
+@pytest.mark.django_db
+class TestVisibility:
+
+    def test_manager_sees_company_reviews_only(self, api_client, manager, team, reviewer):
+        """Test that list endpoints are limited to what the user may view"""
+        make_reviews(team, reviewer, 2)
+        other_team = Team.objects.create(team_name="Other", company=Company.objects.create(company_name="Other"))
+        make_reviews(other_team, User.objects.create_user(email="x@example.com", password="p"), 1)
+        api_client.force_authenticate(manager)
+
+        assert len(api_client.get('/api/v1/reviews/').data['results']) == 2
+        assert len(api_client.get('/api/v1/achievements/').data['results']) == 2
+        assert [c['id'] for c in api_client.get('/api/v1/companies/').data['results']] == [team.company_id]
+        assert [t['id'] for t in api_client.get('/api/v1/teams/').data['results']] == [team.id]
+
+    def test_reviewer_sees_assigned_reviews(self, api_client, team, reviewer):
+        """Test that reviewers see the reviews they score"""
+        make_reviews(team, reviewer, 2)
+        api_client.force_authenticate(reviewer)
+
+        assert len(api_client.get('/api/v1/scores/').data['results']) == 2
+
+    def test_hidden_review_is_not_found(self, api_client, team, reviewer):
+        """Test that a review the user may not view answers 404"""
+        review = make_reviews(team, reviewer, 1)[0]
+        api_client.force_authenticate(User.objects.create_user(email="outsider@example.com", password="p"))
+
+        assert api_client.get(f'/api/v1/reviews/{review.id}/').status_code == 404
+
+@pytest.mark.django_db
+class TestSync:
+
+    def test_cursor_pagination_walks_everything(self, api_client, manager, team, reviewer):
+        """Test that following next links returns every row exactly once"""
+        reviews = make_reviews(team, reviewer, 7)
+        api_client.force_authenticate(manager)
+
+        seen, url = [], '/api/v1/reviews/?page_size=3'
+        while url:
+            data = api_client.get(url).data
+            seen.extend(row['id'] for row in data['results'])
+            url = data['next']
+
+        assert seen == [review.id for review in reviews]
+
+    def test_updated_since(self, api_client, manager, team, reviewer):
+        """Test that updated_since returns only rows edited after the mark"""
+        reviews = make_reviews(team, reviewer, 3)
+        mark = timezone.now()
+        PerfReview.objects.filter(id=reviews[1].id).update(edited=mark + timedelta(seconds=1))
+        api_client.force_authenticate(manager)
+
+        response = api_client.get('/api/v1/reviews/', {'updated_since': mark.isoformat()})
+
+        assert [row['id'] for row in response.data['results']] == [reviews[1].id]
+        assert api_client.get('/api/v1/reviews/', {'updated_since': 'yesterday'}).status_code == 400
+
+    def test_filters(self, api_client, manager, team, reviewer):
+        """Test that id filters narrow the list"""
+        reviews = make_reviews(team, reviewer, 2)
+        api_client.force_authenticate(manager)
+
+        response = api_client.get('/api/v1/achievements/', {'review': reviews[0].id})
+
+        assert [row['review'] for row in response.data['results']] == [reviews[0].id]
+        assert api_client.get('/api/v1/achievements/', {'review': 'abc'}).status_code == 400
+
+    def test_etag_not_modified(self, api_client, manager, team, reviewer):
+        """Test that a matching If-None-Match gets an empty 304 until the data changes"""
+        reviews = make_reviews(team, reviewer, 2)
+        api_client.force_authenticate(manager)
+        etag = api_client.get('/api/v1/reviews/')['ETag']
+
+        response = api_client.get('/api/v1/reviews/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response.content == b''
+
+        PerfReview.objects.filter(id=reviews[0].id).update(is_closed=True)
+        response = api_client.get('/api/v1/reviews/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+
+@pytest.mark.django_db
+class TestSerializers:
+
+    def test_review_payload(self, api_client, manager, team, reviewer):
+        """Test the review representation"""
+        review = make_reviews(team, reviewer, 1)[0]
+        api_client.force_authenticate(manager)
+
+        data = api_client.get(f'/api/v1/reviews/{review.id}/').data
+
+        assert data['user']['email'] == review.user.email
+        assert data['team_name'] == "Core"
+        assert data['score_summary']['score_count'] == 1
+
+    def test_sparse_fieldset(self, api_client, manager, team, reviewer):
+        """Test that ?fields= returns only the requested fields"""
+        make_reviews(team, reviewer, 1)
+        api_client.force_authenticate(manager)
+
+        row = api_client.get('/api/v1/achievements/', {'fields': 'id,title'}).data['results'][0]
+
+        assert set(row) == {'id', 'title'}
+        assert api_client.get('/api/v1/achievements/', {'fields': 'id,secret'}).status_code == 400
+
+    @pytest.mark.parametrize('endpoint, queries', [
+        ('/api/v1/reviews/', 1),
+        ('/api/v1/achievements/', 2),
+        ('/api/v1/scores/', 1),
+        ('/api/v1/teams/', 1),
+        ('/api/v1/companies/', 1),
+    ])
+    def test_query_count_is_flat(self, api_client, manager, team, reviewer, endpoint, queries,
+                                 django_assert_num_queries):
+        """Test that a page costs the same number of queries for 2 and 20 rows"""
+        make_reviews(team, reviewer, 20)
+        api_client.force_authenticate(manager)
+        api_client.get(endpoint)  # прогреваем кэш ролей
+
+        with django_assert_num_queries(queries):
+            response = api_client.get(endpoint)
+        assert response.status_code == 200
+
+    def test_sparse_fieldset_skips_joins(self, api_client, manager, team, reviewer, django_assert_num_queries):
+        """Test that leaving out reviewers drops the prefetch query"""
+        make_reviews(team, reviewer, 5)
+        api_client.force_authenticate(manager)
+        api_client.get('/api/v1/achievements/')
+
+        with django_assert_num_queries(1) as captured:
+            api_client.get('/api/v1/achievements/', {'fields': 'id,title'})
+        assert 'reviews_achievementscoresummary' not in captured.captured_queries[0]['sql']
+
+        with django_assert_num_queries(2) as captured:
+            api_client.get('/api/v1/achievements/')
+        assert 'reviews_achievementscoresummary' in captured.captured_queries[0]['sql']
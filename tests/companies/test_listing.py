@@ -0,0 +1,210 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.models import User
+from companies.forms import MemberFilterForm
+from companies.listing import (
+    ROLE_EMPLOYEE, ROLE_MANAGER, ROLE_OWNER, SORT_JOB, SORT_NAME, SORT_ROLE, member_page, team_page,
+)
+from companies.models import Company, CompanyUsers
+from teams.models import Team, TeamUsers
+from perfecto.keyset import encode_cursor
+
+@pytest.fixture
+def owner():
+    return User.objects.create_user(email="owner@example.com", password="pass", user_name="Owner", user_job="CEO")
+
+@pytest.fixture
+def company(owner):
+    company = Company.objects.create(company_name="Test Company")
+    CompanyUsers.objects.create(user=owner, company=company, is_owner=True, is_manager=True)
+    return company
+
+def make_members(company, count, job="Developer", is_manager=False):
+    start = CompanyUsers.objects.filter(company=company).count()
+    members = []
+    for i in range(start, start + count):
+        user = User.objects.create_user(
+            email=f"member{i}@example.com", password="pass", user_name=f"Member {i:03d}", user_job=job
+        )
+        members.append(CompanyUsers.objects.create(user=user, company=company, is_manager=is_manager))
+    return members
+
+def filters(**values):
+    return MemberFilterForm(values).filters()
+
+@pytest.mark.django_db
+class TestMemberPage:
+
+    @pytest.mark.parametrize('sort', [SORT_NAME, SORT_JOB, SORT_ROLE])
+    def test_keyset_pages_cover_all_rows_once(self, company, sort):
+        """Test that following cursors yields every member exactly once for each sort"""
+        make_members(company, 4, job="Developer")
+        make_members(company, 3, job="Analyst", is_manager=True)
+        seen = []
+        cursor = None
+        while True:
+            page = member_page(company, filters(sort=sort), cursor=cursor, page_size=3)
+            seen.extend(member.id for member in page)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(CompanyUsers.objects.filter(company=company).values_list('id', flat=True))
+        assert len(seen) == len(set(seen))
+
+    def test_role_sort_puts_owners_first(self, company, owner):
+        """Test that sorting by role orders owners, managers, then employees"""
+        employee = make_members(company, 1)[0]
+        manager = make_members(company, 1, is_manager=True)[0]
+
+        page = member_page(company, filters(sort=SORT_ROLE))
+
+        assert [member.id for member in page] == [
+            CompanyUsers.objects.get(user=owner).id, manager.id, employee.id,
+        ]
+
+    def test_filters(self, company):
+        """Test that search, role and job filters narrow the list"""
+        developers = make_members(company, 2, job="Backend Developer")
+        analyst = make_members(company, 1, job="Analyst", is_manager=True)[0]
+
+        assert [m.id for m in member_page(company, filters(q="member1@"))] == [developers[0].id]
+        assert [m.id for m in member_page(company, filters(q="member 002"))] == [developers[1].id]
+        assert [m.id for m in member_page(company, filters(role=ROLE_MANAGER))] == [analyst.id]
+        assert len(member_page(company, filters(role=ROLE_EMPLOYEE))) == 2
+        assert len(member_page(company, filters(role=ROLE_OWNER))) == 1
+        assert len(member_page(company, filters(job="developer"))) == 2
+
+    def test_invalid_filters_fall_back_to_defaults(self):
+        """Test that unknown role or sort values are ignored"""
+        assert filters(role="boss", sort="salary") == {'q': '', 'role': '', 'job': '', 'sort': SORT_NAME}
+
+    def test_malformed_cursor_starts_from_first_page(self, company):
+        """Test that a broken cursor is ignored"""
+        make_members(company, 3)
+
+        page = member_page(company, filters(), cursor='not-a-cursor', page_size=2)
+
+        assert [m.id for m in page] == [m.id for m in member_page(company, filters(), page_size=2)]
+
+    def test_tampered_cursor_starts_from_first_page(self, company):
+        """Test that cursor values not fitting the sort fields are ignored"""
+        make_members(company, 3)
+        cursor = encode_cursor([1, "not-an-id"])
+
+        page = member_page(company, filters(sort=SORT_ROLE), cursor=cursor, page_size=2)
+
+        assert [m.id for m in page] == [m.id for m in member_page(company, filters(sort=SORT_ROLE), page_size=2)]
+
+@pytest.mark.django_db
+class TestTeamPage:
+
+    def test_teams_carry_member_count(self, company, owner):
+        """Test that team cards get their member count from the page query"""
+        team = Team.objects.create(team_name="Alpha", company=company)
+        Team.objects.create(team_name="Beta", company=company)
+        TeamUsers.objects.create(user=owner, team=team)
+
+        page = team_page(company)
+
+        assert [(t.team_name, t.member_count) for t in page] == [("Alpha", 1), ("Beta", 0)]
+
+    def test_teams_are_paginated(self, company):
+        """Test that teams beyond the page size are reachable by cursor"""
+        for i in range(5):
+            Team.objects.create(team_name=f"Team {i}", company=company)
+
+        first = team_page(company, page_size=3)
+        second = team_page(company, cursor=first.next_cursor, page_size=3)
+
+        assert len(first) == 3
+        assert len(second) == 2
+        assert second.next_cursor is None
+
+@pytest.mark.django_db
+class TestCompanyDetailListing:
+
+    def _count(self, client, company):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse('company_detail', kwargs={'company_id': company.id}))
+        assert response.status_code == 200
+        return len(ctx.captured_queries)
+
+    def test_query_count_independent_of_company_size(self, client, owner, company):
+        """Test that the page runs the same number of queries for any number of members and teams"""
+        client.force_login(owner)
+        make_members(company, 2)
+        Team.objects.create(team_name="Team", company=company)
+        self._count(client, company)  # warm up the role cache
+        small = self._count(client, company)
+
+        make_members(company, 80)
+        for i in range(40):
+            Team.objects.create(team_name=f"Team {i}", company=company)
+        self._count(client, company)
+        large = self._count(client, company)
+
+        assert small == large
+
+    def test_first_page_is_limited(self, client, owner, company):
+        """Test that the full page shows one page of members with a sentinel for the rest"""
+        make_members(company, 60)
+        client.force_login(owner)
+
+        response = client.get(reverse('company_detail', kwargs={'company_id': company.id}))
+
+        assert len(response.context['company_users']) == 50
+        assert b'hx-trigger="revealed"' in response.content
+        assert b'<span class="badge bg-secondary">61</span>' in response.content
+
+    def test_htmx_next_page_renders_rows_only(self, client, owner, company):
+        """Test that the infinite scroll request gets only the next rows"""
+        make_members(company, 60)
+        client.force_login(owner)
+        first = member_page(company, filters())
+
+        response = client.get(
+            reverse('company_detail', kwargs={'company_id': company.id}),
+            {'section': 'members', 'cursor': first.next_cursor},
+            HTTP_HX_REQUEST='true'
+        )
+
+        assert response.status_code == 200
+        assert len(response.context['company_users']) == 11
+        assert b'<table' not in response.content
+        assert b'<html' not in response.content
+
+    def test_htmx_filter_renders_table(self, client, owner, company):
+        """Test that changing a filter swaps the whole table with the sort input out of band"""
+        make_members(company, 3, job="Designer")
+        make_members(company, 2, job="Developer")
+        client.force_login(owner)
+
+        response = client.get(
+            reverse('company_detail', kwargs={'company_id': company.id}),
+            {'section': 'members', 'job': 'design', 'sort': SORT_JOB},
+            HTTP_HX_REQUEST='true'
+        )
+
+        assert len(response.context['company_users']) == 3
+        assert b'<table' in response.content
+        assert b'hx-swap-oob="true"' in response.content
+        assert b'<html' not in response.content
+
+    def test_htmx_teams_page(self, client, owner, company):
+        """Test that the teams section loads further cards by cursor"""
+        for i in range(35):
+            Team.objects.create(team_name=f"Team {i:02d}", company=company)
+        client.force_login(owner)
+        first = team_page(company)
+
+        response = client.get(
+            reverse('company_detail', kwargs={'company_id': company.id}),
+            {'section': 'teams', 'cursor': first.next_cursor},
+            HTTP_HX_REQUEST='true'
+        )
+
+        assert len(response.context['teams']) == 5
+        assert b'Team 34' in response.content
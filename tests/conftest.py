@@ -0,0 +1,202 @@
+import pytest
+from django.core.cache import cache
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache so cached data never leaks between tests"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class SMTPStub:
+    """Minimal in-process SMTP server that counts connections and accepted messages."""
+
+    def __init__(self):
+        import socketserver
+        import threading
+
+        stub = self
+        self.connections = 0
+        self.messages = []
+        # Адрес -> ответ на RCPT TO, например "550 no such user"
+        self.refused = {}
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(f"{line}\r\n".encode())
+
+            def handle(self):
+                stub.connections += 1
+                self.reply("220 stub ready")
+                recipients = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode().strip().upper()
+                    if command.startswith(('EHLO', 'HELO')):
+                        self.reply("250 stub")
+                    elif command.startswith('MAIL'):
+                        recipients = []
+                        self.reply("250 OK")
+                    elif command.startswith('RCPT'):
+                        recipient = line.decode().split(':', 1)[1].strip().strip('<>')
+                        if recipient in stub.refused:
+                            self.reply(stub.refused[recipient])
+                            continue
+                        recipients.append(recipient)
+                        self.reply("250 OK")
+                    elif command == 'DATA':
+                        self.reply("354 go ahead")
+                        data = []
+                        for data_line in self.rfile:
+                            if data_line in (b".\r\n", b".\n"):
+                                break
+                            data.append(data_line)
+                        stub.messages.append((recipients, b"".join(data)))
+                        self.reply("250 queued")
+                    elif command == 'QUIT':
+                        self.reply("221 bye")
+                        return
+                    else:
+                        self.reply("250 OK")
+
+        self.server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def smtp_server(settings):
+    """Route Django's SMTP backend to a local SMTPStub for the duration of a test"""
+    stub = SMTPStub()
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+    settings.EMAIL_HOST = '127.0.0.1'
+    settings.EMAIL_PORT = stub.port
+    settings.EMAIL_USE_TLS = False
+    settings.EMAIL_HOST_USER = ''
+    settings.EMAIL_HOST_PASSWORD = ''
+    yield stub
+    stub.stop()
+
+
+class TelegramAPIStub:
+    """
+    Local HTTP stand-in for the Telegram Bot API.
+
+    Records every call as (method, payload), counts TCP connections,
+    answers 403 for chat ids listed in blocked and serves queued updates
+    to getUpdates. Accepts both JSON and form-encoded (python-telegram-bot) bodies.
+    """
+
+    def __init__(self, token):
+        import json
+        import threading
+        from urllib.parse import parse_qsl
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        stub = self
+        self.token = token
+        self.calls = []
+        self.connections = 0
+        self.blocked = set()
+        self.updates = []
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if self.headers.get('Content-Type', '').startswith('application/x-www-form-urlencoded'):
+                    payload = {key: stub.decode_value(value) for key, value in parse_qsl(body.decode())}
+                else:
+                    payload = json.loads(body or b'{}')
+                prefix = f"/bot{stub.token}/"
+                if not self.path.startswith(prefix):
+                    return self.answer(401, {'ok': False, 'description': 'Unauthorized'})
+                method = self.path[len(prefix):]
+                stub.calls.append((method, payload))
+                if str(payload.get('chat_id')) in stub.blocked:
+                    return self.answer(403, {'ok': False, 'description': 'Forbidden: bot was blocked by the user'})
+                self.answer(200, {'ok': True, 'result': stub.result(method, payload)})
+
+            def answer(self, status, data):
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def decode_value(value):
+        import json
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+
+    def result(self, method, payload):
+        if method == 'sendMessage':
+            return {
+                'message_id': len(self.calls),
+                'date': 0,
+                'chat': {'id': int(payload.get('chat_id')), 'type': 'private'},
+                'text': payload.get('text'),
+            }
+        if method == 'getMe':
+            return {'id': 1, 'is_bot': True, 'first_name': 'Perfecto', 'username': 'perfecto_bot'}
+        if method == 'getUpdates':
+            offset = int(payload.get('offset') or 0)
+            return [update for update in self.updates if update['update_id'] >= offset]
+        return True
+
+    def add_start(self, username, chat_id):
+        """Queue a /start message from a user, as getUpdates would deliver it"""
+        self.updates.append({
+            'update_id': len(self.updates) + 1,
+            'message': {
+                'message_id': len(self.updates) + 1,
+                'date': 0,
+                'chat': {'id': chat_id, 'type': 'private'},
+                'from': {'id': chat_id, 'is_bot': False, 'first_name': username, 'username': username},
+                'text': '/start',
+            },
+        })
+
+    def sent(self):
+        return [payload for method, payload in self.calls if method == 'sendMessage']
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def telegram_api(settings):
+    """Point the Telegram integration at a local TelegramAPIStub"""
+    stub = TelegramAPIStub('test-token')
+    settings.TELEGRAM_BOT_TOKEN = stub.token
+    settings.TELEGRAM_API_URL = stub.url
+    yield stub
+    stub.stop()
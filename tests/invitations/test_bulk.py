@@ -0,0 +1,251 @@
+import io
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from teams.models import Team
+from invitations.models import Invitation
+from jobs.models import Job
+from jobs.worker import work
+from invitations.services import (
+    MAX_DELIVERY_ATTEMPTS, create_bulk_invitations, deliver_pending_invitations, parse_email_list,
+)
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email="owner@example.com", password="password123", user_name="Owner")
+
+@pytest.fixture
+def company(user):
+    company = Company.objects.create(company_name="Test Company")
+    CompanyUsers.objects.create(user=user, company=company, is_owner=True)
+    return company
+
+@pytest.fixture
+def team(company):
+    return Team.objects.create(team_name="Test Team", company=company)
+
+def queue_invitations(user, company, count):
+    return create_bulk_invitations(user, company, [f"guest{i}@example.com" for i in range(count)]).created
+
+class TestParseEmailList:
+
+    def test_text_is_split_validated_and_deduplicated(self):
+        """Test that pasted text is split on any separator, lowercased and deduplicated"""
+        emails, invalid, duplicates = parse_email_list("a@example.com, B@example.com;\nnot-an-email b@example.com")
+
+        assert emails == ["a@example.com", "b@example.com"]
+        assert invalid == ["not-an-email"]
+        assert duplicates == 1
+
+    def test_csv_uses_email_column(self):
+        """Test that a CSV with a header takes the email column and merges with the text"""
+        lines = ["name,email\n", "Anna,anna@example.com\n", "Bob,\n", "Anna,ANNA@example.com\n"]
+
+        emails, invalid, duplicates = parse_email_list("c@example.com", lines)
+
+        assert emails == ["c@example.com", "anna@example.com"]
+        assert invalid == []
+        assert duplicates == 1
+
+    def test_csv_without_header_uses_first_column(self):
+        """Test that a headerless CSV takes its first column"""
+        emails, _, _ = parse_email_list(csv_lines=["x@example.com,1\n", "y@example.com,2\n"])
+
+        assert emails == ["x@example.com", "y@example.com"]
+
+@pytest.mark.django_db
+class TestCreateBulkInvitations:
+
+    def test_skips_members_and_invited(self, user, company):
+        """Test that members and already invited emails are skipped"""
+        Invitation.objects.create(
+            created_by=user, invitation_type=Invitation.TYPE_COMPANY, company=company,
+            email="invited@example.com", expires_at=timezone.now() + timedelta(days=1)
+        )
+
+        result = create_bulk_invitations(
+            user, company, ["owner@example.com", "invited@example.com", "new@example.com"]
+        )
+
+        assert [invitation.email for invitation in result.created] == ["new@example.com"]
+        assert result.already_invited == ["owner@example.com", "invited@example.com"]
+        assert Invitation.objects.filter(sent_at__isnull=True).count() == 2
+
+    def test_expired_invitation_does_not_block(self, user, company):
+        """Test that an expired invitation for the same email does not count as invited"""
+        Invitation.objects.create(
+            created_by=user, invitation_type=Invitation.TYPE_COMPANY, company=company,
+            email="late@example.com", expires_at=timezone.now() - timedelta(days=1)
+        )
+
+        result = create_bulk_invitations(user, company, ["late@example.com"])
+
+        assert len(result.created) == 1
+
+    def test_team_invitations(self, user, company, team):
+        """Test that team invitations are typed and bound to the team"""
+        result = create_bulk_invitations(user, company, ["a@example.com"], team=team, is_manager_invite=True)
+
+        invitation = Invitation.objects.get(id=result.created[0].id)
+        assert invitation.invitation_type == Invitation.TYPE_TEAM
+        assert invitation.team == team
+        assert invitation.is_manager_invite
+
+    def test_constant_query_count(self, user, company):
+        """Test that creating many invitations costs a fixed number of queries"""
+        emails = [f"guest{i}@example.com" for i in range(200)]
+
+        with CaptureQueriesContext(connection) as queries:
+            create_bulk_invitations(user, company, emails)
+
+        # Проверка занятых адресов и один INSERT (плюс SAVEPOINT/RELEASE вокруг него)
+        assert len(queries) <= 4
+        assert Invitation.objects.count() == 200
+
+@pytest.mark.django_db
+class TestDeliverPendingInvitations:
+
+    def test_batches_share_one_connection(self, user, company, smtp_server):
+        """Test that all batches are sent over a single SMTP connection and marked sent"""
+        queue_invitations(user, company, 7)
+
+        sent = deliver_pending_invitations(batch_size=3)
+
+        assert sent == 7
+        assert smtp_server.connections == 1
+        assert len(smtp_server.messages) == 7
+        assert not Invitation.objects.filter(sent_at__isnull=True).exists()
+
+    def test_message_contains_accept_link(self, user, company, smtp_server, settings):
+        """Test that the email carries the absolute accept link"""
+        settings.SITE_URL = "https://perfecto.example"
+        invitation = queue_invitations(user, company, 1)[0]
+
+        deliver_pending_invitations()
+
+        recipients, data = smtp_server.messages[0]
+        assert recipients == ["guest0@example.com"]
+        assert f"https://perfecto.example{invitation.get_absolute_url()}".encode() in data
+
+    def test_skips_sent_expired_and_anonymous(self, user, company, smtp_server):
+        """Test that only active unsent invitations with an email are delivered"""
+        queue_invitations(user, company, 1)
+        Invitation.objects.create(
+            created_by=user, invitation_type=Invitation.TYPE_COMPANY, company=company,
+            expires_at=timezone.now() + timedelta(days=1)
+        )
+        Invitation.objects.create(
+            created_by=user, invitation_type=Invitation.TYPE_COMPANY, company=company,
+            email="old@example.com", expires_at=timezone.now() - timedelta(days=1)
+        )
+        Invitation.objects.create(
+            created_by=user, invitation_type=Invitation.TYPE_COMPANY, company=company,
+            email="done@example.com", expires_at=timezone.now() + timedelta(days=1), sent_at=timezone.now()
+        )
+
+        assert deliver_pending_invitations() == 1
+        assert len(smtp_server.messages) == 1
+
+    def test_refused_recipient_leaves_queue(self, user, company, smtp_server):
+        """Test that a permanently refused address is recorded and does not block the rest"""
+        queue_invitations(user, company, 4)
+        smtp_server.refused["guest0@example.com"] = "550 no such user"
+
+        assert deliver_pending_invitations(batch_size=2) == 3
+        assert deliver_pending_invitations(batch_size=2) == 0
+
+        assert len(smtp_server.messages) == 3
+        failed = Invitation.objects.get(email="guest0@example.com")
+        assert failed.sent_at is None
+        assert failed.delivery_failed_at is not None
+        assert "no such user" in failed.delivery_error
+
+    def test_transient_refusal_is_retried_until_limit(self, user, company, smtp_server):
+        """Test that 4xx refusals keep the invitation queued for MAX_DELIVERY_ATTEMPTS runs"""
+        queue_invitations(user, company, 2)
+        smtp_server.refused["guest0@example.com"] = "450 mailbox busy"
+
+        for _ in range(MAX_DELIVERY_ATTEMPTS):
+            deliver_pending_invitations()
+
+        failed = Invitation.objects.get(email="guest0@example.com")
+        assert failed.delivery_attempts == MAX_DELIVERY_ATTEMPTS
+        assert failed.delivery_failed_at is not None
+        assert len(smtp_server.messages) == 1
+
+        smtp_server.refused.clear()
+        assert deliver_pending_invitations() == 0
+
+    def test_command_sends_queue(self, user, company, smtp_server):
+        """Test that the management command drains the queue"""
+        queue_invitations(user, company, 3)
+        out = io.StringIO()
+
+        call_command('send_invitation_emails', '--batch-size', '2', stdout=out)
+
+        assert "Sent 3 invitation(s)" in out.getvalue()
+        assert smtp_server.connections == 1
+
+@pytest.mark.django_db
+class TestBulkInvitationViews:
+
+    def test_company_bulk_invite(self, client, user, company):
+        """Test that the company page creates invitations from text and a CSV file"""
+        client.force_login(user)
+        upload = io.BytesIO(b"email\nfile@example.com\n")
+        upload.name = "emails.csv"
+
+        response = client.post(reverse('bulk_company_invitation', kwargs={'company_id': company.id}), {
+            'emails': "a@example.com, bad, a@example.com owner@example.com",
+            'file': upload,
+        })
+
+        assert response.status_code == 200
+        assert set(Invitation.objects.values_list('email', flat=True)) == {"a@example.com", "file@example.com"}
+        result = response.context['result']
+        assert result.already_invited == ["owner@example.com"]
+        assert response.context['form'].cleaned_data['invalid_emails'] == ["bad"]
+        assert response.context['form'].cleaned_data['duplicate_count'] == 1
+
+    def test_team_bulk_invite(self, client, user, company, team):
+        """Test that the team page creates team invitations"""
+        client.force_login(user)
+
+        client.post(reverse('bulk_team_invitation', kwargs={'team_id': team.id}), {'emails': "t@example.com"})
+
+        assert Invitation.objects.get().team == team
+
+    def test_delivery_is_queued_once(self, client, user, company, team, smtp_server):
+        """Test that bulk invites queue a single delivery job that a worker runs"""
+        client.force_login(user)
+
+        client.post(reverse('bulk_company_invitation', kwargs={'company_id': company.id}), {'emails': "a@example.com"})
+        client.post(reverse('bulk_team_invitation', kwargs={'team_id': team.id}), {'emails': "b@example.com"})
+
+        assert Job.objects.filter(task='invitations.deliver').count() == 1
+        work('test', burst=True)
+        assert len(smtp_server.messages) == 2
+
+    def test_empty_list_is_rejected(self, client, user, company):
+        """Test that an empty submission shows a form error"""
+        client.force_login(user)
+
+        response = client.post(reverse('bulk_company_invitation', kwargs={'company_id': company.id}), {'emails': ""})
+
+        assert response.context['form'].errors
+        assert not Invitation.objects.exists()
+
+    def test_requires_manage_permission(self, client, company):
+        """Test that a non-manager cannot bulk invite"""
+        outsider = User.objects.create_user(email="outsider@example.com", password="password123")
+        client.force_login(outsider)
+
+        response = client.get(reverse('bulk_company_invitation', kwargs={'company_id': company.id}))
+
+        assert response.status_code == 403
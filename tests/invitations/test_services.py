@@ -0,0 +1,83 @@
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from accounts.models import User
+from companies.models import Company
+from invitations.models import Invitation, ArchivedInvitation
+from invitations.services import purge_expired_invitations
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email="test@example.com", password="password123", user_name="Test User")
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+def make_invitations(user, company, count, expires_in_days):
+    return Invitation.objects.bulk_create([
+        Invitation(
+            created_by=user,
+            invitation_type=Invitation.TYPE_COMPANY,
+            company=company,
+            expires_at=timezone.now() + timedelta(days=expires_in_days),
+            email=f"guest{i}@example.com",
+        )
+        for i in range(count)
+    ])
+
+@pytest.mark.django_db
+class TestInvitationQuerySet:
+
+    def test_active_and_expired_split_in_database(self, user, company):
+        """Test that the queryset filters split invitations by expiry"""
+        make_invitations(user, company, 2, 3)
+        make_invitations(user, company, 3, -3)
+
+        assert Invitation.objects.active().count() == 2
+        assert Invitation.objects.expired().count() == 3
+
+@pytest.mark.django_db
+class TestPurgeExpiredInvitations:
+
+    def test_only_old_expired_invitations_are_deleted(self, user, company):
+        """Test that active and recently expired invitations survive the purge"""
+        make_invitations(user, company, 2, 3)
+        make_invitations(user, company, 2, -3)
+        make_invitations(user, company, 5, -40)
+
+        removed = purge_expired_invitations(retention_days=30, batch_size=2)
+
+        assert removed == 5
+        assert Invitation.objects.count() == 4
+        assert ArchivedInvitation.objects.count() == 0
+
+    def test_archive_moves_rows(self, user, company):
+        """Test that archiving copies rows before deleting them"""
+        expired = make_invitations(user, company, 3, -40)
+
+        removed = purge_expired_invitations(archive=True, batch_size=2)
+
+        assert removed == 3
+        assert not Invitation.objects.exists()
+        archived = ArchivedInvitation.objects.get(id=expired[0].id)
+        assert archived.email == expired[0].email
+        assert archived.company == company
+
+    def test_batches_run_a_bounded_number_of_queries(self, user, company, django_assert_max_num_queries):
+        """Test that each batch costs a select and a delete, whatever its size"""
+        make_invitations(user, company, 10, -40)
+
+        # select + savepoint + delete + release на пакет, и пустой select в конце
+        with django_assert_max_num_queries(3 * 4 + 1):
+            assert purge_expired_invitations(batch_size=4) == 10
+
+    def test_command(self, user, company, capsys):
+        """Test that the management command reports removed invitations"""
+        make_invitations(user, company, 2, -40)
+
+        call_command('purge_invitations', '--archive')
+
+        assert 'Archived 2 expired invitation(s)' in capsys.readouterr().out
+        assert ArchivedInvitation.objects.count() == 2
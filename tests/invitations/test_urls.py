@@ -4,7 +4,9 @@ from invitations.views import (
     create_company_invitation, 
     create_team_invitation,
     invitation_accept,
-    invitation_list
+    invitation_list,
+    bulk_company_invitation,
+    bulk_team_invitation
 )
 
 class TestInvitationUrls:
@@ -34,3 +36,10 @@ class TestInvitationUrls:
         url = reverse('invitation_list')
         assert url == '/invitations/my-invitations/'
         assert resolve(url).func == invitation_list
+
+    def test_bulk_invitation_urls(self):
+        """Test the bulk invitation URL patterns"""
+        url = reverse('bulk_company_invitation', kwargs={'company_id': 1})
+        assert resolve(url).func == bulk_company_invitation
+        url = reverse('bulk_team_invitation', kwargs={'team_id': 1})
+        assert resolve(url).func == bulk_team_invitation
@@ -2,7 +2,8 @@ import pytest
 from django.urls import reverse
 from django.utils import timezone
 from datetime import timedelta
-from invitations.models import Invitation
+from invitations.models import Invitation, ArchivedInvitation
+from invitations.services import purge_expired_invitations
 from accounts.models import User
 from companies.models import Company, CompanyUsers
 from teams.models import Team, TeamUsers
@@ -276,3 +277,49 @@ class TestInvitationList:
         response = client.get(url)
         
         assert response.status_code == 302  # Redirect to login
+    
+    def test_invitation_list_paginates_both_lists(self, client, user, company):
+        """Test that active and expired invitations are paged independently"""
+        now = timezone.now()
+        Invitation.objects.bulk_create([
+            Invitation(created_by=user, invitation_type=Invitation.TYPE_COMPANY, company=company,
+                       expires_at=now + timedelta(days=1 if i % 2 else -1))
+            for i in range(60)
+        ])
+        client.force_login(user)
+        
+        response = client.get(reverse('invitation_list'), {'expired_page': 2})
+        
+        assert response.context['active_invitations'].paginator.count == 30
+        assert len(response.context['active_invitations']) == 25
+        assert response.context['expired_invitations'].number == 2
+        assert len(response.context['expired_invitations']) == 5
+        assert response.context['show_expired'] is True
+    
+    def test_invitation_list_query_count_is_constant(self, client, user, company, team, django_assert_max_num_queries):
+        """Test that targets are joined instead of loaded per row"""
+        Invitation.objects.bulk_create([
+            Invitation(created_by=user, invitation_type=Invitation.TYPE_TEAM, company=company, team=team,
+                       expires_at=timezone.now() + timedelta(days=1))
+            for _ in range(20)
+        ])
+        client.force_login(user)
+        client.get(reverse('invitation_list'))
+        
+        with django_assert_max_num_queries(10):
+            response = client.get(reverse('invitation_list'))
+        assert response.status_code == 200
+
+@pytest.mark.django_db
+class TestArchivedInvitationAccept:
+    
+    def test_archived_invitation_shows_expired_page(self, client, expired_invitation):
+        """Test that a purged-with-archive invitation link still explains it expired"""
+        purge_expired_invitations(retention_days=0, archive=True)
+        assert not Invitation.objects.filter(id=expired_invitation.id).exists()
+        assert ArchivedInvitation.objects.filter(id=expired_invitation.id).exists()
+        
+        response = client.get(reverse('invitation_accept', kwargs={'uuid': expired_invitation.id}))
+        
+        assert response.status_code == 200
+        assert 'invitations/invitation_expired.html' in [t.name for t in response.templates]
@@ -0,0 +1,219 @@
+import io
+import pytest
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+from jobs.models import Job
+from jobs.queue import PRIORITY_HIGH, PRIORITY_LOW, enqueue, task
+import time
+from jobs.worker import claim_job, purge_finished_jobs, requeue_stale_jobs, retry_delay, run_job, work
+
+calls = []
+
+@task('tests.record')
+def record(value):
+    calls.append(value)
+
+@task('tests.watch')
+def watch():
+    # Даёт сердцебиению несколько тактов и смотрит на задачу глазами другого воркера
+    time.sleep(0.3)
+    calls.append((Job.objects.get(status=Job.STATUS_RUNNING).locked_at, requeue_stale_jobs()))
+
+@task('tests.explode', max_attempts=2)
+def explode():
+    raise RuntimeError("boom")
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    calls.clear()
+
+@pytest.mark.django_db
+class TestEnqueue:
+
+    def test_payload_and_defaults(self):
+        """Test that a job stores its payload and the task's defaults"""
+        job = enqueue('tests.explode', priority=PRIORITY_HIGH)
+
+        assert job.status == Job.STATUS_QUEUED
+        assert job.priority == PRIORITY_HIGH
+        assert job.max_attempts == 2
+
+    def test_unknown_task_is_rejected(self):
+        """Test that enqueueing an unregistered task fails immediately"""
+        with pytest.raises(KeyError):
+            enqueue('tests.missing')
+
+    def test_key_deduplicates_waiting_jobs(self):
+        """Test that a second job with the same key is not queued while the first waits"""
+        first = enqueue('tests.record', {'value': 1}, key='once')
+        second = enqueue('tests.record', {'value': 2}, key='once')
+
+        assert first is not None
+        assert second is None
+        assert Job.objects.count() == 1
+
+    def test_key_is_released_when_claimed(self):
+        """Test that the same key can be queued again once a worker took the job"""
+        enqueue('tests.record', {'value': 1}, key='once')
+        claim_job('w1')
+
+        assert enqueue('tests.record', {'value': 2}, key='once') is not None
+
+    def test_rolled_back_transaction_leaves_no_job(self):
+        """Test that jobs are written in the caller's transaction"""
+        from django.db import transaction
+        with pytest.raises(ValueError):
+            with transaction.atomic():
+                enqueue('tests.record', {'value': 1})
+                raise ValueError
+
+        assert not Job.objects.exists()
+
+@pytest.mark.django_db
+class TestClaimAndRun:
+
+    def test_priority_then_age(self):
+        """Test that jobs are claimed by priority, then in queue order"""
+        low = enqueue('tests.record', {'value': 'low'}, priority=PRIORITY_LOW)
+        old = enqueue('tests.record', {'value': 'old'})
+        new = enqueue('tests.record', {'value': 'new'})
+        high = enqueue('tests.record', {'value': 'high'}, priority=PRIORITY_HIGH)
+
+        order = [claim_job('w1').id for _ in range(4)]
+
+        assert order == [high.id, old.id, new.id, low.id]
+        assert claim_job('w1') is None
+
+    def test_delayed_job_waits(self):
+        """Test that a job is not claimed before its run_at"""
+        enqueue('tests.record', {'value': 1}, delay=60)
+
+        assert claim_job('w1') is None
+        assert claim_job('w1', now=timezone.now() + timedelta(minutes=2)) is not None
+
+    def test_two_workers_never_share_a_job(self):
+        """Test that a claimed job is not handed to another worker"""
+        enqueue('tests.record', {'value': 1})
+
+        first = claim_job('w1')
+        second = claim_job('w2')
+
+        assert first.locked_by == 'w1'
+        assert second is None
+        assert Job.objects.get().attempts == 1
+
+    def test_success(self):
+        """Test that a successful job runs with its payload and is marked done"""
+        enqueue('tests.record', {'value': 42})
+
+        assert run_job(claim_job('w1'))
+
+        job = Job.objects.get()
+        assert calls == [42]
+        assert job.status == Job.STATUS_DONE
+        assert job.finished_at is not None
+        assert job.locked_by == ''
+
+    def test_failure_is_retried_with_backoff(self):
+        """Test that a failed job goes back to the queue after a growing delay"""
+        enqueue('tests.explode')
+        before = timezone.now()
+
+        assert not run_job(claim_job('w1'))
+
+        job = Job.objects.get()
+        assert job.status == Job.STATUS_QUEUED
+        assert "boom" in job.last_error
+        assert job.run_at >= before + retry_delay(1)
+        assert retry_delay(2) == 2 * retry_delay(1)
+
+    def test_failure_gives_up_after_max_attempts(self):
+        """Test that a job is failed for good once it used up its attempts"""
+        enqueue('tests.explode')
+        later = timezone.now() + timedelta(days=1)
+
+        run_job(claim_job('w1'))
+        run_job(claim_job('w1', now=later))
+
+        job = Job.objects.get()
+        assert job.status == Job.STATUS_FAILED
+        assert job.attempts == 2
+
+    def test_unknown_task_fails_without_retry(self):
+        """Test that a job whose task is no longer registered fails at once"""
+        Job.objects.create(task='tests.gone')
+
+        run_job(claim_job('w1'))
+
+        assert Job.objects.get().status == Job.STATUS_FAILED
+
+    def test_stale_running_jobs_are_requeued(self):
+        """Test that jobs abandoned by a dead worker return to the queue"""
+        enqueue('tests.record', {'value': 1})
+        enqueue('tests.explode')
+        claim_job('w1')
+        claim_job('w1')
+        Job.objects.filter(task='tests.explode').update(attempts=2)
+
+        recovered = requeue_stale_jobs(now=timezone.now() + timedelta(hours=1))
+
+        assert recovered == 2
+        assert Job.objects.get(task='tests.record').status == Job.STATUS_QUEUED
+        assert Job.objects.get(task='tests.explode').status == Job.STATUS_FAILED
+
+    def test_purge_removes_old_finished_jobs(self):
+        """Test that only done/failed jobs past the retention period are deleted"""
+        old = timezone.now() - timedelta(days=30)
+        for status in (Job.STATUS_DONE, Job.STATUS_FAILED):
+            Job.objects.create(task='tests.record', status=status, finished_at=old)
+        Job.objects.create(task='tests.record', status=Job.STATUS_DONE, finished_at=timezone.now())
+        Job.objects.create(task='tests.record')
+
+        assert purge_finished_jobs(batch_size=1) == 2
+        assert Job.objects.count() == 2
+
+@pytest.mark.django_db(transaction=True)
+class TestHeartbeat:
+
+    def test_locked_at_is_refreshed_while_running(self):
+        """Test that the heartbeat thread moves locked_at forward during a long job"""
+        enqueue('tests.watch')
+        job = claim_job('w1')
+        claimed_at = timezone.now() - timedelta(hours=1)
+        Job.objects.filter(id=job.id).update(locked_at=claimed_at)
+
+        run_job(job, heartbeat_interval=0.05)
+
+        locked_at, requeued = calls[0]
+        assert locked_at > claimed_at
+        assert requeued == 0
+        assert Job.objects.get(id=job.id).status == Job.STATUS_DONE
+
+@pytest.mark.django_db
+class TestWork:
+
+    def test_burst_drains_ready_jobs(self):
+        """Test that a burst worker runs every ready job and stops"""
+        for value in range(3):
+            enqueue('tests.record', {'value': value})
+        enqueue('tests.record', {'value': 'later'}, delay=3600)
+
+        assert work('w1', burst=True) == 3
+        assert calls == [0, 1, 2]
+
+    def test_should_stop(self):
+        """Test that the worker stops when asked, even with jobs left"""
+        enqueue('tests.record', {'value': 1})
+
+        assert work('w1', should_stop=lambda: True) == 0
+
+    def test_command(self):
+        """Test that run_workers in burst mode runs the queue"""
+        enqueue('tests.record', {'value': 1})
+        out = io.StringIO()
+
+        call_command('run_workers', '--burst', stdout=out)
+
+        assert calls == [1]
+        assert "Ran 1 job(s)" in out.getvalue()
@@ -0,0 +1,228 @@
+import io
+from email import message_from_bytes
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from accounts.models import User
+from companies.models import Company
+from teams.models import Team, TeamUsers
+from notifications.channels import Channel, RateLimiter, TELEGRAM_MESSAGE_LIMIT, split_message
+from notifications.digests import send_digests
+from notifications.models import Notification
+from reviews.models import Achievement
+from reviews.services import launch_team_reviews
+
+@pytest.fixture(autouse=True)
+def no_throttle(settings):
+    settings.NOTIFICATION_EMAIL_RATE = 0
+    settings.NOTIFICATION_TELEGRAM_RATE = 0
+
+@pytest.fixture
+def team():
+    return Team.objects.create(team_name="Core", company=Company.objects.create(company_name="Test Company"))
+
+def make_members(team, count, **extra):
+    users = []
+    for i in range(count):
+        user = User.objects.create_user(
+            email=f"member{i}@example.com", password="pass", user_name=f"Member {i}", **extra
+        )
+        TeamUsers.objects.create(user=user, team=team)
+        users.append(user)
+    return users
+
+@pytest.mark.django_db
+class TestSendDigests:
+
+    def test_one_digest_per_recipient_over_one_connection(self, team, smtp_server):
+        """Test that a launch plus assignments yields one email per person over one SMTP session"""
+        members = make_members(team, 12)
+        launch_team_reviews(team)
+        # Каждого назначаем ревьюером достижения соседа
+        for member, neighbour in zip(members, members[1:] + members[:1]):
+            achievement = Achievement.objects.create(
+                perfreview=member.perfreview_set.get(), title=f"Work of {member.user_name}", self_score=4
+            )
+            achievement.reviewers.add(neighbour)
+        assert Notification.objects.count() == 24
+
+        delivered = send_digests(batch_size=5)
+
+        assert delivered == 12
+        assert len(smtp_server.messages) == 12
+        assert smtp_server.connections == 1
+        assert not Notification.objects.filter(sent_at__isnull=True).exists()
+
+    def test_digest_groups_events(self, team, smtp_server):
+        """Test that the digest lists every event with its link"""
+        member = make_members(team, 1)[0]
+        launch_team_reviews(team)
+        achievement = Achievement.objects.create(perfreview=member.perfreview_set.get(), title="Billing", self_score=4)
+        reviewer = User.objects.create_user(email="reviewer@example.com", password="pass", user_name="Reviewer")
+        achievement.reviewers.add(reviewer)
+        Notification.objects.filter(recipient=reviewer).update(recipient=member)
+
+        send_digests()
+
+        recipients, data = smtp_server.messages[0]
+        body = message_from_bytes(data).get_payload(decode=True).decode()
+        assert recipients == [member.email]
+        assert len(smtp_server.messages) == 1
+        assert "Запущенные перфревью" in body
+        assert "Назначены ревьюером" in body
+        assert "Billing" in body
+        assert f"/reviews/achievement/{achievement.id}/score/" in body
+
+    def test_telegram_channel_reuses_connection(self, team, smtp_server, telegram_api):
+        """Test that users with Telegram also get the digest there, over one HTTP connection"""
+        make_members(team, 4, telegram_id="100")
+        launch_team_reviews(team)
+
+        send_digests()
+
+        sent = telegram_api.sent()
+        assert len(sent) == 4
+        assert telegram_api.connections == 1
+        assert len(smtp_server.messages) == 4
+
+    def test_failing_channel_does_not_block_others(self, team, smtp_server, telegram_api):
+        """Test that a blocked bot is logged and the email still counts as delivered"""
+        make_members(team, 1, telegram_id="666")
+        telegram_api.blocked.add("666")
+        launch_team_reviews(team)
+
+        assert send_digests() == 1
+        assert len(smtp_server.messages) == 1
+        assert not Notification.objects.filter(sent_at__isnull=True).exists()
+
+    def test_undelivered_stay_in_outbox(self, team, settings, telegram_api):
+        """Test that notifications nobody accepted are kept for the next run"""
+        settings.NOTIFICATION_CHANNELS = ['notifications.channels.TelegramChannel']
+        make_members(team, 1, telegram_id="666")
+        telegram_api.blocked.add("666")
+        launch_team_reviews(team)
+
+        assert send_digests() == 0
+        assert Notification.objects.filter(sent_at__isnull=True).count() == 1
+
+    def test_recipients_without_channel_are_skipped(self, team, settings, telegram_api):
+        """Test that notifications no channel can take leave the outbox instead of being re-read forever"""
+        settings.NOTIFICATION_CHANNELS = ['notifications.channels.TelegramChannel']
+        make_members(team, 2)
+        launch_team_reviews(team)
+
+        assert send_digests() == 0
+        assert telegram_api.sent() == []
+        assert not Notification.objects.filter(sent_at__isnull=True).exists()
+
+    def test_sent_notifications_are_marked_in_chunks(self, team, smtp_server):
+        """Test that marking a large batch as sent stays within batch_size ids per UPDATE"""
+        user = make_members(team, 1)[0]
+        Notification.objects.bulk_create([
+            Notification(recipient=user, event='review_launched', text=f"Event {i}") for i in range(7)
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            assert send_digests(batch_size=3) == 1
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        assert len(updates) == 3
+        assert not Notification.objects.filter(sent_at__isnull=True).exists()
+
+    def test_connection_error_keeps_earlier_digests_sent(self, team):
+        """Test that digests accepted before a connection failure are not sent again"""
+        make_members(team, 3)
+        launch_team_reviews(team)
+
+        class FlakyChannel(Channel):
+            name = 'flaky'
+
+            def __init__(self):
+                super().__init__()
+                self.delivered = []
+
+            def accepts(self, user):
+                return True
+
+            def deliver(self, user, subject, body):
+                if len(self.delivered) == 2:
+                    raise ConnectionResetError("dropped")
+                self.delivered.append(user.id)
+
+        channel = FlakyChannel()
+        with pytest.raises(ConnectionResetError):
+            send_digests(channels=[channel])
+
+        sent = Notification.objects.filter(sent_at__isnull=False)
+        assert set(sent.values_list('recipient_id', flat=True)) == set(channel.delivered)
+        assert Notification.objects.filter(sent_at__isnull=True).count() == 1
+
+    def test_long_telegram_digest_is_split(self, team, settings, telegram_api):
+        """Test that a digest over the Bot API limit goes out as several messages"""
+        settings.NOTIFICATION_CHANNELS = ['notifications.channels.TelegramChannel']
+        user = make_members(team, 1, telegram_id="100")[0]
+        Notification.objects.bulk_create([
+            Notification(recipient=user, event='review_launched', text="Запущено перфревью в команде " + "Команда " * 20)
+            for _ in range(100)
+        ])
+
+        assert send_digests() == 1
+
+        texts = [payload['text'] for payload in telegram_api.sent()]
+        assert len(texts) > 1
+        assert all(len(text) <= TELEGRAM_MESSAGE_LIMIT for text in texts)
+
+    def test_command(self, team, smtp_server):
+        """Test that the command delivers pending digests"""
+        make_members(team, 2)
+        launch_team_reviews(team)
+        out = io.StringIO()
+
+        call_command('send_notification_digests', stdout=out)
+
+        assert "Delivered 2 digest(s)" in out.getvalue()
+
+class TestSplitMessage:
+
+    def test_short_text_is_one_part(self):
+        """Test that a message within the limit is sent as is"""
+        assert split_message("Привет\nмир") == ["Привет\nмир"]
+
+    def test_splits_at_line_breaks(self):
+        """Test that parts end on line boundaries and keep every line"""
+        lines = [f"line {i:03d}" for i in range(100)]
+
+        parts = split_message("\n".join(lines), limit=100)
+
+        assert all(len(part) <= 100 for part in parts)
+        assert "\n".join(parts).split("\n") == lines
+
+    def test_overlong_line_is_cut(self):
+        """Test that a single line over the limit is cut into pieces"""
+        parts = split_message("x" * 250, limit=100)
+
+        assert [len(part) for part in parts] == [100, 100, 50]
+
+class TestRateLimiter:
+
+    def test_spaces_calls(self):
+        """Test that calls beyond the rate sleep until their slot"""
+        now = [0.0]
+        slept = []
+
+        def sleep(seconds):
+            slept.append(seconds)
+            now[0] += seconds
+
+        limiter = RateLimiter(4, clock=lambda: now[0], sleep=sleep)
+        for _ in range(3):
+            limiter.wait()
+
+        assert slept == [0.25, 0.25]
+
+    def test_no_rate_means_no_wait(self):
+        """Test that a zero rate disables throttling"""
+        limiter = RateLimiter(0, clock=lambda: 0.0, sleep=lambda seconds: pytest.fail("slept"))
+        limiter.wait()
+        limiter.wait()
@@ -0,0 +1,100 @@
+import pytest
+from datetime import timedelta
+from django.utils import timezone
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from teams.models import Team, TeamUsers
+from invitations.models import Invitation
+from jobs.models import Job
+from notifications.events import invitations_created
+from notifications.models import Notification
+from reviews.models import Achievement, PerfReview
+from reviews.services import launch_team_reviews, save_batch_scores, assigned_achievements
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def team(company):
+    return Team.objects.create(team_name="Core", company=company)
+
+@pytest.fixture
+def employee(team):
+    user = User.objects.create_user(email="employee@example.com", password="pass", user_name="Employee")
+    TeamUsers.objects.create(user=user, team=team)
+    return user
+
+@pytest.fixture
+def reviewer(company):
+    user = User.objects.create_user(email="reviewer@example.com", password="pass", user_name="Reviewer")
+    CompanyUsers.objects.create(user=user, company=company)
+    return user
+
+@pytest.fixture
+def review(employee, team):
+    return PerfReview.objects.create(user=employee, team=team)
+
+@pytest.mark.django_db
+class TestEvents:
+
+    def test_reviewer_assignment_is_recorded(self, review, reviewer, employee):
+        """Test that adding reviewers records one notification each, but not for the employee"""
+        achievement = Achievement.objects.create(perfreview=review, title="Shipped billing", self_score=4)
+
+        achievement.reviewers.add(reviewer, employee)
+
+        notification = Notification.objects.get()
+        assert notification.recipient == reviewer
+        assert notification.event == Notification.EVENT_REVIEWER_ASSIGNED
+        assert "Shipped billing" in notification.text
+
+    def test_events_share_one_scheduled_digest(self, review, reviewer):
+        """Test that any number of events schedule a single delayed digest job"""
+        for i in range(3):
+            achievement = Achievement.objects.create(perfreview=review, title=f"Work {i}", self_score=4)
+            achievement.reviewers.add(reviewer)
+
+        job = Job.objects.get()
+        assert job.task == 'notifications.send_digests'
+        assert job.run_at > timezone.now()
+
+    def test_team_launch_notifies_members(self, team, employee):
+        """Test that launching reviews records a notification per new review"""
+        launch_team_reviews(team)
+        launch_team_reviews(team)
+
+        notification = Notification.objects.get()
+        assert notification.recipient == employee
+        assert notification.event == Notification.EVENT_REVIEW_LAUNCHED
+
+    def test_batch_scores_notify_owner_once(self, review, reviewer, employee):
+        """Test that a batch of new scores is a single notification to the review owner"""
+        for i in range(3):
+            achievement = Achievement.objects.create(perfreview=review, title=f"Work {i}", self_score=4)
+            achievement.reviewers.add(reviewer)
+        achievements = assigned_achievements(review, reviewer)
+
+        save_batch_scores(review, reviewer, achievements, [(a.id, 4, '') for a in achievements])
+
+        notification = Notification.objects.get(event=Notification.EVENT_SCORE_SUBMITTED)
+        assert notification.recipient == employee
+        assert "3" in notification.text
+
+    def test_invitation_to_registered_user_goes_to_digest(self, company, reviewer, employee):
+        """Test that invitations for registered emails become notifications and skip the invitation email"""
+        invitations = [
+            Invitation.objects.create(
+                created_by=reviewer, invitation_type=Invitation.TYPE_COMPANY, company=company,
+                email=email, expires_at=timezone.now() + timedelta(days=7)
+            )
+            for email in ("Employee@example.com", "stranger@example.com")
+        ]
+
+        invitations_created(invitations)
+
+        notification = Notification.objects.get()
+        assert notification.recipient == employee
+        assert notification.url == invitations[0].get_absolute_url()
+        assert Invitation.objects.get(id=invitations[0].id).sent_at is not None
+        assert Invitation.objects.get(id=invitations[1].id).sent_at is None
@@ -0,0 +1,37 @@
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from accounts.permissions import get_membership_map
+from perfecto.caching import delete_after_commit
+
+
+@pytest.mark.django_db
+class TestDeleteAfterCommit:
+    def test_outside_transaction(self):
+        """Test that keys are deleted at once outside a transaction"""
+        cache.set('key', 'value')
+        delete_after_commit(['key'])
+        assert cache.get('key') is None
+
+    def test_value_recached_before_commit_is_dropped(self, django_capture_on_commit_callbacks):
+        """Test that a value cached by a concurrent request before the commit does not survive it"""
+        cache.set('key', 'old')
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                delete_after_commit(['key'])
+                assert cache.get('key') is None
+                # Параллельный запрос ещё видит старое состояние и кладёт его в кэш
+                cache.set('key', 'old')
+        assert cache.get('key') is None
+
+    def test_membership_change_clears_roles_on_commit(self, django_capture_on_commit_callbacks):
+        """Test that a role map read during the transaction is dropped when it commits"""
+        company = Company.objects.create(company_name="Test Company")
+        user = User.objects.create_user(email="user@example.com", password="password123", user_name="User")
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                CompanyUsers.objects.create(user=user, company=company)
+                cache.set(f'roles:v1:{user.id}', {'teams': {}, 'companies': {}})
+        assert company.id in get_membership_map(user.id)['companies']
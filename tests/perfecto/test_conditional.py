@@ -0,0 +1,187 @@
+import pytest
+from types import SimpleNamespace
+from django.contrib.messages import constants
+from django.contrib.messages.storage.base import Message
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.http import HttpRequest
+from django.urls import reverse
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from teams.models import Team, TeamUsers
+from reviews.models import Achievement, AchievementScore, PerfReview
+from perfecto import conditional
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def team(company):
+    return Team.objects.create(team_name="Core", company=company)
+
+@pytest.fixture
+def manager(company, team):
+    user = User.objects.create_user(email="manager@example.com", password="password123", user_name="Manager")
+    CompanyUsers.objects.create(user=user, company=company, is_manager=True)
+    TeamUsers.objects.create(user=user, team=team, is_manager=True)
+    return user
+
+@pytest.fixture
+def member(company, team):
+    user = User.objects.create_user(email="member@example.com", password="password123", user_name="Member")
+    CompanyUsers.objects.create(user=user, company=company)
+    TeamUsers.objects.create(user=user, team=team)
+    return user
+
+@pytest.fixture
+def review(member, team, manager):
+    review = PerfReview.objects.create(user=member, team=team)
+    achievement = Achievement.objects.create(perfreview=review, title="Release", self_score=4)
+    achievement.reviewers.add(manager)
+    return review
+
+def revalidate(client, url):
+    etag = client.get(url)['ETag']
+    return client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+@pytest.mark.django_db
+class TestConditionalPages:
+
+    @pytest.fixture
+    def urls(self, company, team, review):
+        return [
+            reverse('company_detail', args=[company.id]),
+            reverse('team_detail', args=[team.id]),
+            reverse('perfreview_detail', args=[review.id]),
+        ]
+
+    def test_unchanged_page_is_not_modified(self, client, manager, urls):
+        """Test that a repeat visit gets an empty 304 with the same validators"""
+        client.force_login(manager)
+        for url in urls:
+            first = client.get(url)
+            response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+            assert first.status_code == 200
+            assert response.status_code == 304
+            assert response.content == b''
+            assert response['ETag'] == first['ETag']
+            assert 'no-cache' in response['Cache-Control']
+            assert 'private' in response['Cache-Control']
+
+    def test_not_modified_skips_rendering(self, client, manager, urls, django_assert_max_num_queries):
+        """Test that a 304 costs only the validator query, without template rendering"""
+        client.force_login(manager)
+        for url in urls:
+            etag = client.get(url)['ETag']
+            with django_assert_max_num_queries(3):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304
+            assert not response.templates
+
+    def test_if_modified_since(self, client, manager, urls):
+        """Test that Last-Modified is sent and honoured"""
+        client.force_login(manager)
+        last_modified = client.get(urls[0])['Last-Modified']
+
+        assert client.get(urls[0], HTTP_IF_MODIFIED_SINCE=last_modified).status_code == 304
+
+    def test_other_viewer_gets_full_page(self, client, manager, member, team):
+        """Test that the ETag depends on who is looking"""
+        url = reverse('team_detail', args=[team.id])
+        client.force_login(manager)
+        etag = client.get(url)['ETag']
+        client.force_login(member)
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_role_change_invalidates(self, client, manager, member, company):
+        """Test that changing a member's role changes the company page version"""
+        url = reverse('company_detail', args=[company.id])
+        client.force_login(manager)
+        etag = client.get(url)['ETag']
+        membership = CompanyUsers.objects.get(user=member, company=company)
+        membership.is_manager = True
+        membership.save()
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_removed_team_invalidates(self, client, manager, company):
+        """Test that a deleted row changes the version even though no edited grew"""
+        extra = Team.objects.create(team_name="Extra", company=company)
+        url = reverse('company_detail', args=[company.id])
+        client.force_login(manager)
+        etag = client.get(url)['ETag']
+        extra.delete()
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_new_review_invalidates_team_page(self, client, manager, member, team):
+        """Test that a new review in the team changes the team page version"""
+        url = reverse('team_detail', args=[team.id])
+        client.force_login(manager)
+        etag = client.get(url)['ETag']
+        PerfReview.objects.create(user=manager, team=team)
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_score_and_reviewer_changes_invalidate_review_page(self, client, manager, member, review):
+        """Test that new scores and reviewer assignments change the review page version"""
+        url = reverse('perfreview_detail', args=[review.id])
+        achievement = review.achievements.get()
+        client.force_login(member)
+        etag = client.get(url)['ETag']
+        AchievementScore.objects.create(achievement=achievement, user=manager, score=5)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+
+        etag = response['ETag']
+        achievement.reviewers.remove(manager)
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_navbar_counts_invalidate(self, client, manager, company):
+        """Test that the viewer's navbar badges are part of the version"""
+        url = reverse('company_detail', args=[company.id])
+        client.force_login(manager)
+        etag = client.get(url)['ETag']
+        CompanyUsers.objects.create(user=manager, company=Company.objects.create(company_name="Second"))
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_profile_edit_shows_after_fragment_timeout(self, client, manager, member, company, settings, monkeypatch):
+        """Test that validators expire with the fragment cache, so renamed users do not stay stale behind 304s"""
+        settings.FRAGMENT_CACHE_TIMEOUT = 600
+        clock = SimpleNamespace(time=lambda: 6000.0)
+        monkeypatch.setattr(conditional, 'time', clock)
+        url = reverse('company_detail', args=[company.id])
+        client.force_login(manager)
+        first = client.get(url)
+        member.user_name = "Renamed"
+        member.save()
+        assert client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+
+        clock.time = lambda: 6600.0
+        response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        assert response.status_code == 200
+        assert response['ETag'] != first['ETag']
+
+    def test_pending_message_forces_render(self, client, manager, company):
+        """Test that a flash message is never hidden behind a 304"""
+        url = reverse('company_detail', args=[company.id])
+        client.force_login(manager)
+        etag = client.get(url)['ETag']
+        storage = CookieStorage(HttpRequest())
+        client.cookies[storage.cookie_name] = storage._encode([Message(constants.SUCCESS, "Готово")])
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert "Готово" in response.content.decode()
+
+    def test_forbidden_is_not_conditional(self, client, company):
+        """Test that outsiders still get 403 and no validators"""
+        outsider = User.objects.create_user(email="outsider@example.com", password="password123")
+        client.force_login(outsider)
+        response = client.get(reverse('company_detail', args=[company.id]))
+
+        assert response.status_code == 403
+        assert not response.has_header('ETag')
@@ -0,0 +1,99 @@
+import pytest
+from django.urls import reverse
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from teams.models import Team, TeamUsers
+from reviews.models import PerfReview
+from reviews.services import launch_team_reviews
+from perfecto.fragments import SCOPE_TEAM, bump_versions, fragment_version
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def team(company):
+    return Team.objects.create(team_name="Core", company=company)
+
+@pytest.fixture
+def manager(company, team):
+    user = User.objects.create_user(email="manager@example.com", password="password123", user_name="Manager")
+    CompanyUsers.objects.create(user=user, company=company, is_manager=True)
+    TeamUsers.objects.create(user=user, team=team, is_manager=True)
+    return user
+
+@pytest.fixture
+def member(company, team):
+    user = User.objects.create_user(email="member@example.com", password="password123", user_name="Member")
+    CompanyUsers.objects.create(user=user, company=company)
+    TeamUsers.objects.create(user=user, team=team)
+    return user
+
+class TestFragmentVersions:
+
+    def test_version_is_stable_until_bumped(self):
+        """Test that the stamp only changes on bump_versions"""
+        version = fragment_version(SCOPE_TEAM, 1)
+
+        assert fragment_version(SCOPE_TEAM, 1) == version
+        assert fragment_version(SCOPE_TEAM, 2) != version
+
+        bump_versions(SCOPE_TEAM, [1])
+        assert fragment_version(SCOPE_TEAM, 1) != version
+
+@pytest.mark.django_db
+class TestFragmentInvalidation:
+
+    def test_membership_signal_bumps_team(self, team, manager):
+        """Test that removing a member invalidates the team fragments"""
+        version = fragment_version(SCOPE_TEAM, team.id)
+        TeamUsers.objects.filter(team=team).get().delete()
+
+        assert fragment_version(SCOPE_TEAM, team.id) != version
+
+    def test_bulk_launch_bumps_team(self, team, manager):
+        """Test that bulk-created reviews, which send no signals, still invalidate the team page"""
+        version = fragment_version(SCOPE_TEAM, team.id)
+        launch_team_reviews(team)
+
+        assert fragment_version(SCOPE_TEAM, team.id) != version
+
+    def test_new_member_appears(self, client, manager, team, company):
+        """Test that a member added after caching shows on the next view"""
+        url = reverse('team_detail', args=[team.id])
+        client.force_login(manager)
+        client.get(url)
+        newcomer = User.objects.create_user(email="new@example.com", password="p", user_name="Newcomer")
+        TeamUsers.objects.create(user=newcomer, team=team)
+
+        assert "Newcomer" in client.get(url).content.decode('utf-8')
+
+    def test_new_team_appears_on_company_page(self, client, manager, company):
+        """Test that a team created after caching shows on the company page"""
+        url = reverse('company_detail', args=[company.id])
+        client.force_login(manager)
+        client.get(url)
+        Team.objects.create(team_name="Platform", company=company)
+
+        assert "Platform" in client.get(url).content.decode('utf-8')
+
+    def test_cached_roster_skips_queries(self, client, manager, member, team, django_assert_max_num_queries):
+        """Test that a warm team page does not load members or reviews"""
+        PerfReview.objects.create(user=member, team=team)
+        url = reverse('team_detail', args=[team.id])
+        client.force_login(manager)
+        client.get(url)
+
+        with django_assert_max_num_queries(4) as captured:
+            client.get(url)
+        assert not any('JOIN "accounts_user"' in query['sql'] for query in captured.captured_queries)
+
+    def test_manager_buttons_are_role_specific(self, client, manager, member, team):
+        """Test that a fragment rendered for a manager is not shown to a member"""
+        url = reverse('team_detail', args=[team.id])
+        button = reverse('perfreview_create_user', kwargs={'team_id': team.id, 'user_id': member.id})
+        client.force_login(manager)
+        assert button in client.get(url).content.decode('utf-8')
+
+        client.force_login(member)
+        assert button not in client.get(url).content.decode('utf-8')
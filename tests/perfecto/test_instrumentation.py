@@ -0,0 +1,103 @@
+import logging
+import re
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from perfecto.instrumentation import QueryBudgetExceeded, RequestMetrics, query_budget
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(email="user@example.com", password="password123", user_name="User")
+
+@pytest.fixture
+def company(user):
+    company = Company.objects.create(company_name="Test Company")
+    CompanyUsers.objects.create(user=user, company=company, is_owner=True, is_manager=True)
+    return company
+
+def run_queries(count, distinct=False):
+    for i in range(count):
+        User.objects.filter(id=i).exists() if distinct else User.objects.exists()
+
+class TestRequestMetrics:
+
+    def test_duplicates_count_repeated_statements(self):
+        """Test that every repeat of an already executed statement counts as a duplicate"""
+        metrics = RequestMetrics()
+        execute = lambda sql, params, many, context: None
+        for sql in ['SELECT 1', 'SELECT 1', 'SELECT 2', 'SELECT 1']:
+            metrics(execute, sql, (), False, {})
+
+        assert metrics.queries == 4
+        assert metrics.duplicates == 2
+        assert 'desc="4 queries, 2 duplicates"' in metrics.server_timing(0.01)
+
+@pytest.mark.django_db
+class TestInstrumentationMiddleware:
+
+    def test_server_timing_header(self, client, user, company, settings):
+        """Test that pages report DB, template and total time in Server-Timing"""
+        settings.SERVER_TIMING = True
+        client.force_login(user)
+
+        response = client.get(reverse('company_detail', kwargs={'company_id': company.id}))
+
+        header = response['Server-Timing']
+        assert re.search(r'db;dur=[\d.]+;desc="\d+ queries, \d+ duplicates"', header)
+        assert re.search(r'tpl;dur=[\d.]+', header)
+        assert re.search(r'total;dur=[\d.]+', header)
+
+    def test_server_timing_can_be_disabled(self, client, settings):
+        """Test that SERVER_TIMING=False drops the header"""
+        settings.SERVER_TIMING = False
+
+        response = client.get(reverse('home'))
+
+        assert 'Server-Timing' not in response
+
+    def test_access_log(self, client, user, company, caplog):
+        """Test that each request is logged with its metrics as structured fields"""
+        client.force_login(user)
+
+        with caplog.at_level(logging.INFO, logger='perfecto.access'):
+            client.get(reverse('company_detail', kwargs={'company_id': company.id}))
+
+        record = [r for r in caplog.records if r.name == 'perfecto.access'][-1]
+        fields = record.request_metrics
+        assert fields['view'] == 'company_detail'
+        assert fields['status'] == 200
+        assert fields['user_id'] == user.id
+        assert fields['queries'] > 0
+        assert fields['query_budget'] == 12
+        assert f"queries={fields['queries']}" in record.getMessage()
+
+@pytest.mark.django_db
+class TestQueryBudget:
+
+    def test_within_budget(self):
+        """Test that a view within its budget responds normally"""
+        view = query_budget(2)(lambda request: run_queries(2) or HttpResponse())
+
+        assert view(RequestFactory().get('/')).status_code == 200
+
+    def test_strict_budget_raises(self, settings):
+        """Test that going over the budget fails under QUERY_BUDGET_STRICT"""
+        settings.QUERY_BUDGET_STRICT = True
+        view = query_budget(2)(lambda request: run_queries(3) or HttpResponse())
+
+        with pytest.raises(QueryBudgetExceeded, match="ran 3 queries, budget is 2"):
+            view(RequestFactory().get('/'))
+
+    def test_lenient_budget_logs(self, settings, caplog):
+        """Test that going over the budget only logs a warning when not strict"""
+        settings.QUERY_BUDGET_STRICT = False
+        view = query_budget(2)(lambda request: run_queries(3, distinct=True) or HttpResponse())
+
+        with caplog.at_level(logging.WARNING, logger='perfecto.instrumentation'):
+            response = view(RequestFactory().get('/'))
+
+        assert response.status_code == 200
+        assert "Query budget exceeded" in caplog.text
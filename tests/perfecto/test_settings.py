@@ -59,3 +59,39 @@ class TestProjectSettings:
         import os
         assert os.path.join(settings.BASE_DIR, 'staticfiles') == settings.STATIC_ROOT
         assert os.path.join(settings.BASE_DIR, 'static') in settings.STATICFILES_DIRS
+
+
+class TestEnvironmentSettings:
+    """Settings derived from DEBUG and the environment."""
+
+    def load(self, monkeypatch, **env):
+        import runpy
+        for name in ('DEBUG', 'CACHE_BACKEND', 'SERVER_TIMING'):
+            monkeypatch.delenv(name, raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        return runpy.run_path(settings.BASE_DIR / 'perfecto' / 'settings.py')
+
+    def test_local_cache_in_debug(self, monkeypatch):
+        loaded = self.load(monkeypatch, DEBUG='True')
+        assert loaded['CACHES']['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache'
+
+    def test_database_cache_by_default_in_production(self, monkeypatch):
+        loaded = self.load(monkeypatch, DEBUG='False')
+        assert loaded['CACHES']['default'] == {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'perfecto_cache'
+        }
+
+    def test_local_cache_rejected_in_production(self, monkeypatch):
+        from django.core.exceptions import ImproperlyConfigured
+        with pytest.raises(ImproperlyConfigured):
+            self.load(monkeypatch, DEBUG='False', CACHE_BACKEND='django.core.cache.backends.locmem.LocMemCache')
+
+    def test_shared_cache_in_production(self, monkeypatch):
+        loaded = self.load(monkeypatch, DEBUG='False', CACHE_BACKEND='django.core.cache.backends.db.DatabaseCache')
+        assert loaded['CACHES']['default']['BACKEND'] == 'django.core.cache.backends.db.DatabaseCache'
+
+    def test_server_timing_follows_debug(self, monkeypatch):
+        assert self.load(monkeypatch, DEBUG='True')['SERVER_TIMING'] is True
+        production = self.load(monkeypatch, DEBUG='False', CACHE_BACKEND='django.core.cache.backends.db.DatabaseCache')
+        assert production['SERVER_TIMING'] is False
@@ -0,0 +1,186 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from accounts.models import User
+from companies.models import Company
+from teams.models import Team
+from reviews.models import (
+    PerfReview, Achievement, AchievementScore, AchievementScoreSummary, ReviewScoreSummary
+)
+
+@pytest.fixture
+def reviewers():
+    return [
+        User.objects.create_user(email=f"reviewer{i}@example.com", password="pass", user_name=f"Reviewer {i}")
+        for i in range(3)
+    ]
+
+@pytest.fixture
+def perfreview():
+    user = User.objects.create_user(email="test@example.com", password="pass", user_name="Test User")
+    company = Company.objects.create(company_name="Test Company")
+    team = Team.objects.create(team_name="Test Team", company=company)
+    return PerfReview.objects.create(user=user, team=team)
+
+@pytest.fixture
+def achievement(perfreview):
+    return Achievement.objects.create(perfreview=perfreview, title="Shipped it", self_score=4)
+
+def summary_of(achievement):
+    return AchievementScoreSummary.objects.get(achievement=achievement)
+
+@pytest.mark.django_db
+class TestIncrementalSummaries:
+
+    def test_new_scores_update_summary(self, achievement, reviewers):
+        """Test that adding scores updates count, total, extremes, mean and gap"""
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[0], score=2)
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[1], score=5)
+
+        summary = summary_of(achievement)
+        assert summary.score_count == 2
+        assert summary.score_total == 7
+        assert (summary.min_score, summary.max_score) == (2, 5)
+        assert summary.mean_score == 3.5
+        assert summary.self_peer_gap == -0.5
+
+    def test_changing_extreme_score_recomputes_min_max(self, achievement, reviewers):
+        """Test that lowering the max score re-reads the extremes"""
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[0], score=3)
+        top = AchievementScore.objects.create(achievement=achievement, user=reviewers[1], score=5)
+
+        top = AchievementScore.objects.get(id=top.id)
+        top.score = 1
+        top.save()
+
+        summary = summary_of(achievement)
+        assert (summary.min_score, summary.max_score) == (1, 3)
+        assert summary.score_total == 4
+        assert summary.score_count == 2
+
+    def test_deleting_score_updates_summary(self, achievement, reviewers):
+        """Test that removing the last score clears the aggregates"""
+        score = AchievementScore.objects.create(achievement=achievement, user=reviewers[0], score=3)
+        score.delete()
+
+        summary = summary_of(achievement)
+        assert summary.score_count == 0
+        assert summary.mean_score is None
+        assert summary.min_score is None
+
+    def test_score_predating_summary_is_rebuilt(self, perfreview, achievement, reviewers):
+        """Test that editing a score scored before summaries existed rebuilds them from raw scores"""
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[0], score=3)
+        score = AchievementScore.objects.create(achievement=achievement, user=reviewers[1], score=4)
+        # Состояние после миграции 0004 без бэкфилла: оценки есть, сводок нет
+        AchievementScoreSummary.objects.all().delete()
+        ReviewScoreSummary.objects.all().delete()
+
+        score.score = 5
+        score.save()
+
+        summary = summary_of(achievement)
+        assert (summary.score_count, summary.score_total) == (2, 8)
+        assert summary.mean_score == 4
+        assert (summary.min_score, summary.max_score) == (3, 5)
+        assert ReviewScoreSummary.objects.get(perfreview=perfreview).score_total == 8
+
+        score.delete()
+        assert (summary_of(achievement).score_count, summary_of(achievement).score_total) == (1, 3)
+
+    def test_review_summary_rolls_up_achievements(self, perfreview, achievement, reviewers):
+        """Test that the review summary aggregates every achievement"""
+        other = Achievement.objects.create(perfreview=perfreview, title="Mentoring", self_score=2)
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[0], score=5)
+        AchievementScore.objects.create(achievement=other, user=reviewers[0], score=3)
+
+        summary = ReviewScoreSummary.objects.get(perfreview=perfreview)
+        assert summary.score_count == 2
+        assert summary.mean_score == 4
+        assert (summary.min_score, summary.max_score) == (3, 5)
+        assert summary.self_peer_gap == 1
+
+    def test_self_score_change_updates_gap(self, achievement, reviewers):
+        """Test that editing the self score refreshes the gap"""
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[0], score=5)
+
+        achievement.self_score = 1
+        achievement.save()
+
+        assert summary_of(achievement).self_peer_gap == 4
+
+    def test_deleting_achievement_cascades_cleanly(self, perfreview, achievement, reviewers):
+        """Test that cascading deletes do not recreate summaries"""
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[0], score=5)
+
+        achievement.delete()
+        perfreview.delete()
+
+        assert AchievementScoreSummary.objects.count() == 0
+        assert ReviewScoreSummary.objects.count() == 0
+
+    def test_deleting_scored_achievement_rolls_up_review(self, perfreview, achievement, reviewers):
+        """Test that the review summary drops a deleted achievement's scores"""
+        other = Achievement.objects.create(perfreview=perfreview, title="Other", self_score=3)
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[0], score=5)
+        AchievementScore.objects.create(achievement=other, user=reviewers[0], score=1)
+
+        achievement.delete()
+
+        summary = ReviewScoreSummary.objects.get(perfreview=perfreview)
+        assert (summary.score_count, summary.score_total) == (1, 1)
+        assert (summary.min_score, summary.max_score) == (1, 1)
+        assert summary.mean_score == 1
+        call_command('rebuild_score_summaries', '--verify-only')
+
+@pytest.mark.django_db
+class TestBackfillMigration:
+
+    def test_backfill_fills_and_repairs_summaries(self, perfreview, achievement, reviewers):
+        """Test that the data migration computes summaries for scores that predate them"""
+        from importlib import import_module
+        from django.apps import apps
+        backfill = import_module('reviews.migrations.0010_backfill_score_summaries').backfill_score_summaries
+        for i, value in enumerate((2, 5)):
+            AchievementScore.objects.create(achievement=achievement, user=reviewers[i], score=value)
+        AchievementScoreSummary.objects.all().delete()
+        ReviewScoreSummary.objects.all().delete()
+
+        backfill(apps, None)
+
+        summary = summary_of(achievement)
+        assert (summary.score_count, summary.score_total, summary.min_score, summary.max_score) == (2, 7, 2, 5)
+        assert summary.self_peer_gap == -0.5
+        assert ReviewScoreSummary.objects.get(perfreview=perfreview).mean_score == 3.5
+
+@pytest.mark.django_db
+class TestRebuildScoreSummariesCommand:
+
+    def test_rebuild_restores_summaries(self, perfreview, achievement, reviewers):
+        """Test that the command rebuilds summaries from raw scores"""
+        for reviewer, value in zip(reviewers, (1, 4, 4)):
+            AchievementScore.objects.create(achievement=achievement, user=reviewer, score=value)
+        AchievementScoreSummary.objects.all().delete()
+        ReviewScoreSummary.objects.all().delete()
+
+        call_command('rebuild_score_summaries')
+
+        summary = summary_of(achievement)
+        assert summary.score_count == 3
+        assert summary.mean_score == 3
+        assert ReviewScoreSummary.objects.get(perfreview=perfreview).score_total == 9
+
+    def test_verify_only_detects_stale_summaries(self, achievement, reviewers):
+        """Test that verification fails when stored summaries drift"""
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[0], score=3)
+        AchievementScoreSummary.objects.update(score_total=99)
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_score_summaries', '--verify-only')
+
+    def test_verify_only_passes_when_consistent(self, achievement, reviewers):
+        """Test that incrementally maintained summaries pass verification"""
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[0], score=3)
+        AchievementScore.objects.create(achievement=achievement, user=reviewers[1], score=4)
+
+        call_command('rebuild_score_summaries', '--verify-only')
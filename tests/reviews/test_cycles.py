@@ -0,0 +1,214 @@
+import pytest
+from datetime import date, timedelta
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from teams.models import Team, TeamUsers
+from reviews.models import PerfReview, ReviewCycle
+from jobs.models import Job
+from notifications.models import Notification
+from jobs.worker import work
+from reviews.cycles import start_cycle, process_cycle_chunk, run_cycle, close_due_cycles
+from reviews.tasks import run_cycle_task
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def manager(company):
+    user = User.objects.create_user(email="manager@example.com", password="pass", user_name="Manager")
+    CompanyUsers.objects.create(user=user, company=company, is_manager=True)
+    return user
+
+@pytest.fixture
+def members(company):
+    users = []
+    for t in range(2):
+        team = Team.objects.create(team_name=f"Team {t}", company=company)
+        for i in range(3):
+            user = User.objects.create_user(
+                email=f"member{t}-{i}@example.com", password="pass", user_name=f"Member {t}-{i}"
+            )
+            TeamUsers.objects.create(user=user, team=team)
+            users.append(user)
+    return users
+
+@pytest.fixture
+def cycle(company, members):
+    return start_cycle(company, "H1", date(2024, 1, 1), date(2024, 6, 30))
+
+@pytest.mark.django_db
+class TestCycleFanOut:
+
+    def test_start_cycle_creates_no_reviews(self, cycle):
+        """Test that starting a cycle only registers it"""
+        assert cycle.status == ReviewCycle.STATUS_PENDING
+        assert cycle.members_total == 6
+        assert PerfReview.objects.count() == 0
+
+    def test_chunks_advance_progress(self, cycle):
+        """Test that each chunk creates its reviews and moves the cursor"""
+        assert process_cycle_chunk(cycle.id, chunk_size=4)
+        cycle.refresh_from_db()
+        assert cycle.status == ReviewCycle.STATUS_RUNNING
+        assert cycle.members_processed == 4
+        assert cycle.progress_percent == 66
+
+        run_cycle(cycle.id, chunk_size=4)
+        cycle.refresh_from_db()
+        assert cycle.status == ReviewCycle.STATUS_DONE
+        assert cycle.reviews_created == 6
+        assert PerfReview.objects.filter(cycle=cycle).count() == 6
+
+    def test_replayed_chunk_creates_no_duplicates(self, cycle):
+        """Test that a chunk re-run after a lost cursor is absorbed by the unique constraint"""
+        process_cycle_chunk(cycle.id, chunk_size=4)
+        ReviewCycle.objects.filter(id=cycle.id).update(last_membership_id=0, members_processed=0)
+
+        run_cycle(cycle.id, chunk_size=4)
+
+        assert PerfReview.objects.filter(cycle=cycle).count() == 6
+
+    def test_replayed_chunk_notifies_once(self, cycle):
+        """Test that a re-run chunk does not notify about reviews it did not create"""
+        process_cycle_chunk(cycle.id, chunk_size=4)
+        ReviewCycle.objects.filter(id=cycle.id).update(last_membership_id=0, members_processed=0)
+
+        run_cycle(cycle.id, chunk_size=4)
+
+        assert Notification.objects.filter(event=Notification.EVENT_REVIEW_LAUNCHED).count() == 6
+
+    def test_member_with_open_review_is_skipped(self, cycle, members):
+        """Test that a member with an open review outside cycles gets no second one"""
+        busy = members[0]
+        team = busy.team_relations.get().team
+        PerfReview.objects.create(user=busy, team=team)
+
+        run_cycle(cycle.id)
+
+        assert PerfReview.objects.filter(cycle=cycle).count() == 5
+        assert not PerfReview.objects.filter(cycle=cycle, user=busy).exists()
+        assert not Notification.objects.filter(recipient=busy).exists()
+
+    def test_close_due_cycles_closes_reviews(self, cycle):
+        """Test that finished cycles past their close date close their reviews"""
+        run_cycle(cycle.id)
+
+        assert close_due_cycles(today=date(2024, 6, 30)) == 0
+        assert close_due_cycles(today=date(2024, 7, 1)) == 1
+        cycle.refresh_from_db()
+        assert cycle.status == ReviewCycle.STATUS_CLOSED
+        assert not PerfReview.objects.filter(cycle=cycle, is_closed=False).exists()
+
+    def test_command_processes_pending_cycles(self, cycle):
+        """Test that the management command fans out every pending cycle and closes due ones"""
+        call_command('process_review_cycles', '--chunk-size', '2')
+
+        cycle.refresh_from_db()
+        assert cycle.status == ReviewCycle.STATUS_CLOSED
+        assert PerfReview.objects.filter(cycle=cycle).count() == 6
+
+    def test_future_cycle_waits_for_start_date(self, company, members):
+        """Test that a cycle whose start date has not come creates no reviews, even from the command"""
+        future = start_cycle(company, "Next", timezone.localdate() + timedelta(days=14), timezone.localdate() + timedelta(days=60))
+
+        assert not process_cycle_chunk(future.id)
+        call_command('process_review_cycles')
+
+        future.refresh_from_db()
+        assert future.status == ReviewCycle.STATUS_PENDING
+        assert not PerfReview.objects.exists()
+
+    def test_early_run_is_rescheduled(self, company, members):
+        """Test that a launch job run before the start date is queued again for that date"""
+        starts_on = timezone.localdate() + timedelta(days=14)
+        future = start_cycle(company, "Next", starts_on, starts_on + timedelta(days=30))
+
+        run_cycle_task(cycle_id=future.id)
+
+        job = Job.objects.get(task='reviews.run_cycle')
+        assert timezone.localtime(job.run_at).date() == starts_on
+        assert not PerfReview.objects.exists()
+
+@pytest.mark.django_db
+class TestCycleViews:
+
+    def test_manager_starts_cycle(self, client, company, manager, members):
+        """Test that a company manager can register a cycle"""
+        client.force_login(manager)
+        response = client.post(reverse('review_cycle_create', kwargs={'company_id': company.id}), {
+            'name': 'H2',
+            'starts_on': '2024-07-01',
+            'closes_on': '2024-12-31',
+        })
+
+        cycle = ReviewCycle.objects.get()
+        assert response.status_code == 302
+        assert response.url == reverse('review_cycle_detail', kwargs={'cycle_id': cycle.id})
+        assert cycle.created_by == manager
+        assert PerfReview.objects.count() == 0
+
+    def test_started_cycle_is_run_by_worker(self, client, company, manager, members):
+        """Test that launching a cycle queues a job that fans it out in the worker"""
+        client.force_login(manager)
+        client.post(reverse('review_cycle_create', kwargs={'company_id': company.id}), {
+            'name': 'H2',
+            'starts_on': '2024-07-01',
+            'closes_on': '2024-12-31',
+        })
+
+        assert Job.objects.get().task == 'reviews.run_cycle'
+        work('test', burst=True)
+
+        assert PerfReview.objects.count() == len(members)
+        assert ReviewCycle.objects.get().status == ReviewCycle.STATUS_DONE
+
+    def test_future_cycle_is_scheduled_for_start_date(self, client, company, manager, members):
+        """Test that a cycle starting later is queued for its start date instead of right away"""
+        starts_on = timezone.localdate() + timedelta(days=21)
+        client.force_login(manager)
+        client.post(reverse('review_cycle_create', kwargs={'company_id': company.id}), {
+            'name': 'Next',
+            'starts_on': starts_on.isoformat(),
+            'closes_on': (starts_on + timedelta(days=30)).isoformat(),
+        })
+
+        job = Job.objects.get()
+        assert timezone.localtime(job.run_at).date() == starts_on
+        work('test', burst=True)
+        assert not PerfReview.objects.exists()
+
+    def test_close_date_before_start_is_rejected(self, client, company, manager):
+        """Test that a cycle cannot close before it starts"""
+        client.force_login(manager)
+        response = client.post(reverse('review_cycle_create', kwargs={'company_id': company.id}), {
+            'name': 'H2',
+            'starts_on': '2024-07-01',
+            'closes_on': '2024-06-01',
+        })
+
+        assert response.status_code == 200
+        assert 'closes_on' in response.context['form'].errors
+        assert not ReviewCycle.objects.exists()
+
+    def test_member_cannot_start_cycle(self, client, company, members):
+        """Test that plain members are forbidden from starting cycles"""
+        client.force_login(members[0])
+        response = client.get(reverse('review_cycle_create', kwargs={'company_id': company.id}))
+
+        assert response.status_code == 403
+
+    def test_htmx_progress_partial(self, client, manager, cycle):
+        """Test that HTMX polling gets the progress fragment only"""
+        client.force_login(manager)
+        response = client.get(
+            reverse('review_cycle_detail', kwargs={'cycle_id': cycle.id}),
+            HTTP_HX_REQUEST='true'
+        )
+
+        assert response.status_code == 200
+        assert b'<html' not in response.content
+        assert b'hx-trigger="every 2s"' in response.content
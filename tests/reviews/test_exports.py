@@ -0,0 +1,112 @@
+import csv
+import io
+import json
+import pytest
+from django.urls import reverse
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from teams.models import Team, TeamUsers
+from reviews.models import PerfReview, Achievement, AchievementScore
+from reviews.exports import EXPORT_HEADER, export_rows
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def team(company):
+    return Team.objects.create(team_name="Test Team", company=company)
+
+@pytest.fixture
+def manager(team):
+    user = User.objects.create_user(email="manager@example.com", password="pass", user_name="Manager")
+    TeamUsers.objects.create(user=user, team=team, is_manager=True)
+    return user
+
+@pytest.fixture
+def review(team):
+    user = User.objects.create_user(email="member@example.com", password="pass", user_name="Участник")
+    review = PerfReview.objects.create(user=user, team=team)
+    scored = Achievement.objects.create(perfreview=review, title="Запустил релиз", self_score=4)
+    Achievement.objects.create(perfreview=review, title="Unscored", self_score=2)
+    for i, value in enumerate((3, 5)):
+        reviewer = User.objects.create_user(email=f"rev{i}@example.com", password="pass", user_name=f"Rev {i}")
+        AchievementScore.objects.create(achievement=scored, user=reviewer, score=value, comment="ok")
+    return review
+
+def read_body(response):
+    return b''.join(response.streaming_content).decode()
+
+@pytest.mark.django_db
+class TestExportRows:
+
+    def test_one_row_per_score_and_unscored_achievement(self, team, review):
+        """Test that scored achievements expand per score and unscored ones appear once"""
+        rows = list(export_rows(team_id=team.id))
+
+        assert len(rows) == 3
+        assert [row['score'] for row in rows] == [3, 5, None]
+        assert rows[0]['employee_email'] == "member@example.com"
+
+    def test_review_without_achievements(self, team, review):
+        """Test that a review with no achievements is exported as one row with empty achievement columns"""
+        user = User.objects.create_user(email="empty@example.com", password="pass", user_name="Empty")
+        empty = PerfReview.objects.create(user=user, team=team)
+
+        rows = [row for row in export_rows(team_id=team.id) if row['review_id'] == empty.id]
+
+        assert len(rows) == 1
+        assert rows[0]['employee_email'] == "empty@example.com"
+        assert rows[0]['achievement_id'] is None
+        assert rows[0]['score'] is None
+
+    def test_scope_excludes_other_companies(self, review):
+        """Test that a company export contains only that company's rows"""
+        other = Company.objects.create(company_name="Other")
+
+        assert list(export_rows(company_id=other.id)) == []
+
+    def test_query_count_is_constant(self, team, review, django_assert_num_queries):
+        """Test that the export reads related data through joins, not per-row queries"""
+        with django_assert_num_queries(1):
+            list(export_rows(team_id=team.id))
+
+@pytest.mark.django_db
+class TestExportViews:
+
+    def test_team_csv_export(self, client, team, manager, review):
+        """Test that managers get a streamed CSV with a header row"""
+        client.force_login(manager)
+        response = client.get(reverse('review_export_team', kwargs={'team_id': team.id}))
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'].startswith('text/csv')
+        rows = list(csv.reader(io.StringIO(read_body(response))))
+        assert rows[0] == EXPORT_HEADER
+        assert len(rows) == 4
+        assert "Запустил релиз" in rows[1]
+
+    def test_company_jsonl_export(self, client, company, review):
+        """Test that company managers can export JSONL"""
+        user = User.objects.create_user(email="boss@example.com", password="pass", user_name="Boss")
+        CompanyUsers.objects.create(user=user, company=company, is_manager=True)
+        client.force_login(user)
+
+        response = client.get(
+            reverse('review_export_company', kwargs={'company_id': company.id}), {'format': 'jsonl'}
+        )
+
+        lines = [json.loads(line) for line in read_body(response).splitlines()]
+        assert response['Content-Disposition'].endswith('.jsonl"')
+        assert len(lines) == 3
+        assert lines[0]['team'] == "Test Team"
+
+    def test_member_cannot_export(self, client, team, review):
+        """Test that plain members are forbidden from exporting"""
+        client.force_login(review.user)
+        TeamUsers.objects.create(user=review.user, team=team)
+
+        response = client.get(reverse('review_export_team', kwargs={'team_id': team.id}))
+
+        assert response.status_code == 403
@@ -1,5 +1,5 @@
 import pytest
-from django.forms import CheckboxSelectMultiple
+from accounts.widgets import UserPickerMultipleWidget
 from accounts.models import User
 from teams.models import Team
 from companies.models import Company, CompanyUsers
@@ -69,8 +69,9 @@ class TestAchievementForm:
         assert 'self_score' in form.fields
         assert 'reviewers' in form.fields
         
-        # Check that reviewers field is a multiple choice field with checkbox widget
-        assert isinstance(form.fields['reviewers'].widget, CheckboxSelectMultiple)
+        # Check that reviewers field uses the typeahead picker scoped to the company
+        assert isinstance(form.fields['reviewers'].widget, UserPickerMultipleWidget)
+        assert form.fields['reviewers'].widget.company_id == team.company_id
         
         # Check that the queryset includes users from the company
         reviewers_queryset = form.fields['reviewers'].queryset
@@ -0,0 +1,200 @@
+import io
+import json
+import pytest
+from datetime import date
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from teams.models import Team, TeamUsers
+from reviews.models import PerfReview, Achievement, PendingScore
+from reviews.cycles import start_cycle, run_cycle
+from reviews.exports import FORMAT_CSV, FORMAT_JSONL
+from reviews.imports import import_achievements, read_rows
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def team(company):
+    return Team.objects.create(team_name="Test Team", company=company)
+
+@pytest.fixture
+def employee(company, team):
+    user = User.objects.create_user(email="employee@example.com", password="pass", user_name="Employee")
+    CompanyUsers.objects.create(user=user, company=company)
+    TeamUsers.objects.create(user=user, team=team)
+    return user
+
+@pytest.fixture
+def reviewers(company):
+    users = []
+    for i in range(2):
+        user = User.objects.create_user(email=f"rev{i}@example.com", password="pass", user_name=f"Rev {i}")
+        CompanyUsers.objects.create(user=user, company=company)
+        users.append(user)
+    return users
+
+@pytest.fixture
+def review(employee, team):
+    return PerfReview.objects.create(user=employee, team=team)
+
+CSV_DATA = (
+    "title,self_score,reviewers\n"
+    "Запустил релиз,4,rev0@example.com;rev1@example.com\n"
+    ",3,\n"
+    "Menthored,9,\n"
+    "Hired,5,stranger@example.com\n"
+    "\"Multi\nline\",2,rev1@example.com\n"
+)
+
+@pytest.mark.django_db
+class TestImportAchievements:
+
+    def test_valid_rows_created_and_errors_reported(self, review, reviewers):
+        """Test that valid rows are saved and each bad row gets a line-level error"""
+        result = import_achievements(read_rows(io.StringIO(CSV_DATA), FORMAT_CSV), review=review)
+
+        assert result.created == 2
+        assert [line for line, _ in result.errors] == [3, 4, 5]
+        released = Achievement.objects.get(title="Запустил релиз")
+        assert set(released.reviewers.all()) == set(reviewers)
+        assert Achievement.objects.filter(title="Multi\nline").exists()
+
+    def test_imported_reviewers_get_pending_scores(self, review, reviewers):
+        """Test that bulk-created reviewer links are queued in the inbox"""
+        import_achievements(read_rows(io.StringIO(CSV_DATA), FORMAT_CSV), review=review)
+
+        assert PendingScore.objects.filter(user=reviewers[0]).count() == 1
+        assert PendingScore.objects.filter(user=reviewers[1]).count() == 2
+
+    def test_reviewers_outside_company_rejected(self, review):
+        """Test that emails of users from other companies do not resolve"""
+        User.objects.create_user(email="outsider@example.com", password="pass", user_name="Outsider")
+        rows = [(1, {'title': 'Work', 'self_score': 3, 'reviewers': ['outsider@example.com']})]
+
+        result = import_achievements(rows, review=review)
+
+        assert result.created == 0
+        assert "outsider@example.com" in result.errors[0][1]
+
+    def test_emails_match_case_insensitively(self, company, employee, reviewers):
+        """Test that reviewer and employee emails resolve regardless of letter case"""
+        cycle = start_cycle(company, "H1", date(2024, 1, 1), date(2024, 6, 30))
+        run_cycle(cycle.id)
+        rows = [(1, {'employee_email': 'Employee@Example.com', 'title': 'Work', 'self_score': 4, 'reviewers': 'REV0@example.com'})]
+
+        result = import_achievements(rows, cycle=cycle)
+
+        assert result.errors == []
+        assert list(Achievement.objects.get().reviewers.all()) == [reviewers[0]]
+
+    def test_fractional_score_rejected(self, review):
+        """Test that a fractional self score is an error instead of being truncated"""
+        rows = [
+            (1, {'title': 'Work', 'self_score': '3.7'}),
+            (2, {'title': 'Work', 'self_score': 3.7}),
+            (3, {'title': 'Work', 'self_score': ' 4 '}),
+        ]
+
+        result = import_achievements(rows, review=review)
+
+        assert result.created == 1
+        assert [line for line, _ in result.errors] == [1, 2]
+        assert Achievement.objects.get().self_score == 4
+
+    def test_query_count_does_not_grow_with_rows(self, review, reviewers, django_assert_max_num_queries):
+        """Test that a chunk costs a fixed number of queries"""
+        rows = [
+            (i, {'title': f'Work {i}', 'self_score': 3, 'reviewers': 'rev0@example.com rev1@example.com'})
+            for i in range(200)
+        ]
+        # 12 на импорт и 5 на запись уведомлений ревьюерам с постановкой дайджеста
+        with django_assert_max_num_queries(17):
+            result = import_achievements(rows, review=review)
+
+        assert result.created == 200
+
+    def test_jsonl_into_cycle(self, company, employee, reviewers):
+        """Test that cycle imports route rows to the employee's review"""
+        cycle = start_cycle(company, "H1", date(2024, 1, 1), date(2024, 6, 30))
+        run_cycle(cycle.id)
+        lines = [
+            json.dumps({'employee_email': 'employee@example.com', 'title': 'Work', 'self_score': 5}),
+            json.dumps({'employee_email': 'nobody@example.com', 'title': 'Work', 'self_score': 5}),
+            '{broken',
+        ]
+
+        result = import_achievements(read_rows(lines, FORMAT_JSONL), cycle=cycle)
+
+        assert result.created == 1
+        assert Achievement.objects.get().perfreview.user == employee
+        assert [line for line, _ in result.errors] == [2, 3]
+
+@pytest.mark.django_db
+class TestImportEntryPoints:
+
+    def test_upload_view(self, client, employee, review, reviewers):
+        """Test that the review subject can upload a file"""
+        client.force_login(employee)
+        upload = SimpleUploadedFile("achievements.csv", CSV_DATA.encode('utf-8-sig'))
+
+        response = client.post(reverse('achievement_import', kwargs={'review_id': review.id}), {'file': upload})
+
+        assert response.status_code == 200
+        assert response.context['result'].created == 2
+        assert len(response.context['result'].errors) == 3
+
+    def test_upload_in_wrong_encoding_reports_error(self, client, employee, review, reviewers):
+        """Test that a non-UTF-8 file keeps the rows read so far and reports the rest"""
+        client.force_login(employee)
+        data = "title,self_score,reviewers\nShipped,4,\nЗапустил релиз,4,\n".encode('cp1251')
+        upload = SimpleUploadedFile("achievements.csv", data)
+
+        response = client.post(reverse('achievement_import', kwargs={'review_id': review.id}), {'file': upload})
+
+        assert response.status_code == 200
+        result = response.context['result']
+        assert result.created == 1
+        assert result.errors[0][0] == 3
+        assert "UTF-8" in result.errors[0][1]
+
+    def test_broken_csv_reports_error(self, review, reviewers):
+        """Test that csv.Error (an oversized field) becomes a line error"""
+        lines = ["title,self_score,reviewers\n", "Shipped,4,\n", "x" * 200000 + ",4,\n"]
+
+        result = import_achievements(read_rows(lines, FORMAT_CSV), review=review)
+
+        assert result.created == 1
+        assert result.errors[0][0] == 3
+        assert "CSV" in result.errors[0][1]
+
+    def test_outsider_cannot_upload(self, client, review, reviewers):
+        """Test that users who cannot edit the review are forbidden"""
+        client.force_login(reviewers[0])
+
+        response = client.get(reverse('achievement_import', kwargs={'review_id': review.id}))
+
+        assert response.status_code == 403
+
+    def test_command(self, tmp_path, review, reviewers):
+        """Test that the management command imports a file into a review"""
+        path = tmp_path / "achievements.csv"
+        path.write_text(CSV_DATA, encoding='utf-8')
+        out = io.StringIO()
+
+        call_command('import_achievements', str(path), '--review', str(review.id), stdout=out, stderr=io.StringIO())
+
+        assert "Created 2 achievements, 3 row(s) rejected" in out.getvalue()
+
+    def test_command_reports_wrong_encoding(self, tmp_path, review, reviewers):
+        """Test that the command reports a non-UTF-8 file instead of crashing"""
+        path = tmp_path / "achievements.csv"
+        path.write_bytes("title,self_score,reviewers\nЗапустил релиз,4,\n".encode('cp1251'))
+        err = io.StringIO()
+
+        call_command('import_achievements', str(path), '--review', str(review.id), stdout=io.StringIO(), stderr=err)
+
+        assert "UTF-8" in err.getvalue()
@@ -0,0 +1,113 @@
+import pytest
+from django.urls import reverse
+from accounts.models import User
+from companies.models import Company
+from teams.models import Team
+from reviews.models import PerfReview, Achievement, AchievementScore, PendingScore
+from reviews.inbox import pending_count
+
+@pytest.fixture
+def reviewer():
+    return User.objects.create_user(email="reviewer@example.com", password="pass", user_name="Reviewer")
+
+@pytest.fixture
+def perfreview():
+    user = User.objects.create_user(email="test@example.com", password="pass", user_name="Test User")
+    company = Company.objects.create(company_name="Test Company")
+    team = Team.objects.create(team_name="Test Team", company=company)
+    return PerfReview.objects.create(user=user, team=team)
+
+@pytest.fixture
+def achievement(perfreview):
+    return Achievement.objects.create(perfreview=perfreview, title="Shipped it", self_score=4)
+
+@pytest.mark.django_db
+class TestPendingScoreSync:
+
+    def test_assigning_reviewers_fills_inbox(self, achievement, reviewer):
+        """Test that reviewers.set() queues the achievement for each reviewer"""
+        achievement.reviewers.set([reviewer])
+
+        assert PendingScore.objects.filter(user=reviewer, achievement=achievement).exists()
+        assert pending_count(reviewer.id) == 1
+
+    def test_reverse_assignment_fills_inbox(self, achievement, reviewer):
+        """Test that assigning from the user side is tracked too"""
+        reviewer.reviewing_achievements.add(achievement)
+
+        assert pending_count(reviewer.id) == 1
+
+    def test_scoring_empties_inbox(self, achievement, reviewer):
+        """Test that saving a score removes the pending entry"""
+        achievement.reviewers.add(reviewer)
+        assert pending_count(reviewer.id) == 1
+
+        AchievementScore.objects.create(achievement=achievement, user=reviewer, score=4)
+
+        assert pending_count(reviewer.id) == 0
+
+    def test_deleting_score_requeues(self, achievement, reviewer):
+        """Test that deleting a score puts the achievement back in the inbox"""
+        achievement.reviewers.add(reviewer)
+        score = AchievementScore.objects.create(achievement=achievement, user=reviewer, score=4)
+
+        score.delete()
+
+        assert pending_count(reviewer.id) == 1
+
+    def test_unassigning_and_clearing(self, perfreview, achievement, reviewer):
+        """Test that removing or clearing reviewers drops inbox entries"""
+        other = Achievement.objects.create(perfreview=perfreview, title="Other", self_score=3)
+        achievement.reviewers.add(reviewer)
+        other.reviewers.add(reviewer)
+
+        achievement.reviewers.remove(reviewer)
+        assert pending_count(reviewer.id) == 1
+
+        other.reviewers.clear()
+        assert pending_count(reviewer.id) == 0
+
+    def test_already_scored_is_not_queued(self, achievement, reviewer):
+        """Test that re-assigning a reviewer who already scored adds nothing"""
+        AchievementScore.objects.create(achievement=achievement, user=reviewer, score=4)
+
+        achievement.reviewers.add(reviewer)
+
+        assert pending_count(reviewer.id) == 0
+
+    def test_deleting_review_cascades(self, perfreview, achievement, reviewer):
+        """Test that deleting a scored review leaves no inbox rows behind"""
+        achievement.reviewers.add(reviewer)
+        AchievementScore.objects.create(achievement=achievement, user=reviewer, score=4)
+
+        perfreview.delete()
+
+        assert PendingScore.objects.count() == 0
+
+@pytest.mark.django_db
+class TestReviewInboxView:
+
+    def test_inbox_lists_pending_achievements(self, client, achievement, reviewer):
+        """Test that the inbox page shows what the reviewer still owes"""
+        achievement.reviewers.add(reviewer)
+        client.force_login(reviewer)
+
+        response = client.get(reverse('review_inbox'))
+
+        assert response.status_code == 200
+        assert [p.achievement for p in response.context['page']] == [achievement]
+
+    def test_navbar_badge_shows_pending_count(self, client, achievement, reviewer):
+        """Test that the navbar badge shows the pending count"""
+        achievement.reviewers.add(reviewer)
+        client.force_login(reviewer)
+
+        response = client.get(reverse('dashboard'))
+
+        assert 'bg-warning text-dark ms-1">1<' in response.content.decode('utf-8')
+
+    def test_inbox_requires_login(self, client):
+        """Test that anonymous users are redirected to login"""
+        response = client.get(reverse('review_inbox'))
+
+        assert response.status_code == 302
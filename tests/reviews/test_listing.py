@@ -0,0 +1,128 @@
+import pytest
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from companies.models import Company
+from teams.models import Team, TeamUsers
+from reviews.models import PerfReview, Achievement
+from reviews.listing import review_page, TAB_MY, TAB_REVIEWING, TAB_TEAM
+from perfecto.keyset import decode_cursor, encode_cursor
+
+@pytest.fixture
+def manager():
+    return User.objects.create_user(email="manager@example.com", password="pass", user_name="Manager")
+
+@pytest.fixture
+def team(manager):
+    company = Company.objects.create(company_name="Test Company")
+    team = Team.objects.create(team_name="Test Team", company=company)
+    TeamUsers.objects.create(user=manager, team=team, is_manager=True)
+    return team
+
+def make_reviews(team, count, reviewer=None):
+    base = timezone.now()
+    reviews = []
+    for i in range(count):
+        member = User.objects.create_user(
+            email=f"member{team.id}-{PerfReview.objects.count()}@example.com", password="pass", user_name="Member"
+        )
+        review = PerfReview.objects.create(user=member, team=team)
+        # Одинаковые created у пар отзывов проверяют tie-break по id
+        PerfReview.objects.filter(id=review.id).update(created=base - timedelta(minutes=i // 2))
+        achievement = Achievement.objects.create(perfreview=review, title="Work", self_score=3)
+        if reviewer:
+            achievement.reviewers.add(reviewer)
+        reviews.append(review)
+    return reviews
+
+@pytest.mark.django_db
+class TestReviewPage:
+
+    def test_keyset_pages_cover_all_rows_once(self, manager, team):
+        """Test that following cursors yields every review exactly once in order"""
+        reviews = make_reviews(team, 7)
+        seen = []
+        cursor = None
+        while True:
+            page = review_page(TAB_TEAM, manager, cursor=cursor, page_size=3)
+            seen.extend(review.id for review in page)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(r.id for r in reviews)
+        assert len(seen) == len(set(seen))
+
+    def test_rows_are_annotated(self, manager, team):
+        """Test that rows carry the achievement count without extra queries"""
+        make_reviews(team, 2)
+        page = review_page(TAB_TEAM, manager)
+
+        assert [review.achievement_count for review in page] == [1, 1]
+
+    def test_reviewing_tab_has_no_duplicates(self, manager, team):
+        """Test that reviews with several assigned achievements appear once"""
+        reviewer = User.objects.create_user(email="rev@example.com", password="pass", user_name="Rev")
+        review = make_reviews(team, 1, reviewer=reviewer)[0]
+        extra = Achievement.objects.create(perfreview=review, title="More", self_score=4)
+        extra.reviewers.add(reviewer)
+
+        page = review_page(TAB_REVIEWING, reviewer)
+
+        assert [r.id for r in page] == [review.id]
+
+    def test_malformed_cursor_starts_from_first_page(self, manager):
+        """Test that a broken cursor is ignored"""
+        assert decode_cursor('not-a-cursor', 2) is None
+        assert len(review_page(TAB_MY, manager, cursor='not-a-cursor')) == 0
+
+    def test_tampered_cursor_starts_from_first_page(self, client, manager, team):
+        """Test that a well-formed cursor with values of the wrong type does not fail the page"""
+        make_reviews(team, 3)
+        cursor = encode_cursor(["garbage", 1])
+
+        assert [r.id for r in review_page(TAB_TEAM, manager, cursor=cursor)] == [r.id for r in review_page(TAB_TEAM, manager)]
+        client.force_login(manager)
+        response = client.get(reverse('perfreview_list'), {'tab': TAB_MY, 'cursor': cursor}, HTTP_HX_REQUEST='true')
+        assert response.status_code == 200
+
+@pytest.mark.django_db
+class TestPerfReviewListQueries:
+
+    def _count(self, client):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse('perfreview_list'))
+        assert response.status_code == 200
+        return len(ctx.captured_queries)
+
+    def test_query_count_independent_of_list_size(self, client, manager, team):
+        """Test that the list page runs the same number of queries for any number of reviews"""
+        client.force_login(manager)
+        make_reviews(team, 2, reviewer=manager)
+        self._count(client)  # warm up the role cache
+        small = self._count(client)
+
+        make_reviews(team, 30, reviewer=manager)
+        self._count(client)  # new assignments invalidated the cached inbox counter
+        large = self._count(client)
+
+        assert small == large
+
+    def test_htmx_load_more_renders_next_page(self, client, manager, team):
+        """Test that HTMX requests get only the rows of the next page"""
+        make_reviews(team, 30)
+        client.force_login(manager)
+        first = review_page(TAB_TEAM, manager)
+
+        response = client.get(
+            reverse('perfreview_list'),
+            {'tab': TAB_TEAM, 'cursor': first.next_cursor},
+            HTTP_HX_REQUEST='true'
+        )
+
+        assert response.status_code == 200
+        assert len(response.context['page']) == 5
+        assert b'<html' not in response.content
@@ -0,0 +1,137 @@
+import pytest
+from django.urls import reverse
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from teams.models import Team, TeamUsers
+from reviews.models import PerfReview, Achievement, AchievementScore
+from reviews.search import search_page
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def team(company):
+    return Team.objects.create(team_name="Test Team", company=company)
+
+@pytest.fixture
+def employee(team):
+    user = User.objects.create_user(email="employee@example.com", password="pass", user_name="Employee")
+    TeamUsers.objects.create(user=user, team=team)
+    return user
+
+@pytest.fixture
+def reviewer():
+    return User.objects.create_user(email="reviewer@example.com", password="pass", user_name="Reviewer")
+
+@pytest.fixture
+def review(employee, team):
+    return PerfReview.objects.create(user=employee, team=team)
+
+@pytest.fixture
+def achievement(review, reviewer):
+    achievement = Achievement.objects.create(perfreview=review, title="Migrated billing to Postgres", self_score=4)
+    achievement.reviewers.add(reviewer)
+    return achievement
+
+def hit_titles(page):
+    return [(hit.kind, hit.achievement.title) for hit in page]
+
+@pytest.mark.django_db
+class TestSearch:
+
+    def test_finds_achievement_titles_and_comments(self, employee, reviewer, achievement):
+        """Test that both titles and score comments are searchable"""
+        AchievementScore.objects.create(
+            achievement=achievement, user=reviewer, score=5, comment="Great billing rollout"
+        )
+
+        page = search_page(employee, "billing")
+
+        assert sorted(hit.kind for hit in page) == ['achievement', 'comment']
+        assert all(hit.achievement == achievement for hit in page)
+
+    def test_prefix_and_cyrillic_words(self, employee, review):
+        """Test that words match by prefix, including Cyrillic text"""
+        Achievement.objects.create(perfreview=review, title="Оптимизировал запросы к базе", self_score=3)
+
+        assert len(search_page(employee, "запрос")) == 1
+
+    def test_index_follows_updates_and_deletes(self, employee, achievement):
+        """Test that edited and deleted rows are reindexed"""
+        achievement.title = "Rewrote onboarding"
+        achievement.save()
+        assert len(search_page(employee, "billing")) == 0
+        assert len(search_page(employee, "onboarding")) == 1
+
+        achievement.delete()
+        assert len(search_page(employee, "onboarding")) == 0
+
+    def test_bulk_created_rows_are_indexed(self, employee, review):
+        """Test that rows written with bulk_create are searchable too"""
+        Achievement.objects.bulk_create([
+            Achievement(perfreview=review, title=f"Bulk item {i}", self_score=3) for i in range(3)
+        ])
+
+        assert len(search_page(employee, "bulk")) == 3
+
+    def test_results_scoped_by_permissions(self, company, achievement, reviewer):
+        """Test that outsiders see nothing and reviewers and managers see the review"""
+        outsider = User.objects.create_user(email="out@example.com", password="pass", user_name="Out")
+        manager = User.objects.create_user(email="boss@example.com", password="pass", user_name="Boss")
+        CompanyUsers.objects.create(user=manager, company=company, is_manager=True)
+
+        assert len(search_page(outsider, "billing")) == 0
+        assert len(search_page(reviewer, "billing")) == 1
+        assert len(search_page(manager, "billing")) == 1
+
+    def test_better_match_ranks_first(self, employee, review):
+        """Test that results are ordered by relevance"""
+        Achievement.objects.create(perfreview=review, title="Cache warmup for the cache layer cache", self_score=3)
+        Achievement.objects.create(
+            perfreview=review, title="Long text about many things, with one mention of cache somewhere", self_score=3
+        )
+
+        page = search_page(employee, "cache")
+
+        assert page[0].achievement.title.startswith("Cache warmup")
+
+    def test_pagination_and_query_count(self, employee, review, django_assert_max_num_queries):
+        """Test that pages are bounded and cost a fixed number of queries"""
+        Achievement.objects.bulk_create([
+            Achievement(perfreview=review, title=f"Release {i}", self_score=3) for i in range(25)
+        ])
+
+        with django_assert_max_num_queries(6):
+            first = search_page(employee, "release", page_size=10)
+            hits = list(first)
+
+        assert len(hits) == 10
+        assert first.paginator.count == 25
+        assert len(search_page(employee, "release", page_number=3, page_size=10)) == 5
+
+    def test_operators_in_input_are_harmless(self, employee, achievement):
+        """Test that FTS syntax characters in user input do not raise"""
+        assert len(search_page(employee, 'billing" (')) == 1
+        assert len(search_page(employee, '"*')) == 0
+
+@pytest.mark.django_db
+class TestSearchView:
+
+    def test_search_page_renders_hits(self, client, employee, achievement):
+        """Test that the search page lists matching achievements"""
+        client.force_login(employee)
+
+        response = client.get(reverse('review_search'), {'q': 'billing'})
+
+        assert response.status_code == 200
+        assert b"Migrated billing to Postgres" in response.content
+
+    def test_htmx_request_gets_results_fragment(self, client, employee, achievement):
+        """Test that HTMX requests render only the results"""
+        client.force_login(employee)
+
+        response = client.get(reverse('review_search'), {'q': 'billing'}, HTTP_HX_REQUEST='true')
+
+        assert b'<html' not in response.content
+        assert b"Migrated billing" in response.content
@@ -0,0 +1,61 @@
+import pytest
+from accounts.models import User
+from companies.models import Company
+from teams.models import Team, TeamUsers
+from reviews.models import PerfReview
+from reviews.services import launch_team_reviews
+
+@pytest.fixture
+def company():
+    return Company.objects.create(company_name="Test Company")
+
+@pytest.fixture
+def team(company):
+    return Team.objects.create(team_name="Test Team", company=company)
+
+@pytest.fixture
+def members(team):
+    users = []
+    for i in range(5):
+        user = User.objects.create_user(
+            email=f"member{i}@example.com",
+            password="password123",
+            user_name=f"Member {i}"
+        )
+        TeamUsers.objects.create(user=user, team=team)
+        users.append(user)
+    return users
+
+@pytest.mark.django_db
+class TestLaunchTeamReviews:
+
+    def test_creates_review_for_every_member(self, team, members):
+        """Test that one review is created per team member"""
+        summary = launch_team_reviews(team)
+
+        assert summary == {'members': 5, 'created': 5, 'skipped': 0}
+        assert PerfReview.objects.filter(team=team).count() == 5
+
+    def test_repeated_launch_is_idempotent(self, team, members):
+        """Test that a second launch skips members with open reviews"""
+        launch_team_reviews(team)
+        summary = launch_team_reviews(team)
+
+        assert summary == {'members': 5, 'created': 0, 'skipped': 5}
+        assert PerfReview.objects.filter(team=team).count() == 5
+
+    def test_closed_reviews_do_not_block_launch(self, team, members):
+        """Test that members whose reviews are closed get a new one"""
+        launch_team_reviews(team)
+        PerfReview.objects.filter(user=members[0]).update(is_closed=True)
+
+        summary = launch_team_reviews(team)
+
+        assert summary['created'] == 1
+        assert PerfReview.objects.filter(user=members[0], team=team).count() == 2
+
+    def test_query_count_does_not_grow_with_team(self, team, members, django_assert_max_num_queries):
+        """Test that launch cost stays flat regardless of team size"""
+        # 8 на создание ревью и 5 на уведомления сотрудникам с постановкой дайджеста
+        with django_assert_max_num_queries(13):
+            launch_team_reviews(team)
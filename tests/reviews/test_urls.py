@@ -5,7 +5,16 @@ from reviews.views import (
     perfreviews_create,
     perfreview_detail,
     achievement_create,
-    achievement_score
+    achievement_score,
+    achievement_score_batch,
+    review_inbox,
+    review_cycle_create,
+    review_cycle_detail,
+    review_export_team,
+    review_export_company,
+    achievement_import,
+    review_cycle_import,
+    review_search
 )
 
 class TestReviewUrls(SimpleTestCase):
@@ -33,3 +42,39 @@ class TestReviewUrls(SimpleTestCase):
     def test_achievement_score_url(self):
         url = reverse('achievement_score', kwargs={'achievement_id': 1})
         self.assertEqual(resolve(url).func, achievement_score)
+    
+    def test_achievement_score_batch_url(self):
+        url = reverse('achievement_score_batch', kwargs={'review_id': 1})
+        self.assertEqual(resolve(url).func, achievement_score_batch)
+    
+    def test_review_inbox_url(self):
+        url = reverse('review_inbox')
+        self.assertEqual(resolve(url).func, review_inbox)
+    
+    def test_review_cycle_create_url(self):
+        url = reverse('review_cycle_create', kwargs={'company_id': 1})
+        self.assertEqual(resolve(url).func, review_cycle_create)
+    
+    def test_review_cycle_detail_url(self):
+        url = reverse('review_cycle_detail', kwargs={'cycle_id': 1})
+        self.assertEqual(resolve(url).func, review_cycle_detail)
+    
+    def test_review_export_team_url(self):
+        url = reverse('review_export_team', kwargs={'team_id': 1})
+        self.assertEqual(resolve(url).func, review_export_team)
+    
+    def test_review_export_company_url(self):
+        url = reverse('review_export_company', kwargs={'company_id': 1})
+        self.assertEqual(resolve(url).func, review_export_company)
+    
+    def test_achievement_import_url(self):
+        url = reverse('achievement_import', kwargs={'review_id': 1})
+        self.assertEqual(resolve(url).func, achievement_import)
+    
+    def test_review_cycle_import_url(self):
+        url = reverse('review_cycle_import', kwargs={'cycle_id': 1})
+        self.assertEqual(resolve(url).func, review_cycle_import)
+    
+    def test_review_search_url(self):
+        url = reverse('review_search')
+        self.assertEqual(resolve(url).func, review_search)
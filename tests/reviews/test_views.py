@@ -4,6 +4,7 @@ from accounts.models import User
 from companies.models import Company, CompanyUsers
 from teams.models import Team, TeamUsers
 from reviews.models import PerfReview, Achievement, AchievementScore
+from perfecto.fragments import SCOPE_REVIEW, bump_versions
 
 @pytest.fixture
 def user():
@@ -147,6 +148,16 @@ class TestPerfReviewCreateView:
         for user in users:
             assert PerfReview.objects.filter(user=user, team=team_with_users).exists()
     
+    def test_perfreview_create_team_twice(self, client, manager, team_with_users):
+        """Test that launching a team review twice does not duplicate reviews"""
+        client.force_login(manager)
+        url = reverse('perfreview_create_team', kwargs={'team_id': team_with_users.id})
+        client.get(url)
+        response = client.get(url)
+        
+        assert response.status_code == 302
+        assert PerfReview.objects.count() == 3
+    
     def test_perfreview_create_user_as_manager(self, client, manager, user, team_with_users):
         """Test that managers can create reviews for a specific user"""
         client.force_login(manager)
@@ -357,3 +368,167 @@ class TestAchievementScoreView:
         achievement_score.refresh_from_db()
         assert achievement_score.score == 5  # Should be updated
         assert achievement_score.comment == 'Updated comment'  # Should be updated
+
+@pytest.mark.django_db
+class TestPerfReviewDetailQueries:
+    
+    def _fill_review(self, perfreview, reviewers, count):
+        for i in range(count):
+            achievement = Achievement.objects.create(
+                perfreview=perfreview,
+                title=f"Achievement {i}",
+                self_score=3
+            )
+            achievement.reviewers.set(reviewers)
+            for reviewer in reviewers:
+                AchievementScore.objects.create(achievement=achievement, user=reviewer, score=4)
+    
+    def _count_queries(self, client, perfreview):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        url = reverse('perfreview_detail', kwargs={'review_id': perfreview.id})
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        assert response.status_code == 200
+        return len(ctx.captured_queries)
+    
+    def test_query_count_independent_of_review_size(self, client, user, team, perfreview):
+        """Test that perfreview_detail runs the same number of queries for any review size"""
+        reviewers = [
+            User.objects.create_user(email=f"r{i}@example.com", password="pass", user_name=f"R{i}")
+            for i in range(4)
+        ]
+        client.force_login(user)
+        
+        self._fill_review(perfreview, reviewers[:1], 1)
+        self._count_queries(client, perfreview)  # warm up the role cache
+        bump_versions(SCOPE_REVIEW, [perfreview.id])
+        small = self._count_queries(client, perfreview)
+        
+        self._fill_review(perfreview, reviewers, 15)
+        large = self._count_queries(client, perfreview)
+        
+        assert small == large
+    
+    def test_cached_fragments_skip_achievement_queries(self, client, user, team, perfreview):
+        """Test that a repeat view renders achievements from the fragment cache"""
+        reviewer = User.objects.create_user(email="r@example.com", password="pass", user_name="Reviewer")
+        self._fill_review(perfreview, [reviewer], 5)
+        client.force_login(user)
+        
+        cold = self._count_queries(client, perfreview)
+        warm = self._count_queries(client, perfreview)
+        
+        assert warm < cold
+        url = reverse('perfreview_detail', kwargs={'review_id': perfreview.id})
+        assert "Achievement 4" in client.get(url).content.decode('utf-8')
+    
+    def test_new_score_invalidates_fragments(self, client, user, team, perfreview):
+        """Test that a score saved after caching shows up on the next view"""
+        reviewer = User.objects.create_user(email="r@example.com", password="pass", user_name="Reviewer")
+        self._fill_review(perfreview, [reviewer], 1)
+        achievement = Achievement.objects.create(perfreview=perfreview, title="Fresh", self_score=2)
+        client.force_login(user)
+        url = reverse('perfreview_detail', kwargs={'review_id': perfreview.id})
+        client.get(url)
+        
+        AchievementScore.objects.create(achievement=achievement, user=reviewer, score=5, comment="Отлично сделано")
+        
+        assert "Отлично сделано" in client.get(url).content.decode('utf-8')
+    
+    def test_score_link_is_per_viewer(self, client, user, team, perfreview, manager):
+        """Test that a cached page still shows the score link only to pending reviewers"""
+        reviewer = User.objects.create_user(email="r@example.com", password="pass", user_name="Reviewer")
+        achievement = Achievement.objects.create(perfreview=perfreview, title="Pending", self_score=2)
+        achievement.reviewers.add(reviewer)
+        score_url = reverse('achievement_score', kwargs={'achievement_id': achievement.id})
+        url = reverse('perfreview_detail', kwargs={'review_id': perfreview.id})
+        
+        client.force_login(user)
+        assert score_url not in client.get(url).content.decode('utf-8')
+        client.force_login(reviewer)
+        assert score_url in client.get(url).content.decode('utf-8')
+    
+    def test_detail_marks_scored_achievements(self, client, reviewer, achievement_score):
+        """Test that precomputed achievement data reflects the reviewer's scores"""
+        client.force_login(reviewer)
+        url = reverse('perfreview_detail', kwargs={'review_id': achievement_score.achievement.perfreview.id})
+        response = client.get(url)
+        
+        achievement = response.context['achievements'][0]
+        assert achievement.user_is_reviewer is True
+        assert achievement.user_has_scored is True
+        assert [s.user for s in achievement.score_list] == [reviewer]
+
+@pytest.mark.django_db
+class TestAchievementScoreBatchView:
+    
+    def _post_data(self, rows):
+        data = {
+            'form-TOTAL_FORMS': str(len(rows)),
+            'form-INITIAL_FORMS': str(len(rows)),
+        }
+        for i, (achievement_id, score, comment) in enumerate(rows):
+            data[f'form-{i}-achievement_id'] = achievement_id
+            data[f'form-{i}-score'] = score
+            data[f'form-{i}-comment'] = comment
+        return data
+    
+    def test_batch_form_lists_assigned_achievements(self, client, reviewer, perfreview, achievement_with_reviewer):
+        """Test that the formset contains only achievements assigned to the reviewer"""
+        Achievement.objects.create(perfreview=perfreview, title="Not assigned", self_score=2)
+        client.force_login(reviewer)
+        url = reverse('achievement_score_batch', kwargs={'review_id': perfreview.id})
+        response = client.get(url)
+        
+        assert response.status_code == 200
+        assert [a.id for a, form in response.context['rows']] == [achievement_with_reviewer.id]
+    
+    def test_batch_scores_upserted_in_one_submit(self, client, reviewer, perfreview, achievement_score):
+        """Test that one submit updates existing scores and creates new ones"""
+        second = Achievement.objects.create(perfreview=perfreview, title="Second", self_score=3)
+        second.reviewers.add(reviewer)
+        client.force_login(reviewer)
+        url = reverse('achievement_score_batch', kwargs={'review_id': perfreview.id})
+        
+        response = client.post(url, self._post_data([
+            (achievement_score.achievement.id, 2, 'Changed my mind'),
+            (second.id, 5, 'Great'),
+        ]))
+        
+        assert response.status_code == 302
+        assert AchievementScore.objects.filter(user=reviewer).count() == 2
+        achievement_score.refresh_from_db()
+        assert achievement_score.score == 2
+        assert achievement_score.comment == 'Changed my mind'
+        assert second.score_summary.mean_score == 5
+        assert perfreview.score_summary.score_count == 2
+    
+    def test_batch_skips_empty_scores(self, client, reviewer, perfreview, achievement_with_reviewer):
+        """Test that rows without a score are left unscored"""
+        client.force_login(reviewer)
+        url = reverse('achievement_score_batch', kwargs={'review_id': perfreview.id})
+        
+        response = client.post(url, self._post_data([(achievement_with_reviewer.id, '', '')]))
+        
+        assert response.status_code == 302
+        assert AchievementScore.objects.count() == 0
+    
+    def test_batch_rejects_foreign_achievements(self, client, reviewer, perfreview, achievement_with_reviewer):
+        """Test that achievements not assigned to the reviewer cannot be scored"""
+        other = Achievement.objects.create(perfreview=perfreview, title="Other", self_score=3)
+        client.force_login(reviewer)
+        url = reverse('achievement_score_batch', kwargs={'review_id': perfreview.id})
+        
+        response = client.post(url, self._post_data([(other.id, 4, '')]))
+        
+        assert response.status_code == 200
+        assert AchievementScore.objects.count() == 0
+    
+    def test_batch_forbidden_for_non_reviewers(self, client, user, perfreview, achievement_with_reviewer):
+        """Test that users without assigned achievements get 403"""
+        client.force_login(user)
+        url = reverse('achievement_score_batch', kwargs={'review_id': perfreview.id})
+        response = client.get(url)
+        
+        assert response.status_code == 403
@@ -0,0 +1,151 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from accounts.models import User
+from companies.models import Company, CompanyUsers
+from reviews.models import Achievement, AchievementScore, PerfReview
+from teams.listing import member_stats, roster_page
+from teams.models import Team, TeamUsers
+
+@pytest.fixture
+def manager():
+    return User.objects.create_user(email="manager@example.com", password="pass", user_name="Manager")
+
+@pytest.fixture
+def team(manager):
+    company = Company.objects.create(company_name="Test Company")
+    CompanyUsers.objects.create(user=manager, company=company, is_manager=True)
+    team = Team.objects.create(team_name="Test Team", company=company)
+    TeamUsers.objects.create(user=manager, team=team, is_manager=True, is_owner=True)
+    return team
+
+def make_members(team, count):
+    start = TeamUsers.objects.filter(team=team).count()
+    members = []
+    for i in range(start, start + count):
+        user = User.objects.create_user(email=f"member{i}@example.com", password="pass", user_name=f"Member {i:03d}")
+        members.append(TeamUsers.objects.create(user=user, team=team))
+    return members
+
+def score(achievement, reviewer, value):
+    AchievementScore.objects.create(achievement=achievement, user=reviewer, score=value)
+
+@pytest.mark.django_db
+class TestMemberStats:
+
+    def test_stats_are_not_multiplied_by_joins(self, team, manager):
+        """Test that open reviews, achievements and the peer mean count each row once"""
+        member = make_members(team, 1)[0].user
+        reviewer = User.objects.create_user(email="rev@example.com", password="pass", user_name="Rev")
+        open_review = PerfReview.objects.create(user=member, team=team)
+        PerfReview.objects.create(user=member, team=team, is_closed=True)
+        first = Achievement.objects.create(perfreview=open_review, title="One", self_score=3)
+        second = Achievement.objects.create(perfreview=open_review, title="Two", self_score=3)
+        score(first, manager, 5)
+        score(first, reviewer, 4)
+        score(second, manager, 3)
+
+        stats = member_stats(team, [member.id, manager.id])
+
+        assert stats == {member.id: {'open_reviews': 1, 'achievements': 2, 'peer_score': 4.0}}
+
+    def test_other_teams_are_ignored(self, team):
+        """Test that reviews in another team do not leak into the roster"""
+        member = make_members(team, 1)[0].user
+        other = Team.objects.create(team_name="Other", company=team.company)
+        PerfReview.objects.create(user=member, team=other)
+
+        assert member_stats(team, [member.id]) == {}
+
+@pytest.mark.django_db
+class TestRosterPage:
+
+    def test_keyset_pages_cover_all_members_once(self, team):
+        """Test that following cursors yields every member exactly once"""
+        make_members(team, 7)
+        seen = []
+        cursor = None
+        while True:
+            page = roster_page(team, cursor=cursor, page_size=3)
+            seen.extend(member.id for member in page)
+            cursor = page.next_cursor
+            if not cursor:
+                break
+
+        assert sorted(seen) == sorted(TeamUsers.objects.filter(team=team).values_list('id', flat=True))
+        assert len(seen) == len(set(seen))
+
+    def test_members_without_reviews_get_empty_stats(self, team):
+        """Test that every row carries stats, even without reviews"""
+        make_members(team, 1)
+
+        page = roster_page(team)
+
+        assert all(member.stats == {'open_reviews': 0, 'achievements': 0, 'peer_score': None} for member in page)
+
+    def test_page_costs_two_queries(self, team, django_assert_num_queries):
+        """Test that members and their stats are loaded with one query each"""
+        for member in make_members(team, 5):
+            review = PerfReview.objects.create(user=member.user, team=team)
+            Achievement.objects.create(perfreview=review, title="Work", self_score=3)
+
+        with django_assert_num_queries(2):
+            page = roster_page(team)
+            names = [member.user.user_name for member in page]
+
+        assert len(names) == 6
+
+@pytest.mark.django_db
+class TestTeamDetailRoster:
+
+    def _count(self, client, team):
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(reverse('team_detail', kwargs={'team_id': team.id}))
+        assert response.status_code == 200
+        return len(ctx.captured_queries)
+
+    def test_query_count_independent_of_team_size(self, client, manager, team):
+        """Test that the page runs the same number of queries for any roster size"""
+        client.force_login(manager)
+        make_members(team, 2)
+        self._count(client, team)  # warm up the role cache
+        small = self._count(client, team)
+
+        for member in make_members(team, 80):
+            PerfReview.objects.create(user=member.user, team=team)
+        self._count(client, team)
+        large = self._count(client, team)
+
+        assert small == large
+
+    def test_htmx_next_page_renders_rows_only(self, client, manager, team):
+        """Test that the infinite scroll request gets only the next rows"""
+        make_members(team, 60)
+        client.force_login(manager)
+        first = roster_page(team)
+
+        response = client.get(
+            reverse('team_detail', kwargs={'team_id': team.id}),
+            {'section': 'members', 'cursor': first.next_cursor},
+            HTTP_HX_REQUEST='true'
+        )
+
+        assert response.status_code == 200
+        assert len(response.context['team_users']) == 11
+        assert b'<html' not in response.content
+
+    def test_new_score_refreshes_roster(self, client, manager, team):
+        """Test that a new reviewer score changes the cached roster and the page ETag"""
+        member = make_members(team, 1)[0].user
+        review = PerfReview.objects.create(user=member, team=team)
+        achievement = Achievement.objects.create(perfreview=review, title="Work", self_score=3)
+        client.force_login(manager)
+        url = reverse('team_detail', kwargs={'team_id': team.id})
+        etag = client.get(url)['ETag']
+
+        score(achievement, manager, 5)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert b'5,0' in response.content